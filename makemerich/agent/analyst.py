@@ -1,35 +1,27 @@
 """Market analyst agent — provides market analysis context to the trader."""
 
 from makemerich.core.logger import get_logger
+from makemerich.core.pipeline import MarketPipeline
 
 
 class MarketAnalyst:
     """Analyzes market conditions and provides context for trading decisions."""
 
-    def __init__(self, config, skills):
+    def __init__(self, config, skills, pipeline: MarketPipeline = None):
         self.config = config
         self.skills = skills
+        self.pipeline = pipeline or MarketPipeline(config, skills)
         self.logger = get_logger("analyst")
 
     async def analyze(self, pairs: list) -> dict:
         """Run full analysis on the given trading pairs."""
-        results = {}
-        for pair in pairs:
-            results[pair] = await self._analyze_pair(pair)
-        return results
-
-    async def _analyze_pair(self, pair: str) -> dict:
-        """Analyze a single trading pair."""
-        market_data = await self.skills["market_data"].get_klines(
-            symbol=pair,
-            interval=self.config.timeframe,
-            limit=100,
-        )
-
-        technical = self.skills["technical"].analyze(market_data)
-
+        result = await self.pipeline.run(pairs)
         return {
-            "pair": pair,
-            "technical": technical,
-            "market_data": market_data,
+            pair: {
+                "pair": pair,
+                "technical": r.analysis if r.ok else {"error": r.error},
+                "market_data": r.klines,
+                "timings": {"fetch_ms": r.fetch_ms, "analysis_ms": r.analysis_ms},
+            }
+            for pair, r in result.pairs.items()
         }
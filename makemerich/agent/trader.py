@@ -7,7 +7,7 @@ In MakeMeRich: market sends data -> LLM interprets -> decides which trade to mak
 
 import json
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
 import anthropic
 
@@ -104,13 +104,17 @@ class TraderAgent:
         self.reasoning = reasoning
         self.client = anthropic.Anthropic()
         self.soul = load_soul()
+        self.fills: List[dict] = []  # orders executed in the last decide()
 
-    async def decide(self, market_data: dict, analysis: dict, session) -> TradeDecision:
+    async def decide(self, market_data: dict, analysis: dict, session,
+                     signals: dict = None) -> TradeDecision:
         """
         Agent decision cycle.
         Same pattern as run_agent_turn() in OpenClaw.
+        ``signals`` is the strategy ensemble's consensus per pair, if any.
         """
-        context = self._build_context(market_data, analysis)
+        context = self._build_context(market_data, analysis, signals)
+        self.fills = []
 
         messages = session.load()
         messages.append({"role": "user", "content": context})
@@ -140,6 +144,10 @@ class TraderAgent:
                 for block in response.content:
                     if block.type == "tool_use":
                         result = await self._execute_tool(block.name, block.input)
+                        if (block.name in ("execute_spot_buy", "execute_spot_sell")
+                                and result.get("status") == "success"
+                                and result.get("executed_qty")):
+                            self.fills.append(result)
                         tool_results.append({
                             "type": "tool_result",
                             "tool_use_id": block.id,
@@ -167,7 +175,7 @@ class TraderAgent:
         elif name == "get_portfolio":
             return await self.skills["account"].get_portfolio()
         elif name == "get_market_analysis":
-            return self.skills["technical"].detailed_analysis(
+            return await self.skills["technical"].detailed_analysis(
                 symbol=input_data["symbol"],
                 timeframe=input_data.get("timeframe", "1h"),
             )
@@ -179,8 +187,10 @@ class TraderAgent:
             )
         return {"error": f"Unknown tool: {name}"}
 
-    def _build_context(self, market_data: dict, analysis: dict) -> str:
+    def _build_context(self, market_data: dict, analysis: dict,
+                       signals: dict = None) -> str:
         """Build the context prompt for the LLM."""
+        signals = signals or {}
         context = "## Market Update\n\n"
         for pair, data in analysis.items():
             context += f"### {pair}\n"
@@ -189,7 +199,12 @@ class TraderAgent:
             context += f"MACD Signal: {data.get('macd_signal', 'N/A')}\n"
             context += f"Bollinger: {data.get('bb_position', 'N/A')}\n"
             context += f"Volume trend: {data.get('volume_trend', 'N/A')}\n"
-            context += f"24h Change: {data.get('change_24h', 'N/A')}%\n\n"
+            context += f"24h Change: {data.get('change_24h', 'N/A')}%\n"
+            if pair in signals:
+                consensus = signals[pair]
+                context += (f"Strategy consensus: {consensus.signal.action} "
+                            f"(score {consensus.score:+.2f}; {consensus.signal.reason})\n")
+            context += "\n"
         context += "Based on this data, analyze the market and decide your action. "
         context += "Use the available tools to execute trades or gather more information. "
         context += "ALWAYS explain your reasoning in detail (CrystalBox).\n"
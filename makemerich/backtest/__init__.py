@@ -0,0 +1 @@
+"""Backtesting — replay candle history through trading strategies."""
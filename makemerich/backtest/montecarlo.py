@@ -0,0 +1,175 @@
+"""Monte Carlo simulation of equity paths from a strategy's trade returns.
+
+A backtest is one ordering of its trades. Resampling the per-trade returns
+(with replacement, one by one or in blocks that keep streaks together)
+gives many plausible orderings, and the spread of their equity curves
+shows how deep drawdowns can get and how often capital is ruined.
+
+Positions are sized as ``RiskManager`` does: ``max_risk_per_trade`` of
+equity at risk over a ``default_stop_loss_pct`` stop, at most the equity
+not held back by ``min_cash_percent``. Losses are cut at the stop.
+
+    returns = trade_returns(Backtester().run(strategy, frame).trades)
+    result = MonteCarlo(config.risk).run(returns, paths=100_000, block=5)
+    result.summary()
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from makemerich.core.config import RiskConfig
+
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+
+def trade_returns(trades: Iterable) -> np.ndarray:
+    """Fractional return of each backtest ``Trade`` (fees included)."""
+    return np.array([t.return_pct / 100 for t in trades], dtype=np.float64)
+
+
+def audit_returns(entries: Sequence[dict]) -> np.ndarray:
+    """Realized returns of the BUY/SELL round trips in audit log entries.
+
+    Only executed fills (``AuditLog.log_fill``) are counted: they record
+    the base quantity and average price on both sides, so buys and sells of
+    a pair are matched first in, first out by quantity. Decisions are not
+    trades and are skipped. A sell of a pair with no open buy is ignored.
+    """
+    lots = {}                 # pair -> open [amount, price, lot number]
+    pnl, cost = {}, {}        # per lot, in order of its first sale
+    bought = 0
+    for entry in entries:
+        price, amount = entry.get("price"), entry.get("amount") or 0
+        if (not entry.get("fill") or not price or amount <= 0
+                or entry["action"] not in ("BUY", "SELL")):
+            continue
+        pair = entry["pair"]
+        if entry["action"] == "BUY":
+            lots.setdefault(pair, []).append([amount, price, bought])
+            bought += 1
+            continue
+        open_lots = lots.get(pair)
+        while amount > 0 and open_lots:
+            lot = open_lots[0]
+            filled = min(amount, lot[0])
+            pnl[lot[2]] = pnl.get(lot[2], 0.0) + filled * (price - lot[1])
+            cost[lot[2]] = cost.get(lot[2], 0.0) + filled * lot[1]
+            lot[0] -= filled
+            amount -= filled
+            if lot[0] <= 0:
+                open_lots.pop(0)
+    return np.array([pnl[k] / cost[k] for k in pnl], dtype=np.float64)
+
+
+def resample(returns: np.ndarray, paths: int, horizon: int, block: int = 1,
+             rng: np.random.Generator = None) -> np.ndarray:
+    """``paths`` x ``horizon`` matrix of returns drawn with replacement.
+
+    With ``block`` > 1 draws are runs of consecutive trades (circular
+    block bootstrap), keeping streaks and volatility clusters intact.
+    """
+    rng = rng or np.random.default_rng()
+    n = len(returns)
+    if block <= 1:
+        return returns[rng.integers(0, n, (paths, horizon))]
+    blocks = -(-horizon // block)
+    starts = rng.integers(0, n, (paths, blocks, 1))
+    index = (starts + np.arange(block)) % n
+    return returns[index.reshape(paths, blocks * block)[:, :horizon]]
+
+
+def max_drawdowns(equity: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough fall of each row, as a fraction."""
+    peak = np.maximum.accumulate(equity, axis=1)
+    return (1 - equity / peak).max(axis=1)
+
+
+@dataclass
+class MonteCarloResult:
+    paths: int
+    horizon: int
+    position_fraction: float
+    final_return: np.ndarray   # per path, fraction of initial capital
+    max_drawdown: np.ndarray   # per path, fraction of the running peak
+    ruined: np.ndarray         # per path, equity fell to the ruin level
+
+    @property
+    def ruin_probability(self) -> float:
+        return float(self.ruined.mean())
+
+    def return_percentiles(self, q: Sequence[float] = PERCENTILES) -> dict:
+        values = np.percentile(self.final_return, q) * 100
+        return {f"p{p:g}": round(float(v), 2) for p, v in zip(q, values)}
+
+    def drawdown_percentiles(self, q: Sequence[float] = PERCENTILES) -> dict:
+        values = np.percentile(self.max_drawdown, q) * 100
+        return {f"p{p:g}": round(float(v), 2) for p, v in zip(q, values)}
+
+    def summary(self) -> dict:
+        return {
+            "paths": self.paths,
+            "trades_per_path": self.horizon,
+            "position_fraction": round(self.position_fraction, 4),
+            "mean_return": round(float(self.final_return.mean()) * 100, 2),
+            "return_percentiles": self.return_percentiles(),
+            "max_drawdown_percentiles": self.drawdown_percentiles(),
+            "ruin_probability": round(self.ruin_probability, 4),
+        }
+
+
+class MonteCarlo:
+    """Bootstrap equity paths under the risk limits of ``RiskConfig``."""
+
+    def __init__(self, risk: RiskConfig = None, ruin_level: float = 0.5,
+                 enforce_stop: bool = True, chunk: int = 16_384):
+        self.risk = risk or RiskConfig()
+        self.ruin_level = ruin_level
+        self.enforce_stop = enforce_stop
+        self.chunk = chunk
+
+    @property
+    def position_fraction(self) -> float:
+        """Share of equity one trade may hold, as RiskManager sizes it."""
+        risk = self.risk
+        return min(risk.max_risk_per_trade / risk.default_stop_loss_pct,
+                   1 - risk.min_cash_percent / 100)
+
+    def equity_paths(self, returns, paths: int, horizon: int = None, block: int = 1,
+                     rng: np.random.Generator = None) -> np.ndarray:
+        """``paths`` x ``horizon + 1`` equity matrix, starting at 1."""
+        returns = self._trade_returns(returns)
+        horizon = horizon or len(returns)
+        equity = np.empty((paths, horizon + 1))
+        equity[:, 0] = 1.0
+        growth = 1 + self.position_fraction * resample(returns, paths, horizon, block, rng)
+        np.cumprod(growth, axis=1, out=equity[:, 1:])
+        return equity
+
+    def run(self, returns, paths: int = 10_000, horizon: int = None, block: int = 1,
+            seed: int = None) -> MonteCarloResult:
+        """Simulate ``paths`` sequences of ``horizon`` trades (default: as many
+        as there are returns), ``chunk`` paths at a time to bound memory."""
+        returns = self._trade_returns(returns)
+        horizon = horizon or len(returns)
+        rng = np.random.default_rng(seed)
+        final = np.empty(paths)
+        drawdown = np.empty(paths)
+        ruined = np.empty(paths, dtype=bool)
+        for start in range(0, paths, self.chunk):
+            stop = min(start + self.chunk, paths)
+            equity = self.equity_paths(returns, stop - start, horizon, block, rng)
+            final[start:stop] = equity[:, -1] - 1
+            drawdown[start:stop] = max_drawdowns(equity)
+            ruined[start:stop] = equity.min(axis=1) <= self.ruin_level
+        return MonteCarloResult(paths, horizon, self.position_fraction,
+                                final, drawdown, ruined)
+
+    def _trade_returns(self, returns) -> np.ndarray:
+        returns = np.asarray(returns, dtype=np.float64)
+        if not len(returns):
+            raise ValueError("No trade returns to resample")
+        if self.enforce_stop:
+            returns = np.maximum(returns, -self.risk.default_stop_loss_pct)
+        return returns
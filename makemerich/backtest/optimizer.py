@@ -0,0 +1,390 @@
+"""Strategy parameter search with walk-forward validation, across processes.
+
+Parameter sets come from a grid (every combination) or a seeded random
+search. The candle columns and the ``analyze_history`` table of the whole
+series are computed once and copied into shared memory; pool workers
+attach to them at start-up and backtest against zero-copy views, so a task
+carries only a parameter set. Indicators are causal, so slicing the
+precomputed table for a fold leaks nothing from later candles.
+
+With folds, the series is cut into rolling walk-forward windows: each
+parameter set is backtested on every fold's train and test range. Sets are
+ranked by mean train score only; test scores are never used to choose and
+are reported as out-of-sample evidence. The report also picks, per fold,
+the best parameters on its train range and scores them on its test range —
+the honest estimate of what the search itself is worth. The top result can
+be written back as a strategy profile.
+
+    makemerich-optimize --symbol BTCUSDT --interval 1h --strategy momentum \\
+        --start 2022-01-01 --param rsi_buy_threshold=25,30,35,40 \\
+        --param rsi_sell_threshold=65,70,75 --folds 4 \\
+        --base-profile config/strategies/aggressive.yaml \\
+        --profile config/strategies/momentum-btc.yaml
+"""
+
+import argparse
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+from makemerich.backtest.backtester import Backtester
+from makemerich.core.logger import get_logger
+from makemerich.skills.analysis.technical import TechnicalAnalysisSkill
+from makemerich.skills.klines import KLINE_FIELDS, KlineFrame, as_frame
+from makemerich.strategies.ensemble import STRATEGIES, build_strategy
+
+# Higher is better for every metric
+METRICS = {
+    "total_return": lambda s: s["total_return"],
+    "win_rate": lambda s: s["win_rate"],
+    "calmar": lambda s: (s["total_return"] / s["max_drawdown"]
+                         if s["max_drawdown"] else s["total_return"]),
+}
+
+Window = Tuple[int, int]
+
+
+def grid_search(space: Dict[str, Sequence]) -> List[dict]:
+    """Every combination of the listed values."""
+    names = list(space)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_search(space: Dict[str, object], samples: int, seed: int = 0) -> List[dict]:
+    """``samples`` draws: a list is sampled from, a ``(low, high)`` tuple
+    drawn uniformly (as an int when both bounds are ints)."""
+    rng = random.Random(seed)
+
+    def draw(values):
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return rng.uniform(low, high)
+        return rng.choice(values)
+
+    return [{name: draw(values) for name, values in space.items()}
+            for _ in range(samples)]
+
+
+def walk_forward_splits(size: int, folds: int,
+                        train_size: float = 0.5) -> List[Tuple[Window, Window]]:
+    """Rolling (train, test) candle ranges.
+
+    Each train range covers ``train_size`` of the series and is followed by
+    a test range; consecutive folds shift by one test range, so the test
+    ranges tile the second part of the series without overlapping.
+    """
+    train = int(size * train_size)
+    test = (size - train) // folds
+    if train <= 0 or test <= 0:
+        raise ValueError(f"Cannot split {size} candles into {folds} folds")
+    return [((k * test, k * test + train), (k * test + train, (k + 1) * test + train))
+            for k in range(folds)]
+
+
+@dataclass
+class Evaluation:
+    params: dict
+    train: List[dict]     # backtest summary per fold (the whole series without folds)
+    test: List[dict]      # backtest summary per fold's test range
+    score: float = 0.0    # mean train score, what candidates are ranked by
+    test_score: Optional[float] = None  # mean test score, evidence only
+
+
+@dataclass
+class OptimizationReport:
+    strategy: str
+    pair: str
+    metric: str
+    start: int            # ms, first candle
+    end: int              # ms, last candle
+    candles: int
+    evaluations: List[Evaluation]   # best first
+    folds: List[dict] = field(default_factory=list)
+
+    @property
+    def best(self) -> Evaluation:
+        return self.evaluations[0]
+
+    @property
+    def walk_forward_score(self):
+        """Mean test score of the per-fold train winners (None without folds)."""
+        if not self.folds:
+            return None
+        return float(np.mean([f["test_score"] for f in self.folds]))
+
+    def ranking(self, top: int = 10) -> List[dict]:
+        return [{"params": e.params, "score": round(e.score, 4),
+                 "test_score": None if e.test_score is None else round(e.test_score, 4),
+                 "trades": sum(s["trades"] for s in e.test or e.train)}
+                for e in self.evaluations[:top]]
+
+
+class SharedArrays:
+    """NumPy arrays copied once into shared memory blocks."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.blocks: List[SharedMemory] = []
+        self.specs = {}
+        for name, array in arrays.items():
+            block = SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype)
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def attach(specs: dict) -> Tuple[List[SharedMemory], Dict[str, np.ndarray]]:
+    """Read-only views over blocks created by ``SharedArrays``."""
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in specs.items():
+        # Pool workers share the creator's resource tracker, which unlinks
+        # the block once, when the creator does
+        block = SharedMemory(name=block_name)
+        array = np.ndarray(shape, dtype, buffer=block.buf)
+        array.flags.writeable = False
+        blocks.append(block)
+        arrays[name] = array
+    return blocks, arrays
+
+
+# Per-worker state, set by _init_worker
+_worker = {}
+
+
+def _init_worker(specs: dict, strategy: str, pair: str, windows: list,
+                 backtester: dict):
+    blocks, arrays = attach(specs)
+    _worker.update(
+        blocks=blocks,
+        frame=KlineFrame({f: arrays[f] for f in KLINE_FIELDS}),
+        table=arrays["analysis"],
+        strategy=strategy,
+        pair=pair,
+        windows=windows,
+        backtester=Backtester(**backtester),
+    )
+
+
+def _evaluate(params: dict) -> List[dict]:
+    return evaluate(_worker["backtester"], _worker["strategy"], params,
+                    _worker["frame"], _worker["table"], _worker["windows"],
+                    _worker["pair"])
+
+
+def evaluate(backtester: Backtester, strategy: str, params: dict, frame,
+             table: np.ndarray, windows: List[Window], pair: str = "") -> List[dict]:
+    """Backtest summaries of one parameter set over each candle window."""
+    return [
+        backtester.run(build_strategy(strategy, params), frame[a:b], pair,
+                       analysis=table[a:b]).summary()
+        for a, b in windows
+    ]
+
+
+class Optimizer:
+    """Search a strategy's parameter space over one candle series."""
+
+    def __init__(self, strategy: str, metric: str = "total_return",
+                 workers: int = None, backtester: dict = None,
+                 technical: TechnicalAnalysisSkill = None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        self.strategy = strategy
+        self.metric = metric
+        self.workers = workers or os.cpu_count() or 1
+        self.backtester = backtester or {}
+        self.technical = technical or TechnicalAnalysisSkill()
+        self.logger = get_logger("optimizer")
+
+    def run(self, klines, candidates: List[dict], pair: str = "", folds: int = 0,
+            train_size: float = 0.5) -> OptimizationReport:
+        """Backtest every candidate parameter set and rank them.
+
+        Sets are ranked by their mean train score (the whole series
+        without ``folds``); with folds the mean test score of each set is
+        recorded alongside, but never used to rank.
+        """
+        frame = as_frame(klines)
+        if not len(frame):
+            raise ValueError("No candles to optimize on")
+        table = self.technical.analyze_history(frame)
+        splits = walk_forward_splits(len(frame), folds, train_size) if folds else []
+        windows = ([w for split in splits for w in split] if splits
+                   else [(0, len(frame))])
+
+        summaries = self._map(frame, table, candidates, windows, pair)
+        score = METRICS[self.metric]
+        evaluations = [
+            Evaluation(params, runs[0::2], runs[1::2]) if splits
+            else Evaluation(params, runs, [])
+            for params, runs in zip(candidates, summaries)
+        ]
+        for e in evaluations:
+            e.score = float(np.mean([score(s) for s in e.train]))
+            if e.test:
+                e.test_score = float(np.mean([score(s) for s in e.test]))
+
+        report = OptimizationReport(
+            strategy=self.strategy, pair=pair, metric=self.metric,
+            start=int(frame.timestamp[0]), end=int(frame.timestamp[-1]),
+            candles=len(frame),
+            evaluations=sorted(evaluations, key=lambda e: e.score, reverse=True),
+        )
+        for k, (train, test) in enumerate(splits):
+            winner = max(evaluations, key=lambda e: score(e.train[k]))
+            report.folds.append({
+                "fold": k,
+                "train": [int(frame.timestamp[train[0]]), int(frame.timestamp[train[1] - 1])],
+                "test": [int(frame.timestamp[test[0]]), int(frame.timestamp[test[1] - 1])],
+                "params": winner.params,
+                "train_score": score(winner.train[k]),
+                "test_score": score(winner.test[k]),
+            })
+        self.logger.info("Optimization finished", strategy=self.strategy, pair=pair,
+                         candidates=len(candidates), folds=folds,
+                         best_score=round(report.best.score, 4))
+        return report
+
+    def _map(self, frame, table, candidates, windows, pair) -> List[List[dict]]:
+        if self.workers == 1 or len(candidates) == 1:
+            backtester = Backtester(**self.backtester)
+            return [evaluate(backtester, self.strategy, params, frame, table, windows, pair)
+                    for params in candidates]
+
+        shared = SharedArrays({**{f: getattr(frame, f) for f in KLINE_FIELDS},
+                               "analysis": table})
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(shared.specs, self.strategy, pair, windows, self.backtester),
+            ) as pool:
+                chunksize = max(1, len(candidates) // (self.workers * 4))
+                return list(pool.map(_evaluate, candidates, chunksize=chunksize))
+        finally:
+            shared.close()
+
+
+def write_profile(path: Path, report: OptimizationReport, interval: str = None,
+                  base_profile: Path = None):
+    """Write the best parameters as a strategy profile, with their evidence.
+
+    Starts from ``base_profile`` (pairs, risk, ...) when given; comments in
+    it are not preserved.
+    """
+    profile = {"name": Path(path).stem}
+    if base_profile:
+        with open(base_profile) as f:
+            profile = yaml.safe_load(f) or {}
+    strategy = profile.setdefault("strategy", {})
+    strategy["primary"] = report.strategy
+    if interval:
+        strategy["timeframe"] = interval
+    strategy["params"] = report.best.params
+    profile["optimization"] = {
+        "pair": report.pair,
+        "metric": report.metric,
+        "train_score": round(report.best.score, 4),
+        "test_score": (round(report.best.test_score, 4)
+                       if report.best.test_score is not None else None),
+        "walk_forward_score": (round(report.walk_forward_score, 4)
+                               if report.folds else None),
+        "folds": len(report.folds),
+        "candles": report.candles,
+        "start": _iso(report.start),
+        "end": _iso(report.end),
+        "candidates": len(report.evaluations),
+        "generated": date.today().isoformat(),
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        yaml.safe_dump(profile, f, sort_keys=False)
+
+
+def _iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+def _parse_param(value: str) -> Tuple[str, object]:
+    """``name=a,b,c`` lists values; ``name=low:high`` is a random-search range."""
+    name, _, values = value.partition("=")
+    if ":" in values:
+        low, high = (yaml.safe_load(v) for v in values.split(":", 1))
+        return name, (low, high)
+    return name, [yaml.safe_load(v) for v in values.split(",")]
+
+
+def main():
+    from makemerich.core.config import Config
+    from makemerich.storage.candles import CandleStore
+    from makemerich.storage.downloader import _parse_date
+
+    parser = argparse.ArgumentParser(description="Optimize strategy parameters")
+    parser.add_argument("--config", default="config/default.yaml",
+                       help="Path to config file")
+    parser.add_argument("--symbol", required=True, help="Symbol to backtest")
+    parser.add_argument("--interval", default="1h", help="Kline interval")
+    parser.add_argument("--strategy", required=True, choices=sorted(STRATEGIES))
+    parser.add_argument("--start", help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="End date (YYYY-MM-DD)")
+    parser.add_argument("--history-dir", help="Candle store directory")
+    parser.add_argument("--param", action="append", default=[], type=_parse_param,
+                       help="name=v1,v2,... (grid) or name=low:high (random)")
+    parser.add_argument("--random", type=int, default=0,
+                       help="Random search with this many samples (default: grid)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--folds", type=int, default=0, help="Walk-forward folds")
+    parser.add_argument("--train-size", type=float, default=0.5)
+    parser.add_argument("--metric", default="total_return", choices=sorted(METRICS))
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--fee-rate", type=float, default=0.001)
+    parser.add_argument("--slippage", type=float, default=0.0005)
+    parser.add_argument("--top", type=int, default=10, help="Results to print")
+    parser.add_argument("--profile", help="Write the best parameters to this profile")
+    parser.add_argument("--base-profile", help="Profile to start the written one from")
+    args = parser.parse_args()
+
+    config = Config.load(args.config)
+    store = CandleStore(Path(args.history_dir or config.data.history_dir
+                             or "data/candles"))
+    frame = store.query(args.symbol, args.interval,
+                        _parse_date(args.start) if args.start else None,
+                        _parse_date(args.end) if args.end else None)
+    space = dict(args.param)
+    candidates = (random_search(space, args.random, args.seed) if args.random
+                  else grid_search(space))
+
+    optimizer = Optimizer(args.strategy, args.metric, args.workers,
+                          {"fee_rate": args.fee_rate, "slippage": args.slippage})
+    report = optimizer.run(frame, candidates, args.symbol, args.folds, args.train_size)
+    for row in report.ranking(args.top):
+        test = "" if row["test_score"] is None else f"  test={row['test_score']:.4f}"
+        print(f"{row['score']:>10.4f}{test}  trades={row['trades']:<5} {row['params']}")
+    if report.folds:
+        print(f"Walk-forward {args.metric}: {report.walk_forward_score:.4f}")
+    if args.profile:
+        write_profile(Path(args.profile), report, args.interval, args.base_profile)
+        print(f"Wrote {args.profile}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 import os
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import yaml
 from dotenv import load_dotenv
@@ -27,6 +27,40 @@ class LLMConfig:
     max_tokens: int = 4096
 
 
+@dataclass
+class BinanceConfig:
+    max_concurrency: int = 8
+    keepalive_timeout: float = 30.0
+    price_ttl: float = 5.0
+    weight_limit: int = 6000
+    order_limit: int = 50
+    futures_weight_limit: int = 2400
+    futures_order_limit: int = 300
+    weight_headroom: float = 0.9
+
+
+@dataclass
+class DataConfig:
+    kline_limit: int = 100
+    fetch_concurrency: int = 10
+    analysis_workers: int = 4
+    stream: bool = False
+    stream_url: str = ""
+    history_dir: str = ""
+    order_books: bool = False
+    base_interval: str = "1m"
+    analysis_cache_size: int = 256
+    indicator_backend: str = "numpy"
+    detail_ttl: float = 30.0
+
+
+@dataclass
+class EnsembleConfig:
+    strategies: Dict[str, dict] = field(default_factory=dict)
+    min_confidence: float = 0.0
+    signals_path: str = "data/signals/latest.json"
+
+
 @dataclass
 class NotificationConfig:
     enabled: bool = False
@@ -43,6 +77,9 @@ class Config:
     trading_pairs: List[str] = field(default_factory=lambda: ["BTCUSDT", "ETHUSDT"])
     risk: RiskConfig = field(default_factory=RiskConfig)
     llm: LLMConfig = field(default_factory=LLMConfig)
+    binance: BinanceConfig = field(default_factory=BinanceConfig)
+    data: DataConfig = field(default_factory=DataConfig)
+    ensemble: EnsembleConfig = field(default_factory=EnsembleConfig)
     notifications: NotificationConfig = field(default_factory=NotificationConfig)
 
     # API keys from environment
@@ -85,6 +122,43 @@ class Config:
                     max_tokens=llm.get("max_tokens", 4096),
                 )
 
+            if "binance" in data:
+                binance = data["binance"] or {}
+                config.binance = BinanceConfig(
+                    max_concurrency=binance.get("max_concurrency", 8),
+                    keepalive_timeout=binance.get("keepalive_timeout", 30.0),
+                    price_ttl=binance.get("price_ttl", 5.0),
+                    weight_limit=binance.get("weight_limit", 6000),
+                    order_limit=binance.get("order_limit", 50),
+                    futures_weight_limit=binance.get("futures_weight_limit", 2400),
+                    futures_order_limit=binance.get("futures_order_limit", 300),
+                    weight_headroom=binance.get("weight_headroom", 0.9),
+                )
+
+            if "data" in data:
+                market = data["data"] or {}
+                config.data = DataConfig(
+                    kline_limit=market.get("kline_limit", 100),
+                    fetch_concurrency=market.get("fetch_concurrency", 10),
+                    analysis_workers=market.get("analysis_workers", 4),
+                    stream=market.get("stream", False),
+                    stream_url=market.get("stream_url", ""),
+                    history_dir=market.get("history_dir", ""),
+                    order_books=market.get("order_books", False),
+                    base_interval=market.get("base_interval", "1m"),
+                    analysis_cache_size=market.get("analysis_cache_size", 256),
+                    indicator_backend=market.get("indicator_backend", "numpy"),
+                    detail_ttl=market.get("detail_ttl", 30.0),
+                )
+
+            if "ensemble" in data:
+                ensemble = data["ensemble"] or {}
+                config.ensemble = EnsembleConfig(
+                    strategies=ensemble.get("strategies") or {},
+                    min_confidence=ensemble.get("min_confidence", 0.0),
+                    signals_path=ensemble.get("signals_path", "data/signals/latest.json"),
+                )
+
         # Load API keys from environment
         config.binance_api_key = os.getenv("BINANCE_API_KEY", "")
         config.binance_api_secret = os.getenv("BINANCE_API_SECRET", "")
@@ -13,12 +13,17 @@ from pathlib import Path
 from makemerich.core.config import Config
 from makemerich.core.session import Session
 from makemerich.core.logger import get_logger
+from makemerich.core.pipeline import MarketPipeline
 from makemerich.agent.trader import TraderAgent
 from makemerich.agent.risk import RiskManager
+from makemerich.skills.binance.transport import BinanceTransport
+from makemerich.skills.binance.prices import PriceCache
 from makemerich.skills.binance.market_data import MarketDataSkill
 from makemerich.skills.binance.spot import SpotTradingSkill
 from makemerich.skills.binance.account import AccountSkill
 from makemerich.skills.analysis.technical import TechnicalAnalysisSkill
+from makemerich.storage.candles import CandleStore
+from makemerich.strategies.ensemble import StrategyEnsemble
 from makemerich.crystalbox.reasoning import ReasoningCapture
 from makemerich.crystalbox.audit import AuditLog
 
@@ -34,14 +39,38 @@ class Engine:
         self.reasoning = ReasoningCapture()
         self.risk = RiskManager(self.config)
 
+        # One pooled async connection shared by every exchange skill
+        self.transport = BinanceTransport(self.config)
+        self.prices = PriceCache(self.transport, ttl=self.config.binance.price_ttl)
+        self.candles = (
+            CandleStore(Path(self.config.data.history_dir))
+            if self.config.data.history_dir else None
+        )
+
         # Initialize skills (equivalent to OpenClaw channel adapters)
+        market_data = MarketDataSkill(self.config, self.transport, store=self.candles)
         self.skills = {
-            "market_data": MarketDataSkill(self.config),
-            "spot_trading": SpotTradingSkill(self.config),
-            "account": AccountSkill(self.config),
-            "technical": TechnicalAnalysisSkill(),
+            "market_data": market_data,
+            "spot_trading": SpotTradingSkill(self.config, self.transport),
+            "account": AccountSkill(self.config, self.transport, self.prices),
+            "technical": TechnicalAnalysisSkill(
+                self.config.data.analysis_cache_size,
+                backend=self.config.data.indicator_backend,
+                market_data=market_data,
+                detail_ttl=self.config.data.detail_ttl,
+                kline_limit=self.config.data.kline_limit,
+            ),
         }
 
+        # Concurrent per-pair fetch + analysis
+        self.pipeline = MarketPipeline(self.config, self.skills)
+
+        # Rule-based strategies voting on every pair ahead of the LLM
+        self.ensemble = (
+            StrategyEnsemble.from_config(self.config.ensemble)
+            if self.config.ensemble.strategies else None
+        )
+
         # Initialize agent (the brain)
         self.agent = TraderAgent(
             config=self.config,
@@ -62,11 +91,20 @@ class Engine:
         account = await self.skills["account"].get_balance()
         self.logger.info("Connected to Binance", balance=account)
 
+        if self.config.data.stream:
+            self.skills["market_data"].start_stream(
+                self.config.trading_pairs,
+                interval=self.config.timeframe,
+                limit=self.config.data.kline_limit,
+                url=self.config.data.stream_url or None,
+                depth=self.config.data.order_books,
+            )
+
         # Main loop
         while self.running:
             try:
                 await self._trading_cycle()
-                await asyncio.sleep(self.config.cycle_interval)
+                await self._wait_next_cycle()
             except KeyboardInterrupt:
                 self.logger.info("Shutting down...")
                 self.running = False
@@ -74,35 +112,70 @@ class Engine:
                 self.logger.error("Error in trading cycle", error=str(e))
                 await asyncio.sleep(60)
 
+    async def _wait_next_cycle(self):
+        """Sleep for cycle_interval, or until a candle closes when streaming.
+
+        No closed candle within cycle_interval falls back to a polling
+        cycle; that is routine when the timeframe is longer than the cycle,
+        and only worth a warning when the stream is offline.
+        """
+        stream = self.skills["market_data"].stream
+        if stream is None:
+            await asyncio.sleep(self.config.cycle_interval)
+            return
+        try:
+            closed = await stream.wait_closed(timeout=self.config.cycle_interval)
+        except asyncio.TimeoutError:
+            if stream.online:
+                self.logger.debug("No candle closed within cycle interval, polling",
+                                  interval=self.config.cycle_interval)
+            else:
+                self.logger.warning("Market stream offline, polling",
+                                    reconnects=stream.reconnects)
+            return
+        self.logger.info("Candle closed",
+                         pairs=sorted({c.symbol for c in closed}))
+
     async def _trading_cycle(self):
         """One complete cycle: analyze -> decide -> execute."""
 
-        # 1. Get market data
-        market_data = {}
-        for pair in self.config.trading_pairs:
-            market_data[pair] = await self.skills["market_data"].get_klines(
-                symbol=pair,
-                interval=self.config.timeframe,
-                limit=100,
-            )
-
-        # 2. Technical analysis
-        analysis = {}
-        for pair, data in market_data.items():
-            analysis[pair] = self.skills["technical"].analyze(data)
-
-        # 3. Agent decides (LLM)
+        # 1-2. Market data + technical analysis, fanned out across pairs
+        result = await self.pipeline.run(self.config.trading_pairs)
+        if not result.analysis:
+            self.logger.warning("No pair analyzed, skipping decision",
+                              errors=result.errors)
+            return
+        market_data = result.market_data
+        analysis = result.analysis
+        for family, scheduler in self.transport.schedulers.items():
+            self.logger.debug("Exchange request budget", api=family,
+                              **scheduler.metrics())
+        self.logger.debug("Analysis cache", **self.skills["technical"].memo.stats())
+
+        # 3. Strategy ensemble votes on the cached analysis
+        signals = {}
+        if self.ensemble is not None:
+            signals = self.ensemble.evaluate(analysis)
+            self.ensemble.save(Path(self.config.ensemble.signals_path))
+            self.logger.debug("Strategy ensemble",
+                              pairs=len(signals),
+                              elapsed_ms=round(self.ensemble.elapsed_ms, 3))
+
+        # 4. Agent decides (LLM)
         decision = await self.agent.decide(
             market_data=market_data,
             analysis=analysis,
             session=self.session,
+            signals=signals,
         )
 
-        # 4. CrystalBox — capture reasoning
+        # 5. CrystalBox — capture reasoning
         self.reasoning.capture(decision)
         self.audit.log(decision)
+        for fill in self.agent.fills:
+            self.audit.log_fill(fill, decision.reasoning, decision.confidence)
 
-        # 5. Execute trade if the agent decided to act
+        # 6. Execute trade if the agent decided to act
         if decision.action != "HOLD":
             if self.config.mode == "live":
                 result = await self.skills["spot_trading"].execute(decision)
@@ -119,3 +192,6 @@ class Engine:
 
     async def stop(self):
         self.running = False
+        await self.skills["market_data"].stop_stream()
+        self.pipeline.shutdown()
+        await self.transport.close()
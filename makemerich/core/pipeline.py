@@ -0,0 +1,119 @@
+"""Market pipeline — concurrent fetch and analysis across trading pairs.
+
+Klines for every pair are fetched concurrently (bounded, so 50+ pairs do not
+flood the transport) and each pair's technical analysis runs on a worker
+pool as soon as its data arrives, keeping the event loop free. A failing
+pair is reported, not fatal: the rest of the cycle carries on.
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from makemerich.core.logger import get_logger
+
+
+@dataclass
+class PairResult:
+    pair: str
+    klines: list = field(default_factory=list)
+    analysis: dict = field(default_factory=dict)
+    fetch_ms: float = 0.0
+    analysis_ms: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class PipelineResult:
+    pairs: Dict[str, PairResult]
+    elapsed_ms: float
+
+    @property
+    def market_data(self) -> Dict[str, list]:
+        return {p: r.klines for p, r in self.pairs.items() if r.ok}
+
+    @property
+    def analysis(self) -> Dict[str, dict]:
+        return {p: r.analysis for p, r in self.pairs.items() if r.ok}
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        return {p: r.error for p, r in self.pairs.items() if not r.ok}
+
+    @property
+    def timings(self) -> Dict[str, dict]:
+        return {
+            p: {"fetch_ms": r.fetch_ms, "analysis_ms": r.analysis_ms}
+            for p, r in self.pairs.items()
+        }
+
+
+class MarketPipeline:
+    """Fan-out stage: fetch klines and analyze every pair concurrently."""
+
+    def __init__(self, config, skills, executor: Executor = None):
+        self.config = config
+        self.skills = skills
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=config.data.analysis_workers,
+            thread_name_prefix="analysis",
+        )
+        self.logger = get_logger("pipeline")
+
+    async def run(self, pairs: List[str]) -> PipelineResult:
+        """Fetch and analyze ``pairs``; never raises for a single pair."""
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.config.data.fetch_concurrency)
+        results = await asyncio.gather(*[
+            self._process(pair, semaphore) for pair in pairs
+        ])
+        result = PipelineResult(
+            pairs={r.pair: r for r in results},
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+
+        for pair, error in result.errors.items():
+            self.logger.warning("Pair dropped from cycle", pair=pair, error=error)
+        self.logger.info("Market pipeline finished",
+                         pairs=len(pairs),
+                         failed=len(result.errors),
+                         elapsed_ms=round(result.elapsed_ms, 1))
+        return result
+
+    async def _process(self, pair: str,
+                       semaphore: asyncio.Semaphore) -> PairResult:
+        result = PairResult(pair=pair)
+        loop = asyncio.get_running_loop()
+        try:
+            start = time.perf_counter()
+            async with semaphore:
+                result.klines = await self.skills["market_data"].get_klines(
+                    symbol=pair,
+                    interval=self.config.timeframe,
+                    limit=self.config.data.kline_limit,
+                )
+            result.fetch_ms = (time.perf_counter() - start) * 1000
+            if not result.klines:
+                raise ValueError("No kline data returned")
+
+            start = time.perf_counter()
+            result.analysis = await loop.run_in_executor(
+                self.executor, functools.partial(
+                    self.skills["technical"].analyze_incremental,
+                    pair, self.config.timeframe, result.klines,
+                ),
+            )
+            result.analysis_ms = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            result.error = str(e)
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -23,16 +23,38 @@ class AuditLog:
 
     def log(self, decision) -> str:
         """Log a decision with chained hash (tamper-evident)."""
-        entry = {
+        return self._append({
             "timestamp": datetime.utcnow().isoformat(),
             "action": decision.action,
             "pair": decision.pair,
             "amount": decision.amount,
+            "price": decision.price,
             "reasoning": decision.reasoning,
             "confidence": decision.confidence,
-            "prev_hash": self._last_hash,
-        }
+        })
 
+    def log_fill(self, fill: dict, reasoning: str = "",
+                 confidence: float = None) -> str:
+        """Log an executed order from its SpotTradingSkill result.
+
+        ``amount`` is the executed base quantity and ``price`` the average
+        fill price, on both sides, so round trips can be valued.
+        """
+        return self._append({
+            "timestamp": datetime.utcnow().isoformat(),
+            "action": fill["side"],
+            "pair": fill["symbol"],
+            "amount": fill["executed_qty"],
+            "price": fill["avg_price"],
+            "quote_qty": fill["quote_qty"],
+            "order_id": fill["order_id"],
+            "fill": True,
+            "reasoning": reasoning,
+            "confidence": confidence,
+        })
+
+    def _append(self, entry: dict) -> str:
+        entry["prev_hash"] = self._last_hash
         entry_str = json.dumps(entry, sort_keys=True)
         entry["hash"] = hashlib.sha256(entry_str.encode()).hexdigest()
         self._last_hash = entry["hash"]
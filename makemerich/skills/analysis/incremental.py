@@ -0,0 +1,301 @@
+"""Streaming indicators — constant work per new or revised candle.
+
+Each indicator keeps just the state its recursion needs (an EMA value, a
+Wilder average, a fixed ring of recent inputs with running sums) instead of
+recomputing over the whole window. ``update(..., revise=True)`` replaces
+the newest input — the still-forming candle — by rolling back to the state
+saved before it was applied.
+
+Fed the same candles, the values equal the ``ta`` library's (``adjust=False``
+EMAs, Wilder RSI/ATR, population std for Bollinger). Kept running past the
+analysis window they carry their full history, where a windowed recompute
+re-seeds the recursions at the window start; the two converge as the seed's
+weight decays.
+"""
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from makemerich.skills.klines import KlineFrame
+
+NAN = float("nan")
+
+
+class EMA:
+    """Recursive exponential moving average, seeded with the first input."""
+
+    def __init__(self, window: int = None, alpha: float = None,
+                 min_periods: int = None):
+        self.alpha = alpha if alpha is not None else 2 / (window + 1)
+        self.min_periods = min_periods if min_periods is not None else window
+        self.count = 0
+        self._value = NAN
+        self._saved = (0, NAN)
+
+    def update(self, x: float, revise: bool = False) -> float:
+        if revise:
+            self.count, self._value = self._saved
+        else:
+            self._saved = (self.count, self._value)
+        if self.count == 0:
+            self._value = x
+        else:
+            self._value += self.alpha * (x - self._value)
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._value if self.count >= self.min_periods else NAN
+
+
+class RollingWindow:
+    """The last ``window`` inputs in a ring, with running sum and sum of squares.
+
+    The sums are recomputed from the ring once per full turn, so rounding
+    error never accumulates beyond one window's worth of updates. NaN inputs
+    are counted rather than summed; any NaN in the window makes its mean NaN.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self._ring = np.zeros(window)
+        self._i = -1
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._nans = 0
+
+    def update(self, x: float, revise: bool = False):
+        if not (revise and self.count):
+            self._i = (self._i + 1) % self.window
+            self.count += 1
+        old = self._ring[self._i]
+        self._ring[self._i] = x
+        if self._i == self.window - 1:
+            valid = self._ring[~np.isnan(self._ring)]
+            self._nans = self.window - len(valid)
+            self._sum = float(valid.sum())
+            self._sumsq = float(np.dot(valid, valid))
+            return
+        if math.isnan(old):
+            self._nans -= 1
+        else:
+            self._sum -= old
+            self._sumsq -= old * old
+        if math.isnan(x):
+            self._nans += 1
+        else:
+            self._sum += x
+            self._sumsq += x * x
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.window and not self._nans
+
+    @property
+    def last(self) -> float:
+        return float(self._ring[self._i]) if self.count else NAN
+
+    def ago(self, n: int) -> float:
+        """The input ``n`` updates before the newest (``n < window``)."""
+        return float(self._ring[(self._i - n) % self.window])
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self.window if self.full else NAN
+
+    @property
+    def std(self) -> float:
+        if not self.full:
+            return NAN
+        mean = self._sum / self.window
+        return math.sqrt(max(self._sumsq / self.window - mean * mean, 0.0))
+
+    @property
+    def min(self) -> float:
+        return float(self._ring.min()) if self.full else NAN
+
+    @property
+    def max(self) -> float:
+        return float(self._ring.max()) if self.full else NAN
+
+
+class RSI:
+    """Wilder's RSI: smoothed gains over smoothed losses."""
+
+    def __init__(self, window: int = 14):
+        self.up = EMA(alpha=1 / window, min_periods=window)
+        self.down = EMA(alpha=1 / window, min_periods=window)
+        self._prev_close = NAN
+        self._saved = NAN
+
+    def update(self, close: float, revise: bool = False):
+        if revise:
+            self._prev_close = self._saved
+        else:
+            self._saved = self._prev_close
+        diff = 0.0 if math.isnan(self._prev_close) else close - self._prev_close
+        self.up.update(max(diff, 0.0), revise)
+        self.down.update(max(-diff, 0.0), revise)
+        self._prev_close = close
+
+    @property
+    def value(self) -> float:
+        down = self.down.value
+        if math.isnan(down):
+            return NAN
+        if down == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.up.value / down)
+
+
+class MACD:
+    """EMA(fast) - EMA(slow), with an EMA(signal) of the MACD line."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal_ema = EMA(signal)
+
+    def update(self, close: float, revise: bool = False):
+        self.fast.update(close, revise)
+        self.slow.update(close, revise)
+        # The signal line starts at the first defined MACD value
+        if not math.isnan(self.slow.value):
+            self.signal_ema.update(self.macd, revise)
+
+    @property
+    def macd(self) -> float:
+        return self.fast.value - self.slow.value
+
+    @property
+    def signal(self) -> float:
+        return self.signal_ema.value
+
+
+class ATR:
+    """Average true range: the mean of the first ``window`` ranges, then Wilder."""
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.count = 0
+        self.value = 0.0
+        self._tr_sum = 0.0
+        self._prev_close = NAN
+        self._saved = (0, 0.0, 0.0, NAN)
+
+    def update(self, high: float, low: float, close: float, revise: bool = False):
+        if revise:
+            self.count, self.value, self._tr_sum, self._prev_close = self._saved
+        else:
+            self._saved = (self.count, self.value, self._tr_sum, self._prev_close)
+        prev = self._prev_close
+        tr = high - low
+        if not math.isnan(prev):
+            tr = max(tr, abs(high - prev), abs(low - prev))
+        self.count += 1
+        if self.count < self.window:
+            self._tr_sum += tr
+        elif self.count == self.window:
+            self.value = (self._tr_sum + tr) / self.window
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / self.window
+        self._prev_close = close
+
+
+class Stochastic:
+    """%K over the high/low range of ``window`` candles, %D its moving average."""
+
+    def __init__(self, window: int = 14, smooth: int = 3):
+        self.highs = RollingWindow(window)
+        self.lows = RollingWindow(window)
+        self.k_values = RollingWindow(smooth)
+
+    def update(self, high: float, low: float, close: float, revise: bool = False):
+        self.highs.update(high, revise)
+        self.lows.update(low, revise)
+        lo, hi = self.lows.min, self.highs.max
+        self.k_values.update(100 * (close - lo) / (hi - lo) if hi != lo else NAN,
+                             revise)
+
+    @property
+    def k(self) -> float:
+        return self.k_values.last
+
+    @property
+    def d(self) -> float:
+        return self.k_values.mean
+
+
+class IndicatorSet:
+    """Every indicator of ``TechnicalAnalysisSkill.analyze`` for one series."""
+
+    def __init__(self):
+        self.rsi = RSI(14)
+        self.macd = MACD()
+        self.bollinger = RollingWindow(20)
+        self.volume = RollingWindow(20)
+        self.ema_20 = EMA(20)
+        self.ema_50 = EMA(50)
+        self.atr = ATR(14)
+        self.stoch = Stochastic(14, 3)
+        self.closes = RollingWindow(25)
+        self.last_open_time: Optional[int] = None
+
+    def update(self, frame: KlineFrame) -> bool:
+        """Apply the candles of ``frame`` not seen yet; revise the newest seen.
+
+        Returns False if ``frame`` doesn't continue the series (it doesn't
+        contain the newest candle seen): the caller should start over.
+        """
+        if not len(frame):
+            return True
+        start = 0
+        if self.last_open_time is not None:
+            start = int(np.searchsorted(frame.timestamp, self.last_open_time))
+            if start == len(frame) or frame.timestamp[start] != self.last_open_time:
+                return False
+        rows = zip(*(col[start:].tolist() for col in (
+            frame.timestamp, frame.high, frame.low, frame.close, frame.volume)))
+        for i, (ts, high, low, close, volume) in enumerate(rows):
+            self.update_candle(high, low, close, volume,
+                               revise=i == 0 and self.last_open_time is not None)
+            self.last_open_time = ts
+        return True
+
+    def update_candle(self, high: float, low: float, close: float,
+                      volume: float, revise: bool = False):
+        self.rsi.update(close, revise)
+        self.macd.update(close, revise)
+        self.bollinger.update(close, revise)
+        self.volume.update(volume, revise)
+        self.ema_20.update(close, revise)
+        self.ema_50.update(close, revise)
+        self.atr.update(high, low, close, revise)
+        self.stoch.update(high, low, close, revise)
+        self.closes.update(close, revise)
+
+    def values(self) -> dict:
+        """Raw (unrounded) indicator values at the newest candle."""
+        lookback = min(24, self.closes.count - 1)
+        mid, std = self.bollinger.mean, self.bollinger.std
+        return {
+            "current_price": self.closes.last,
+            "close_24h_ago": self.closes.ago(lookback),
+            "rsi": self.rsi.value,
+            "macd": self.macd.macd,
+            "macd_signal": self.macd.signal,
+            "bb_upper": mid + 2 * std,
+            "bb_lower": mid - 2 * std,
+            "bb_middle": mid,
+            "volume": self.volume.last,
+            "volume_sma": self.volume.mean,
+            "ema_20": self.ema_20.value,
+            "ema_50": self.ema_50.value if self.ema_50.count >= 50 else None,
+            "atr": self.atr.value,
+            "stoch_k": self.stoch.k,
+            "stoch_d": self.stoch.d,
+        }
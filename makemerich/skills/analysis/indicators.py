@@ -0,0 +1,256 @@
+"""Vectorized indicator kernels over (pairs x candles) matrices.
+
+Every function takes 2-D float arrays with one row per series and one
+column per candle (1-D input is treated as a single row) and returns arrays
+of the same shape. Rows may be left-padded with NaN when series have
+different lengths; each row then behaves as if it started at its first
+value. Recursive indicators loop over candles once, vectorized across all
+rows, so analyzing N pairs costs about the same number of NumPy passes as
+analyzing one. A single long series (a backtest) is smoothed in closed form
+over blocks of candles instead (``_smooth``), equal to the loop up to float
+rounding, since per-candle NumPy calls on one-element columns would cost far
+more than the arithmetic; rows with gaps inside take a plain float loop.
+
+The definitions follow the ``ta`` library: ``adjust=False`` EMAs seeded
+with the first value, Wilder smoothing for RSI and ATR, population standard
+deviation for Bollinger bands, and NaN until an indicator's window is full.
+"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def as_matrix(values) -> np.ndarray:
+    return np.atleast_2d(np.asarray(values, dtype=np.float64))
+
+
+def valid_count(x: np.ndarray) -> np.ndarray:
+    """Running count of non-NaN values along each row."""
+    return np.cumsum(~np.isnan(x), axis=-1)
+
+
+def ema(x, window: int = None, alpha: float = None,
+        min_periods: int = None) -> np.ndarray:
+    """Exponential moving average, seeded with each row's first value."""
+    x = as_matrix(x)
+    alpha = alpha if alpha is not None else 2 / (window + 1)
+    min_periods = min_periods if min_periods is not None else window
+    if x.shape[0] == 1:
+        out = np.array([_ema_row(x[0], alpha)])
+    else:
+        out = np.empty_like(x)
+        prev = np.full(x.shape[0], np.nan)
+        for t in range(x.shape[1]):
+            cur = x[:, t]
+            step = prev + alpha * (cur - prev)
+            prev = np.where(np.isnan(prev), cur, np.where(np.isnan(cur), prev, step))
+            out[:, t] = prev
+    out[valid_count(x) < min_periods] = np.nan
+    return out
+
+
+def _ema_row(row: np.ndarray, alpha: float) -> np.ndarray:
+    valid = ~np.isnan(row)
+    first = int(valid.argmax())
+    if not valid[first] or not valid[first:].all():
+        return np.array(_ema_loop(row.tolist(), alpha))
+    out = np.full(len(row), np.nan)
+    out[first] = row[first]
+    out[first + 1:] = _smooth(row[first + 1:], alpha, row[first])
+    return out
+
+
+def _ema_loop(values: list, alpha: float) -> list:
+    out = [math.nan] * len(values)
+    prev = math.nan
+    for i, cur in enumerate(values):
+        if cur == cur:  # not NaN
+            prev = cur if prev != prev else prev + alpha * (cur - prev)
+        out[i] = prev
+    return out
+
+
+def _smooth(x: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """``y[t] = y[t-1] + alpha * (x[t] - y[t-1])`` from ``y[-1] = seed``.
+
+    Within a block of candles the recurrence is a scaled cumulative sum;
+    only the carry between blocks is a Python loop. Blocks are kept short
+    enough that the ``(1 - alpha) ** -j`` scaling costs at most ~4 digits.
+    """
+    c = 1.0 - alpha
+    if not len(x) or c <= 0:
+        return x.copy()
+    block = int(min(64, max(1, math.log(1e4) / -math.log(c) + 1)))
+    out = np.zeros(-(-len(x) // block) * block)
+    out[:len(x)] = x
+    out = out.reshape(-1, block)
+    j = np.arange(block)
+    out *= alpha * c ** -j
+    np.cumsum(out, axis=1, out=out)
+    out *= c ** j
+    step, prev, carry = c ** block, seed, []
+    for last in out[:, -1].tolist():
+        carry.append(prev)
+        prev = step * prev + last
+    out += np.multiply.outer(carry, c ** (j + 1))
+    return out.ravel()[:len(x)]
+
+
+def _windows(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing windows per column; the first ``window - 1`` columns get none."""
+    return sliding_window_view(x, window, axis=-1)
+
+
+def _pad(values: np.ndarray, x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[:, window - 1:] = values
+    return out
+
+
+def _window_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Sums over trailing windows as ``window`` shifted adds.
+
+    Contiguous adds beat reducing a strided window view several times
+    over, and unlike a cumulative sum keep no error across the series.
+    """
+    n = x.shape[1] - window + 1
+    out = x[:, :n].copy()
+    for i in range(1, window):
+        out += x[:, i:i + n]
+    return out
+
+
+def sma(x, window: int) -> np.ndarray:
+    x = as_matrix(x)
+    if x.shape[1] < window:
+        return np.full(x.shape, np.nan)
+    return _pad(_window_sum(x, window) / window, x, window)
+
+
+def rolling_std(x, window: int) -> np.ndarray:
+    """Population (ddof=0) standard deviation over trailing windows."""
+    x = as_matrix(x)
+    if x.shape[1] < window:
+        return np.full(x.shape, np.nan)
+    n = x.shape[1] - window + 1
+    mean = _window_sum(x, window) / window
+    total, dev = np.zeros_like(mean), np.empty_like(mean)
+    for i in range(window):
+        np.subtract(x[:, i:i + n], mean, out=dev)
+        dev *= dev
+        total += dev
+    return _pad(np.sqrt(total / window), x, window)
+
+
+def rolling_min(x, window: int) -> np.ndarray:
+    x = as_matrix(x)
+    if x.shape[1] < window:
+        return np.full(x.shape, np.nan)
+    return _pad(_windows(x, window).min(axis=-1), x, window)
+
+
+def rolling_max(x, window: int) -> np.ndarray:
+    x = as_matrix(x)
+    if x.shape[1] < window:
+        return np.full(x.shape, np.nan)
+    return _pad(_windows(x, window).max(axis=-1), x, window)
+
+
+def rsi(close, window: int = 14) -> np.ndarray:
+    """Wilder's RSI; a row's first change counts as zero."""
+    close = as_matrix(close)
+    diff = np.diff(close, axis=-1, prepend=np.nan)
+    diff[np.isnan(diff) & ~np.isnan(close)] = 0.0
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    up[np.isnan(diff)] = down[np.isnan(diff)] = np.nan
+    up = ema(up, alpha=1 / window, min_periods=window)
+    down = ema(down, alpha=1 / window, min_periods=window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100 - 100 / (1 + up / down)
+    return np.where(down == 0, 100.0, value)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD line, signal line and histogram."""
+    close = as_matrix(close)
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, window: int = 20, dev: float = 2.0):
+    """Upper, middle and lower bands."""
+    middle = sma(close, window)
+    std = rolling_std(close, window)
+    return middle + dev * std, middle, middle - dev * std
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = as_matrix(high), as_matrix(low), as_matrix(close)
+    prev = np.concatenate([np.full((close.shape[0], 1), np.nan), close[:, :-1]], axis=1)
+    ranges = np.stack([high - low, np.abs(high - prev), np.abs(low - prev)])
+    out = np.fmax(np.fmax(ranges[0], ranges[1]), ranges[2])
+    out[np.isnan(close)] = np.nan
+    return out
+
+
+def atr(high, low, close, window: int = 14) -> np.ndarray:
+    """Mean of the first ``window`` true ranges, then Wilder; 0 before that."""
+    tr = true_range(high, low, close)
+    count = valid_count(tr)
+    if tr.shape[0] == 1:
+        return np.array([_atr_row(tr[0], count[0], window)])
+    out = np.zeros_like(tr)
+    total = np.zeros(tr.shape[0])
+    value = np.zeros(tr.shape[0])
+    for t in range(tr.shape[1]):
+        cur = np.nan_to_num(tr[:, t])
+        n = count[:, t]
+        total = total + cur
+        value = np.where(n == window, total / window,
+                         np.where(n > window, (value * (window - 1) + cur) / window, 0.0))
+        out[:, t] = value
+    return out
+
+
+def _atr_row(tr: np.ndarray, count: np.ndarray, window: int) -> np.ndarray:
+    valid = ~np.isnan(tr)
+    first = int(valid.argmax())
+    if not valid[first] or not valid[first:].all():
+        return np.array(_atr_loop(tr.tolist(), count.tolist(), window))
+    out = np.zeros(len(tr))
+    start = first + window - 1  # the first full window
+    if start < len(tr):
+        out[start] = np.sum(tr[first:start + 1]) / window
+        out[start + 1:] = _smooth(tr[start + 1:], 1 / window, out[start])
+    return out
+
+
+def _atr_loop(tr: list, count: list, window: int) -> list:
+    out = []
+    total = value = 0.0
+    for cur, n in zip(tr, count):
+        cur = 0.0 if math.isnan(cur) else cur
+        total = total + cur
+        if n == window:
+            value = total / window
+        elif n > window:
+            value = (value * (window - 1) + cur) / window
+        else:
+            value = 0.0
+        out.append(value)
+    return out
+
+
+def stochastic(high, low, close, window: int = 14, smooth: int = 3):
+    """%K and its ``smooth``-candle moving average %D."""
+    close = as_matrix(close)
+    lo = rolling_min(low, window)
+    hi = rolling_max(high, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * (close - lo) / (hi - lo)
+    k[hi == lo] = np.nan
+    return k, sma(k, smooth)
@@ -0,0 +1,60 @@
+"""Memoized analysis results keyed by candle fingerprint.
+
+With a 60 s cycle on 1h candles, a pair's window changes only when a new
+trade moves the forming candle. The fingerprint — symbol, interval, window
+length and the newest candle's open time, close and volume — identifies
+such an unchanged window, and its analysis is served from a bounded LRU
+cache instead of being recomputed.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from makemerich.skills.klines import KlineFrame
+
+
+def fingerprint(symbol: str, interval: str, frame: KlineFrame) -> tuple:
+    return (symbol, interval, len(frame), int(frame.timestamp[-1]),
+            float(frame.close[-1]), float(frame.volume[-1]))
+
+
+class AnalysisMemo:
+    """Thread-safe LRU of analysis results with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        result = compute()
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -1,70 +1,235 @@
-"""Candlestick pattern detection skill."""
+"""Candlestick pattern detection skill.
+
+Patterns are found by ``scan``, which marks every occurrence across a whole
+series with boolean-mask NumPy operations: each multi-candle rule compares
+the series against copies of itself shifted by one and two candles, so a
+scan costs a few array passes regardless of length. ``PatternScanner``
+keeps the masks of a growing series and scans only candles it hasn't seen.
+"""
+
+from typing import Dict, Tuple
 
-import pandas as pd
 import numpy as np
 
+from makemerich.skills.analysis.memo import AnalysisMemo, fingerprint
 from makemerich.skills.base import BaseSkill
+from makemerich.skills.klines import as_frame
+
+# name -> (signal, confidence); detection order of detect()
+PATTERNS = {
+    "doji": ("indecision", 0.7),
+    "hammer": ("bullish_reversal", 0.65),
+    "bullish_engulfing": ("bullish_reversal", 0.75),
+    "bearish_engulfing": ("bearish_reversal", 0.75),
+    "bullish_harami": ("bullish_reversal", 0.6),
+    "bearish_harami": ("bearish_reversal", 0.6),
+    "morning_star": ("bullish_reversal", 0.7),
+    "evening_star": ("bearish_reversal", 0.7),
+    "three_white_soldiers": ("bullish_continuation", 0.7),
+    "three_black_crows": ("bearish_continuation", 0.7),
+}
+
+# Candles before the newest one that a pattern may span
+LOOKBACK = 2
+
+
+def _shift(x: np.ndarray, n: int) -> np.ndarray:
+    """``x`` delayed by ``n`` candles, NaN where there is no earlier candle."""
+    out = np.full(len(x), np.nan)
+    out[n:] = x[:len(x) - n]
+    return out
+
+
+def scan(open_, high, low, close) -> Dict[str, np.ndarray]:
+    """Boolean mask per pattern, True at the candle that completes it."""
+    o, h, l, c = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close))
+    body = np.abs(c - o)
+    span = h - l
+    top, bottom = np.maximum(o, c), np.minimum(o, c)
+    up, down = c > o, c < o
+
+    o1, c1, body1 = _shift(o, 1), _shift(c, 1), _shift(body, 1)
+    o2, c2, body2 = _shift(o, 2), _shift(c, 2), _shift(body, 2)
+    span1, span2 = _shift(span, 1), _shift(span, 2)
+    up1, down1 = c1 > o1, c1 < o1
+    up2, down2 = c2 > o2, c2 < o2
+    # Candles with a body of at least half their range
+    solid = body >= 0.5 * span
+    solid1, solid2 = body1 >= 0.5 * span1, body2 >= 0.5 * span2
+    star = body1 <= 0.3 * body2
+    midpoint2 = (o2 + c2) / 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        doji = (span > 0) & (body / span < 0.1)
+    return {
+        "doji": doji,
+        "hammer": (span > 0) & (bottom - l > body * 2) & (h - top < body * 0.5),
+        "bullish_engulfing": up & down1 & (o <= c1) & (c >= o1),
+        "bearish_engulfing": down & up1 & (o >= c1) & (c <= o1),
+        "bullish_harami": up & down1 & (o >= c1) & (c <= o1) & (body < body1),
+        "bearish_harami": down & up1 & (o <= c1) & (c >= o1) & (body < body1),
+        "morning_star": (down2 & solid2 & star & (np.fmin(o1, c1) <= c2)
+                         & up & (c > midpoint2)),
+        "evening_star": (up2 & solid2 & star & (np.fmax(o1, c1) >= c2)
+                         & down & (c < midpoint2)),
+        "three_white_soldiers": (up2 & up1 & up & solid2 & solid1 & solid
+                                 & (c1 > c2) & (c > c1)
+                                 & (o1 >= o2) & (o1 <= c2) & (o >= o1) & (o <= c1)),
+        "three_black_crows": (down2 & down1 & down & solid2 & solid1 & solid
+                              & (c1 < c2) & (c < c1)
+                              & (o1 <= o2) & (o1 >= c2) & (o <= o1) & (o >= c1)),
+    }
+
+
+def scan_frame(frame) -> Dict[str, np.ndarray]:
+    return scan(frame.open, frame.high, frame.low, frame.close)
+
+
+class PatternScanner:
+    """Pattern masks of one growing series, scanning only new candles.
+
+    ``update`` takes a window that overlaps what was scanned before (the
+    usual sliding kline window); the newest stored candle is rescanned
+    since it may still have been forming.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._timestamp = np.empty(capacity, dtype=np.int64)
+        self._masks = np.zeros((len(PATTERNS), capacity), dtype=bool)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._timestamp[:self._size]
+
+    @property
+    def masks(self) -> Dict[str, np.ndarray]:
+        return {name: self._masks[i, :self._size] for i, name in enumerate(PATTERNS)}
+
+    def update(self, frame) -> bool:
+        """Scan the candles of ``frame`` from the newest stored one on.
+
+        Returns False, leaving the masks untouched, when ``frame`` doesn't
+        contain that candle with enough earlier context to rescan it.
+        """
+        if not len(frame):
+            return True
+        if self._size:
+            pos = int(np.searchsorted(frame.timestamp, self._timestamp[self._size - 1]))
+            if (pos == len(frame) or frame.timestamp[pos] != self._timestamp[self._size - 1]
+                    or pos < min(LOOKBACK, self._size - 1)):
+                return False
+            keep = self._size - 1
+        else:
+            pos = keep = 0
+
+        start = max(pos - LOOKBACK, 0)
+        masks = scan_frame(frame[start:])
+        new = len(frame) - pos
+        self._reserve(keep + new)
+        self._timestamp[keep:keep + new] = frame.timestamp[pos:]
+        for i, name in enumerate(PATTERNS):
+            self._masks[i, keep:keep + new] = masks[name][pos - start:]
+        self._size = keep + new
+        return True
+
+    def _reserve(self, size: int):
+        capacity = len(self._timestamp)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        timestamp = np.empty(capacity, dtype=np.int64)
+        timestamp[:self._size] = self.timestamp
+        masks = np.zeros((len(PATTERNS), capacity), dtype=bool)
+        masks[:, :self._size] = self._masks[:, :self._size]
+        self._timestamp, self._masks = timestamp, masks
+
+
+def statistics(frame, masks: Dict[str, np.ndarray], horizon: int = 10) -> dict:
+    """Occurrences of each pattern and the close-to-close move that followed.
+
+    ``mean_return`` is the average percent change ``horizon`` candles after
+    the completing candle and ``up_rate`` the share of those that rose;
+    occurrences too close to the end to measure are counted but not scored.
+    """
+    close = frame.close
+    forward = np.full(len(close), np.nan)
+    if len(close) > horizon:
+        forward[:-horizon] = (close[horizon:] / close[:-horizon] - 1) * 100
+
+    stats = {}
+    for name, mask in masks.items():
+        moves = forward[mask]
+        moves = moves[~np.isnan(moves)]
+        stats[name] = {
+            "count": int(mask.sum()),
+            "mean_return": round(float(moves.mean()), 4) if len(moves) else None,
+            "up_rate": round(float((moves > 0).mean()), 4) if len(moves) else None,
+        }
+    return stats
 
 
 class PatternDetectionSkill(BaseSkill):
     """Detect candlestick patterns in market data."""
 
     name = "pattern_detection"
-    description = "Detect candlestick patterns (doji, hammer, engulfing, etc.)"
+    description = ("Detect candlestick patterns (doji, hammer, engulfing, harami, "
+                   "stars, three soldiers/crows)")
+
+    def __init__(self, memo_size: int = 256):
+        self.memo = AnalysisMemo(memo_size)
+        self._scanners: Dict[Tuple[str, str], PatternScanner] = {}
 
-    def detect(self, klines: list) -> list:
-        """Detect candlestick patterns in kline data."""
+    def detect(self, klines, symbol: str = None, interval: str = None) -> list:
+        """Detect candlestick patterns in kline data (KlineFrame or dicts).
+
+        Reports the patterns completed by the newest candle. With ``symbol``
+        and ``interval`` an unchanged window (same candle fingerprint) is
+        answered from the memo.
+        """
         if len(klines) < 3:
             return []
 
-        df = pd.DataFrame(klines)
-        patterns = []
-
-        # Doji — open and close are very close
-        last = df.iloc[-1]
-        body = abs(last["close"] - last["open"])
-        wick = last["high"] - last["low"]
-        if wick > 0 and body / wick < 0.1:
-            patterns.append({
-                "pattern": "doji",
-                "signal": "indecision",
-                "confidence": 0.7,
-            })
-
-        # Hammer — small body at top, long lower wick
-        if wick > 0:
-            lower_wick = min(last["open"], last["close"]) - last["low"]
-            upper_wick = last["high"] - max(last["open"], last["close"])
-            if lower_wick > body * 2 and upper_wick < body * 0.5:
-                patterns.append({
-                    "pattern": "hammer",
-                    "signal": "bullish_reversal",
-                    "confidence": 0.65,
-                })
-
-        # Engulfing — current candle engulfs previous
-        if len(df) >= 2:
-            prev = df.iloc[-2]
-            curr_bullish = last["close"] > last["open"]
-            prev_bearish = prev["close"] < prev["open"]
-
-            if curr_bullish and prev_bearish:
-                if last["open"] <= prev["close"] and last["close"] >= prev["open"]:
-                    patterns.append({
-                        "pattern": "bullish_engulfing",
-                        "signal": "bullish_reversal",
-                        "confidence": 0.75,
-                    })
-
-            curr_bearish = last["close"] < last["open"]
-            prev_bullish = prev["close"] > prev["open"]
-
-            if curr_bearish and prev_bullish:
-                if last["open"] >= prev["close"] and last["close"] <= prev["open"]:
-                    patterns.append({
-                        "pattern": "bearish_engulfing",
-                        "signal": "bearish_reversal",
-                        "confidence": 0.75,
-                    })
-
-        return patterns
+        frame = as_frame(klines)
+        if symbol is None or interval is None:
+            return self._detect(frame)
+        patterns = self.memo.get_or_compute(
+            fingerprint(symbol, interval, frame), lambda: self._detect(frame))
+        return [dict(p) for p in patterns]
+
+    def scan(self, klines) -> Dict[str, np.ndarray]:
+        """Every pattern occurrence across the series, as boolean masks."""
+        return scan_frame(as_frame(klines))
+
+    def scan_incremental(self, symbol: str, interval: str,
+                         klines) -> Dict[str, np.ndarray]:
+        """Masks for every candle seen for this series, scanning only new ones.
+
+        The result also holds the aligned ``timestamp`` array; all arrays
+        are views, valid until the next call for the series. A window that
+        doesn't continue the stored series starts it over.
+        """
+        frame = as_frame(klines)
+        key = (symbol, interval)
+        scanner = self._scanners.get(key)
+        if scanner is None or not scanner.update(frame):
+            scanner = self._scanners[key] = PatternScanner()
+            scanner.update(frame)
+        return {"timestamp": scanner.timestamp, **scanner.masks}
+
+    def statistics(self, klines, horizon: int = 10) -> dict:
+        """Per-pattern counts and forward returns over the whole series."""
+        frame = as_frame(klines)
+        return statistics(frame, scan_frame(frame), horizon)
+
+    def _detect(self, frame) -> list:
+        masks = scan_frame(frame[-(LOOKBACK + 1):])
+        return [
+            {"pattern": name, "signal": signal, "confidence": confidence}
+            for name, (signal, confidence) in PATTERNS.items()
+            if masks[name][-1]
+        ]
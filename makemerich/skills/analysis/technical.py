@@ -1,10 +1,64 @@
-"""Technical analysis skill — RSI, MACD, Bollinger Bands, and more."""
+"""Technical analysis skill — RSI, MACD, Bollinger Bands, and more.
+
+Indicators are computed with the NumPy kernels in ``indicators`` by
+default. The ``ta`` library (with pandas) is an optional reference backend,
+imported only when selected.
+"""
+
+import asyncio
+import copy
+import time
+from typing import Dict, Mapping, Sequence, Tuple, Union
 
-import pandas as pd
 import numpy as np
-import ta
+from numpy.lib.stride_tricks import sliding_window_view
 
+from makemerich.skills.analysis import indicators
+from makemerich.skills.analysis.incremental import IndicatorSet
+from makemerich.skills.analysis.memo import AnalysisMemo, fingerprint
+from makemerich.skills.analysis.patterns import PatternDetectionSkill
 from makemerich.skills.base import BaseSkill
+from makemerich.skills.klines import as_frame
+
+# One row of analyze_batch(): the fields of analyze(), with NaN for None
+ANALYSIS_DTYPE = np.dtype([
+    ("current_price", "f8"),
+    ("rsi", "f8"),
+    ("rsi_signal", "U10"),
+    ("macd", "f8"),
+    ("macd_signal", "U7"),
+    ("macd_histogram", "f8"),
+    ("bb_upper", "f8"),
+    ("bb_lower", "f8"),
+    ("bb_middle", "f8"),
+    ("bb_position", "U16"),
+    ("volume_trend", "U13"),
+    ("change_24h", "f8"),
+    ("ema_20", "f8"),
+    ("ema_50", "f8"),
+    ("atr", "f8"),
+    ("stoch_k", "f8"),
+    ("stoch_d", "f8"),
+])
+
+# Indicator groups of _series each analyze_history field is derived from
+FIELD_INDICATORS = {
+    "current_price": (), "change_24h": (),
+    "rsi": ("rsi",), "rsi_signal": ("rsi",),
+    "macd": ("macd",), "macd_signal": ("macd",), "macd_histogram": ("macd",),
+    "bb_upper": ("bollinger",), "bb_lower": ("bollinger",),
+    "bb_middle": ("bollinger",), "bb_position": ("bollinger",),
+    "volume_trend": ("volume_sma",),
+    "ema_20": ("ema_20",), "ema_50": ("ema_50",), "atr": ("atr",),
+    "stoch_k": ("stochastic",), "stoch_d": ("stochastic",),
+}
+ALL_GROUPS = frozenset(g for groups in FIELD_INDICATORS.values() for g in groups)
+
+# bb_position labels by rounded percent of the band width
+BB_MIDDLE_LABELS = np.array([f"middle ({pct}%)" for pct in range(101)])
+
+# Timeframes of detailed_analysis(); each request also covers the next two
+DETAIL_TIMEFRAMES = ("1m", "5m", "15m", "1h", "4h", "1d")
 
 
 class TechnicalAnalysisSkill(BaseSkill):
@@ -13,88 +67,471 @@ class TechnicalAnalysisSkill(BaseSkill):
     name = "technical_analysis"
     description = "Calculate technical indicators: RSI, MACD, Bollinger Bands, etc."
 
-    def analyze(self, klines: list) -> dict:
-        """Run full technical analysis on kline data."""
-        if not klines:
+    def __init__(self, memo_size: int = 256, backend: str = "numpy",
+                 market_data=None, patterns: PatternDetectionSkill = None,
+                 detail_ttl: float = 30.0, kline_limit: int = 100):
+        if backend not in SERIES_BACKENDS:
+            raise ValueError(f"Unknown indicator backend: {backend}")
+        self.backend = backend
+        self.memo = AnalysisMemo(memo_size)
+        self.market_data = market_data
+        self.patterns = patterns or PatternDetectionSkill(memo_size)
+        self.detail_ttl = detail_ttl
+        self.kline_limit = kline_limit
+        self._incremental: Dict[Tuple[str, str], IndicatorSet] = {}
+        self._series: Dict[Tuple[str, str], tuple] = {}
+        self._details: Dict[Tuple[str, str], tuple] = {}
+
+    def analyze(self, klines, symbol: str = None, interval: str = None) -> dict:
+        """Run full technical analysis on kline data (KlineFrame or dicts).
+
+        The scalar view over the last element of ``analyze_series``. With
+        ``symbol`` and ``interval`` an unchanged window (same candle
+        fingerprint) is answered from the memo.
+        """
+        if not len(klines):
             return {"error": "No data available"}
+        if symbol is None or interval is None:
+            return _summary(_last(self.analyze_series(klines)))
 
-        df = pd.DataFrame(klines)
-        close = df["close"]
-        high = df["high"]
-        low = df["low"]
-        volume = df["volume"]
-
-        current_price = close.iloc[-1]
-
-        # RSI
-        rsi = ta.momentum.RSIIndicator(close, window=14)
-        rsi_value = round(rsi.rsi().iloc[-1], 2)
-
-        # MACD
-        macd = ta.trend.MACD(close)
-        macd_value = round(macd.macd().iloc[-1], 4)
-        macd_signal = round(macd.macd_signal().iloc[-1], 4)
-        macd_hist = round(macd.macd_diff().iloc[-1], 4)
-        macd_signal_str = "bullish" if macd_value > macd_signal else "bearish"
-
-        # Bollinger Bands
-        bb = ta.volatility.BollingerBands(close, window=20, window_dev=2)
-        bb_upper = round(bb.bollinger_hband().iloc[-1], 2)
-        bb_lower = round(bb.bollinger_lband().iloc[-1], 2)
-        bb_middle = round(bb.bollinger_mavg().iloc[-1], 2)
-
-        if current_price > bb_upper:
-            bb_position = "above_upper"
-        elif current_price < bb_lower:
-            bb_position = "below_lower"
-        else:
-            bb_pct = (current_price - bb_lower) / (bb_upper - bb_lower)
-            bb_position = f"middle ({round(bb_pct * 100)}%)"
-
-        # Volume trend
-        vol_sma = volume.rolling(window=20).mean().iloc[-1]
-        current_vol = volume.iloc[-1]
-        volume_trend = "above_average" if current_vol > vol_sma else "below_average"
-
-        # 24h change approximation (last vs 24 candles ago for 1h timeframe)
-        lookback = min(24, len(close) - 1)
-        change_24h = round(
-            ((current_price - close.iloc[-lookback - 1]) / close.iloc[-lookback - 1]) * 100, 2
+        frame = as_frame(klines)
+        result = self.memo.get_or_compute(
+            ("analyze",) + fingerprint(symbol, interval, frame),
+            lambda: _summary(_last(self.analyze_series(frame, symbol, interval))),
         )
+        return dict(result)
+
+    def analyze_series(self, klines, symbol: str = None,
+                       interval: str = None) -> Dict[str, np.ndarray]:
+        """Every indicator as an array aligned with the input candles.
+
+        Values are raw (unrounded), NaN where an indicator's window isn't
+        full yet; ``change_24h`` is the percent change over 24 candles.
+        With ``symbol`` and ``interval`` the result is cached under the last
+        candle's close time (revalidated against its close and volume, so a
+        still-forming candle is recomputed) and the arrays are read-only.
+        """
+        frame = as_frame(klines)
+        if symbol is None or interval is None or not len(frame):
+            return SERIES_BACKENDS[self.backend](frame)
+
+        key = (symbol, interval)
+        fingerprint = (int(frame.close_time[-1]), len(frame),
+                       float(frame.close[-1]), float(frame.volume[-1]))
+        cached = self._series.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        series = SERIES_BACKENDS[self.backend](frame)
+        for values in series.values():
+            values.flags.writeable = False
+        self._series[key] = (fingerprint, series)
+        return series
+
+    def analyze_history(self, klines, fields: Sequence[str] = None) -> np.ndarray:
+        """``analyze`` at every candle of a series, as an ``ANALYSIS_DTYPE`` array.
+
+        Row ``i`` holds what ``analyze`` reports with candle ``i`` as the
+        newest, except that recursive indicators (EMAs, RSI, ATR) carry the
+        whole preceding history rather than restarting at a window, as the
+        incremental path does. Built from one ``analyze_series`` pass, for
+        replaying history. With ``fields`` only those columns are returned,
+        and the NumPy backend computes only the indicators behind them.
+        """
+        if fields is None:
+            series = self.analyze_series(klines)
+            fields = ANALYSIS_DTYPE.names
+        else:
+            fields = tuple(fields)
+            unknown = [name for name in fields if name not in FIELD_INDICATORS]
+            if unknown:
+                raise ValueError(f"Unknown analysis fields: {unknown}")
+            series = SERIES_BACKENDS[self.backend](
+                as_frame(klines), {g for name in fields for g in FIELD_INDICATORS[name]})
+        close = series["close"]
+        previous = close[np.maximum(np.arange(len(close)) - 24, 0)]
+        return _summary_batch({**series, "current_price": close,
+                               "close_24h_ago": previous}, fields)
+
+    def analyze_batch(self, klines: Union[Sequence, Mapping[str, np.ndarray]]) -> np.ndarray:
+        """``analyze`` for many pairs at once, one vectorized pass per indicator.
 
-        # EMA
-        ema_20 = round(ta.trend.EMAIndicator(close, window=20).ema_indicator().iloc[-1], 2)
-        ema_50 = round(ta.trend.EMAIndicator(close, window=50).ema_indicator().iloc[-1], 2) if len(close) >= 50 else None
-
-        # ATR
-        atr = ta.volatility.AverageTrueRange(high, low, close, window=14)
-        atr_value = round(atr.average_true_range().iloc[-1], 2)
-
-        # Stochastic
-        stoch = ta.momentum.StochasticOscillator(high, low, close)
-        stoch_k = round(stoch.stoch().iloc[-1], 2)
-        stoch_d = round(stoch.stoch_signal().iloc[-1], 2)
-
-        return {
-            "current_price": current_price,
-            "rsi": rsi_value,
-            "rsi_signal": "oversold" if rsi_value < 30 else "overbought" if rsi_value > 70 else "neutral",
-            "macd": macd_value,
-            "macd_signal": macd_signal_str,
-            "macd_histogram": macd_hist,
-            "bb_upper": bb_upper,
-            "bb_lower": bb_lower,
-            "bb_middle": bb_middle,
-            "bb_position": bb_position,
-            "volume_trend": volume_trend,
-            "change_24h": change_24h,
-            "ema_20": ema_20,
-            "ema_50": ema_50,
-            "atr": atr_value,
-            "stoch_k": stoch_k,
-            "stoch_d": stoch_d,
+        ``klines`` is either a sequence of per-pair klines (KlineFrame or
+        dicts; shorter series are left-padded) or a mapping of ``high``,
+        ``low``, ``close`` and ``volume`` to (pairs x candles) matrices.
+        Returns an ``ANALYSIS_DTYPE`` structured array, one row per pair.
+        """
+        m = klines if isinstance(klines, Mapping) else stack_klines(klines)
+        high, low = indicators.as_matrix(m["high"]), indicators.as_matrix(m["low"])
+        close, volume = indicators.as_matrix(m["close"]), indicators.as_matrix(m["volume"])
+        rows = np.arange(close.shape[0])
+        counts = indicators.valid_count(close)[:, -1]
+
+        macd_line, macd_signal, _ = indicators.macd(close)
+        bb_upper, bb_middle, bb_lower = indicators.bollinger(close, 20, 2)
+        stoch_k, stoch_d = indicators.stochastic(high, low, close)
+        ema_50 = indicators.ema(close, 50)[:, -1]
+        lookback = np.minimum(24, counts - 1)
+
+        return _summary_batch({
+            "current_price": close[:, -1],
+            "close_24h_ago": close[rows, close.shape[1] - 1 - lookback],
+            "rsi": indicators.rsi(close, 14)[:, -1],
+            "macd": macd_line[:, -1],
+            "macd_signal": macd_signal[:, -1],
+            "bb_upper": bb_upper[:, -1],
+            "bb_lower": bb_lower[:, -1],
+            "bb_middle": bb_middle[:, -1],
+            "volume": volume[:, -1],
+            "volume_sma": indicators.sma(volume, 20)[:, -1],
+            "ema_20": indicators.ema(close, 20)[:, -1],
+            "ema_50": np.where(counts >= 50, ema_50, np.nan),
+            "atr": indicators.atr(high, low, close, 14)[:, -1],
+            "stoch_k": stoch_k[:, -1],
+            "stoch_d": stoch_d[:, -1],
+        })
+
+    def analyze_incremental(self, symbol: str, interval: str, klines) -> dict:
+        """``analyze`` from per-series indicator state, updated in O(1) per candle.
+
+        Only candles newer than the last call are applied (the newest one
+        seen is revised), so a cycle costs the new candles, not the window.
+        A series that doesn't continue the previous one starts over, and an
+        unchanged window is answered from the memo.
+        """
+        if not len(klines):
+            return {"error": "No data available"}
+
+        frame = as_frame(klines)
+
+        def compute():
+            key = (symbol, interval)
+            state = self._incremental.get(key)
+            if state is None or not state.update(frame):
+                state = self._incremental[key] = IndicatorSet()
+                state.update(frame)
+            return _summary(state.values())
+
+        result = self.memo.get_or_compute(
+            ("incremental",) + fingerprint(symbol, interval, frame), compute)
+        return dict(result)
+
+    async def detailed_analysis(self, symbol: str, timeframe: str = "1h") -> dict:
+        """Indicators, patterns and key levels on ``timeframe`` and the two above it.
+
+        Candles come from the market data skill's shared kline cache (higher
+        timeframes resampled from base candles where history allows). A
+        result is reused for ``detail_ttl`` seconds, so repeated tool calls
+        within one decision are answered from memory without any request.
+        """
+        if self.market_data is None:
+            return {"error": "Detailed analysis requires the market data skill"}
+        if timeframe not in DETAIL_TIMEFRAMES:
+            return {"error": f"Unsupported timeframe: {timeframe}"}
+
+        key = (symbol, timeframe)
+        cached = self._details.get(key)
+        if cached is not None and time.monotonic() < cached[0]:
+            return copy.deepcopy(cached[1])
+
+        index = DETAIL_TIMEFRAMES.index(timeframe)
+        timeframes = DETAIL_TIMEFRAMES[index:index + 3]
+        frames = await asyncio.gather(*[
+            self.market_data.get_klines(symbol, tf, self.kline_limit)
+            for tf in timeframes
+        ])
+        details = {}
+        for tf, frame in zip(timeframes, frames):
+            try:
+                details[tf] = self._timeframe_detail(symbol, tf, frame)
+            except Exception as e:
+                details[tf] = {"error": f"Analysis failed: {e}"}
+        trends = {d.get("trend") for d in details.values()}
+        result = {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "trend_alignment": ("bullish" if trends == {"up"}
+                                else "bearish" if trends == {"down"} else "mixed"),
+            "timeframes": details,
         }
+        if "error" not in details[timeframe]:
+            self._details[key] = (time.monotonic() + self.detail_ttl, result)
+        return copy.deepcopy(result)
+
+    def _timeframe_detail(self, symbol: str, timeframe: str, frame) -> dict:
+        if not len(frame):
+            return {"error": "No data available"}
+        detail = self.analyze(frame, symbol, timeframe)
+        price, ema_20, ema_50 = detail["current_price"], detail["ema_20"], detail["ema_50"]
+        if ema_50 is not None and price > ema_20 > ema_50:
+            detail["trend"] = "up"
+        elif ema_50 is not None and price < ema_20 < ema_50:
+            detail["trend"] = "down"
+        else:
+            detail["trend"] = "sideways"
+        detail["patterns"] = self.patterns.detect(frame, symbol, timeframe)
+        detail.update(key_levels(frame))
+        return detail
+
+
+def key_levels(frame, order: int = 5, count: int = 3,
+               tolerance: float = 0.005) -> dict:
+    """Nearest support and resistance levels from swing lows and highs.
+
+    A swing high (low) is a candle whose high (low) is the extreme of the
+    ``order`` candles on either side. Levels within ``tolerance`` (relative)
+    of a nearer one are merged into it; the ``count`` nearest levels below
+    and above the last close are returned, closest first.
+    """
+    width = 2 * order + 1
+    if len(frame) < width:
+        return {"support": [], "resistance": []}
+    high, low = frame.high[order:-order], frame.low[order:-order]
+    swing_high = high[high == sliding_window_view(frame.high, width).max(axis=-1)]
+    swing_low = low[low == sliding_window_view(frame.low, width).min(axis=-1)]
+    price = frame.close[-1]
+    return {
+        "support": _nearest_levels(-np.sort(-swing_low[swing_low < price]), count, tolerance),
+        "resistance": _nearest_levels(np.sort(swing_high[swing_high > price]), count, tolerance),
+    }
+
+
+def _nearest_levels(levels: np.ndarray, count: int, tolerance: float) -> list:
+    kept = []
+    for level in levels:
+        if not kept or abs(level - kept[-1]) > tolerance * kept[-1]:
+            kept.append(level)
+            if len(kept) == count:
+                break
+    return [round(float(level), 2) for level in kept]
+
+
+def _series(frame, groups=None) -> Dict[str, np.ndarray]:
+    """Compute the indicator series of one candle frame with the NumPy kernels.
+
+    ``groups`` limits the work to those ``FIELD_INDICATORS`` groups; the
+    candle columns and ``change_24h`` are always included.
+    """
+    close, high, low, volume = frame.close, frame.high, frame.low, frame.volume
+    wanted = set(ALL_GROUPS if groups is None else groups)
+    series = {}
+    if "rsi" in wanted:
+        series["rsi"] = indicators.rsi(close, 14)
+    if "macd" in wanted:
+        series["macd"], series["macd_signal"], series["macd_histogram"] = \
+            indicators.macd(close)
+    if "bollinger" in wanted:
+        series["bb_upper"], series["bb_middle"], series["bb_lower"] = \
+            indicators.bollinger(close, 20, 2)
+    if "volume_sma" in wanted:
+        series["volume_sma"] = indicators.sma(volume, 20)
+    if "ema_20" in wanted:
+        series["ema_20"] = indicators.ema(close, 20)
+    if "ema_50" in wanted:
+        series["ema_50"] = indicators.ema(close, 50)
+    if "atr" in wanted:
+        series["atr"] = indicators.atr(high, low, close, 14)
+    if "stochastic" in wanted:
+        series["stoch_k"], series["stoch_d"] = indicators.stochastic(high, low, close)
+    change = np.full(len(close), np.nan)
+    change[24:] = (close[24:] / close[:-24] - 1) * 100
+    series = {k: v[0] for k, v in series.items()}
+    series.update({
+        "timestamp": frame.timestamp.copy(),
+        "close": close.copy(),
+        "volume": volume.copy(),
+        "change_24h": change,
+    })
+    return series
+
+
+def _series_ta(frame, groups=None) -> Dict[str, np.ndarray]:
+    """Compute the indicator series of one candle frame with ``ta``.
+
+    Computes every indicator; ``groups`` is ignored.
+    """
+    import pandas as pd
+    import ta
+
+    close = pd.Series(frame.close)
+    high = pd.Series(frame.high)
+    low = pd.Series(frame.low)
+    volume = pd.Series(frame.volume)
+
+    macd = ta.trend.MACD(close)
+    bb = ta.volatility.BollingerBands(close, window=20, window_dev=2)
+    stoch = ta.momentum.StochasticOscillator(high, low, close)
+    series = {
+        "timestamp": frame.timestamp.copy(),
+        "close": frame.close.copy(),
+        "volume": frame.volume.copy(),
+        "rsi": ta.momentum.RSIIndicator(close, window=14).rsi(),
+        "macd": macd.macd(),
+        "macd_signal": macd.macd_signal(),
+        "macd_histogram": macd.macd_diff(),
+        "bb_upper": bb.bollinger_hband(),
+        "bb_middle": bb.bollinger_mavg(),
+        "bb_lower": bb.bollinger_lband(),
+        "volume_sma": volume.rolling(window=20).mean(),
+        "ema_20": ta.trend.EMAIndicator(close, window=20).ema_indicator(),
+        "ema_50": ta.trend.EMAIndicator(close, window=50).ema_indicator(),
+        "atr": ta.volatility.AverageTrueRange(high, low, close, window=14)
+                 .average_true_range(),
+        "stoch_k": stoch.stoch(),
+        "stoch_d": stoch.stoch_signal(),
+        "change_24h": close.pct_change(24, fill_method=None) * 100,
+    }
+    return {k: np.asarray(v, dtype=np.float64) if k != "timestamp" else v
+            for k, v in series.items()}
+
+
+SERIES_BACKENDS = {"numpy": _series, "ta": _series_ta}
+
+
+def _last(series: Dict[str, np.ndarray]) -> dict:
+    """Raw values at the newest candle, as ``_summary`` expects them."""
+    close = series["close"]
+    # 24h change approximation (last vs 24 candles ago for 1h timeframe)
+    lookback = min(24, len(close) - 1)
+    values = {
+        key: series[key][-1]
+        for key in ("rsi", "macd", "macd_signal", "bb_upper", "bb_lower",
+                    "bb_middle", "volume", "volume_sma", "ema_20", "atr",
+                    "stoch_k", "stoch_d")
+    }
+    values["current_price"] = close[-1]
+    values["close_24h_ago"] = close[-lookback - 1]
+    values["ema_50"] = series["ema_50"][-1] if len(close) >= 50 else None
+    return values
+
+
+def _summary(v: dict) -> dict:
+    """Round raw indicator values and derive the signal labels."""
+    current_price = v["current_price"]
+    rsi_value = round(v["rsi"], 2)
+    macd_value = round(v["macd"], 4)
+    macd_signal = round(v["macd_signal"], 4)
+    macd_hist = round(v["macd"] - v["macd_signal"], 4)
+    macd_signal_str = "bullish" if macd_value > macd_signal else "bearish"
+
+    bb_upper = round(v["bb_upper"], 2)
+    bb_lower = round(v["bb_lower"], 2)
+    bb_middle = round(v["bb_middle"], 2)
+    if current_price > bb_upper:
+        bb_position = "above_upper"
+    elif current_price < bb_lower:
+        bb_position = "below_lower"
+    elif bb_upper - bb_lower > 0:
+        bb_pct = (current_price - bb_lower) / (bb_upper - bb_lower)
+        bb_position = f"middle ({round(bb_pct * 100)}%)"
+    else:
+        bb_position = None  # bands not formed yet (under 20 candles) or flat
+
+    volume_trend = "above_average" if v["volume"] > v["volume_sma"] else "below_average"
+    previous = v["close_24h_ago"]
+    change_24h = round(((current_price - previous) / previous) * 100, 2)
+
+    return {
+        "current_price": current_price,
+        "rsi": rsi_value,
+        "rsi_signal": "oversold" if rsi_value < 30 else "overbought" if rsi_value > 70 else "neutral",
+        "macd": macd_value,
+        "macd_signal": macd_signal_str,
+        "macd_histogram": macd_hist,
+        "bb_upper": bb_upper,
+        "bb_lower": bb_lower,
+        "bb_middle": bb_middle,
+        "bb_position": bb_position,
+        "volume_trend": volume_trend,
+        "change_24h": change_24h,
+        "ema_20": round(v["ema_20"], 2),
+        "ema_50": round(v["ema_50"], 2) if v["ema_50"] is not None else None,
+        "atr": round(v["atr"], 2),
+        "stoch_k": round(v["stoch_k"], 2),
+        "stoch_d": round(v["stoch_d"], 2),
+    }
+
+
+def stack_klines(klines: Sequence) -> Dict[str, np.ndarray]:
+    """Stack per-pair klines into (pairs x candles) matrices.
+
+    Series are aligned on their newest candle; shorter ones are padded
+    with NaN on the left.
+    """
+    frames = [as_frame(k) for k in klines]
+    width = max((len(f) for f in frames), default=0)
+    matrices = {}
+    for field in ("high", "low", "close", "volume"):
+        out = np.full((len(frames), width), np.nan)
+        for i, frame in enumerate(frames):
+            if len(frame):
+                out[i, width - len(frame):] = getattr(frame, field)
+        matrices[field] = out
+    return matrices
+
+
+def _summary_batch(v: Dict[str, np.ndarray],
+                   fields: Sequence[str] = ANALYSIS_DTYPE.names) -> np.ndarray:
+    """Vectorized ``_summary``: round values and derive labels for every row.
+
+    Only ``fields`` are built; ``v`` needs just the series behind them.
+    """
+    price = v["current_price"]
+    out = np.zeros(len(price), dtype=[(name, ANALYSIS_DTYPE[name]) for name in fields])
+    wanted = set(fields)
+    if "current_price" in wanted:
+        out["current_price"] = price
+    if wanted & {"rsi", "rsi_signal"}:
+        rsi = np.round(v["rsi"], 2)
+        if "rsi" in wanted:
+            out["rsi"] = rsi
+        if "rsi_signal" in wanted:
+            _label(out["rsi_signal"], "neutral", (rsi < 30, "oversold"),
+                   (rsi > 70, "overbought"))
+    if wanted & {"macd", "macd_signal"}:
+        macd = np.round(v["macd"], 4)
+        if "macd" in wanted:
+            out["macd"] = macd
+        if "macd_signal" in wanted:
+            signal = np.round(v["macd_signal"], 4)
+            _label(out["macd_signal"], "bearish", (macd > signal, "bullish"))
+    if "macd_histogram" in wanted:
+        out["macd_histogram"] = np.round(v["macd"] - v["macd_signal"], 4)
+
+    if wanted & {"bb_upper", "bb_lower", "bb_middle", "bb_position"}:
+        upper = np.round(v["bb_upper"], 2)
+        lower = np.round(v["bb_lower"], 2)
+        for name, values in (("bb_upper", upper), ("bb_lower", lower),
+                             ("bb_middle", np.round(v["bb_middle"], 2))):
+            if name in wanted:
+                out[name] = values
+    if "bb_position" in wanted:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.round((price - lower) / (upper - lower) * 100)
+        middle = np.isfinite(pct)
+        labels = np.full(len(price), "", dtype=ANALYSIS_DTYPE["bb_position"])
+        labels[middle] = BB_MIDDLE_LABELS[np.clip(pct[middle], 0, 100).astype(int)]
+        labels[price < lower] = "below_lower"
+        labels[price > upper] = "above_upper"
+        out["bb_position"] = labels
+
+    if "volume_trend" in wanted:
+        _label(out["volume_trend"], "below_average",
+               (v["volume"] > v["volume_sma"], "above_average"))
+    if "change_24h" in wanted:
+        previous = v["close_24h_ago"]
+        out["change_24h"] = np.round((price - previous) / previous * 100, 2)
+    for key in ("ema_20", "ema_50", "atr", "stoch_k", "stoch_d"):
+        if key in wanted:
+            out[key] = np.round(v[key], 2)
+    return out
+
+
+def _label(column: np.ndarray, default: str, *cases):
+    """Fill a label column in place: ``default``, then each ``(mask, label)``.
 
-    def detailed_analysis(self, symbol: str, timeframe: str = "1h") -> dict:
-        """Placeholder for detailed analysis — requires market data skill."""
-        return {"info": f"Detailed analysis for {symbol} on {timeframe} requires market data"}
+    Cheaper than ``np.where`` over a million rows, which builds a
+    temporary array of wide unicode strings first.
+    """
+    column[...] = default
+    for mask, label in cases:
+        column[mask] = label
@@ -1,8 +1,8 @@
 """Binance account skill — balance, portfolio, account info."""
 
-from binance.client import Client
-
 from makemerich.skills.base import BaseSkill
+from makemerich.skills.binance.prices import PriceCache
+from makemerich.skills.binance.transport import BinanceTransport
 
 
 class AccountSkill(BaseSkill):
@@ -11,17 +11,15 @@ class AccountSkill(BaseSkill):
     name = "account"
     description = "Retrieve account balances and portfolio information"
 
-    def __init__(self, config):
-        self.client = Client(
-            config.binance_api_key,
-            config.binance_api_secret,
-            testnet=config.mode == "paper",
-        )
+    def __init__(self, config, transport: BinanceTransport = None,
+                 prices: PriceCache = None):
+        self.transport = transport or BinanceTransport(config)
+        self.prices = prices or PriceCache(self.transport, ttl=config.binance.price_ttl)
 
     async def get_balance(self) -> dict:
         """Get account balance summary."""
         try:
-            account = self.client.get_account()
+            account = await self.transport.call("get_account")
             balances = {
                 b["asset"]: {
                     "free": float(b["free"]),
@@ -41,6 +39,13 @@ class AccountSkill(BaseSkill):
             if balance["status"] == "error":
                 return balance
 
+            # One all-symbols ticker request values every holding
+            try:
+                prices = await self.prices.prices()
+            except Exception as e:
+                # Without prices every holding would be valued at 0
+                return {"status": "error", "message": f"Could not load prices: {e}"}
+
             portfolio = {}
             total_usdt = 0.0
 
@@ -49,11 +54,7 @@ class AccountSkill(BaseSkill):
                 if asset in ("USDT", "BUSD", "USDC"):
                     usdt_value = total
                 else:
-                    try:
-                        ticker = self.client.get_symbol_ticker(symbol=f"{asset}USDT")
-                        usdt_value = total * float(ticker["price"])
-                    except Exception:
-                        usdt_value = 0.0
+                    usdt_value = total * prices.get(f"{asset}USDT", 0.0)
 
                 portfolio[asset] = {
                     "amount": total,
@@ -1,8 +1,7 @@
 """Binance Futures trading skill — for leverage trading (use with caution)."""
 
-from binance.client import Client
-
 from makemerich.skills.base import BaseSkill
+from makemerich.skills.binance.transport import BinanceTransport
 
 
 class FuturesTradingSkill(BaseSkill):
@@ -11,20 +10,17 @@ class FuturesTradingSkill(BaseSkill):
     name = "futures_trading"
     description = "Execute futures trades on Binance (leverage trading)"
 
-    def __init__(self, config):
-        self.client = Client(
-            config.binance_api_key,
-            config.binance_api_secret,
-            testnet=config.mode == "paper",
-        )
+    def __init__(self, config, transport: BinanceTransport = None):
+        self.transport = transport or BinanceTransport(config)
         self.config = config
 
     async def open_long(self, symbol: str, amount_usdt: float,
                         leverage: int = 1) -> dict:
         """Open a long position."""
         try:
-            self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
-            order = self.client.futures_create_order(
+            await self.transport.call("futures_change_leverage",
+                                      symbol=symbol, leverage=leverage)
+            order = await self.transport.call("futures_create_order",
                 symbol=symbol,
                 side="BUY",
                 type="MARKET",
@@ -38,8 +34,9 @@ class FuturesTradingSkill(BaseSkill):
                          leverage: int = 1) -> dict:
         """Open a short position."""
         try:
-            self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
-            order = self.client.futures_create_order(
+            await self.transport.call("futures_change_leverage",
+                                      symbol=symbol, leverage=leverage)
+            order = await self.transport.call("futures_create_order",
                 symbol=symbol,
                 side="SELL",
                 type="MARKET",
@@ -52,12 +49,13 @@ class FuturesTradingSkill(BaseSkill):
     async def close_position(self, symbol: str) -> dict:
         """Close an open futures position."""
         try:
-            positions = self.client.futures_position_information(symbol=symbol)
+            positions = await self.transport.call(
+                "futures_position_information", symbol=symbol)
             for pos in positions:
                 amt = float(pos["positionAmt"])
                 if amt != 0:
                     side = "SELL" if amt > 0 else "BUY"
-                    order = self.client.futures_create_order(
+                    order = await self.transport.call("futures_create_order",
                         symbol=symbol,
                         side=side,
                         type="MARKET",
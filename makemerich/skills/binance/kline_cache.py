@@ -0,0 +1,112 @@
+"""In-memory kline ring buffers — seed once, then fetch only the delta.
+
+Each (symbol, interval) gets a ``KlineBuffer`` holding the most recent
+``capacity`` candles in columnar NumPy arrays. The arrays are twice the
+capacity: new candles are written after the window and the window is slid
+back to the front only when the spare half runs out, so the current window
+is always one contiguous slice and can be handed out as views, not copies.
+"""
+
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from makemerich.skills.klines import KlineFrame
+
+
+class KlineBuffer:
+    """Fixed-capacity, append-mostly candle window for one symbol/interval."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = KlineFrame.empty(2 * capacity)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return self._data.columns
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        if not len(self):
+            return None
+        return int(self._data.timestamp[self._end - 1])
+
+    @property
+    def last_close_time(self) -> Optional[int]:
+        if not len(self):
+            return None
+        return int(self._data.close_time[self._end - 1])
+
+    def clear(self):
+        self._start = self._end = 0
+
+    def upsert(self, klines: Union[KlineFrame, list]) -> int:
+        """Merge klines (a frame or a raw exchange payload); returns new candles.
+
+        A kline with the same open time as the newest stored candle replaces
+        it in place (the still-forming candle); older klines are ignored.
+        """
+        frame = klines if isinstance(klines, KlineFrame) else KlineFrame.from_binance(klines)
+        last = self.last_open_time
+        if last is not None:
+            frame = frame[int(np.searchsorted(frame.timestamp, last)):]
+            if len(frame) and frame.timestamp[0] == last:
+                self._write(self._end - 1, frame[:1])
+                frame = frame[1:]
+
+        n = min(len(frame), self.capacity)
+        if not n:
+            return 0
+        frame = frame[len(frame) - n:]
+        if self._end + n > 2 * self.capacity:
+            keep = min(len(self), self.capacity - n)
+            for col in self.columns.values():
+                col[:keep] = col[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        self._write(self._end, frame)
+        self._end += n
+        self._start = max(self._start, self._end - self.capacity)
+        return n
+
+    def window(self, limit: int = None) -> KlineFrame:
+        """The newest ``limit`` candles as a read-only view.
+
+        Views alias the buffer: they are valid until the next ``upsert``.
+        """
+        start = self._start if limit is None else max(self._start, self._end - limit)
+        view = self._data[start:self._end]
+        for col in view.columns.values():
+            col.flags.writeable = False
+        return view
+
+    def to_dicts(self, limit: int = None) -> list:
+        """The newest ``limit`` candles in the classic list-of-dicts form."""
+        return self.window(limit).to_dicts()
+
+    def _write(self, i: int, frame: KlineFrame):
+        n = len(frame)
+        for f, col in frame.columns.items():
+            getattr(self._data, f)[i:i + n] = col
+
+
+class KlineCache:
+    """All kline buffers of a process, keyed by (symbol, interval)."""
+
+    def __init__(self):
+        self._buffers: Dict[Tuple[str, str], KlineBuffer] = {}
+
+    def get(self, symbol: str, interval: str) -> Optional[KlineBuffer]:
+        return self._buffers.get((symbol, interval))
+
+    def create(self, symbol: str, interval: str, capacity: int) -> KlineBuffer:
+        buffer = KlineBuffer(capacity)
+        self._buffers[(symbol, interval)] = buffer
+        return buffer
+
+    def keys(self):
+        return self._buffers.keys()
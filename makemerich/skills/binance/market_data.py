@@ -1,8 +1,23 @@
 """Market data skill — prices, klines, order book from Binance."""
 
-from binance.client import Client
+import time
+from typing import Dict, Optional
+
+import numpy as np
+from binance.helpers import interval_to_milliseconds
 
 from makemerich.skills.base import BaseSkill
+from makemerich.skills.klines import KlineFrame
+from makemerich.skills.binance.kline_cache import KlineBuffer, KlineCache
+from makemerich.skills.binance.order_book import LocalOrderBook
+from makemerich.skills.binance.resample import Resampler
+from makemerich.skills.binance.scheduler import Priority
+from makemerich.skills.binance.stream import MarketStream
+from makemerich.skills.binance.transport import BinanceTransport
+from makemerich.storage.candles import CandleStore
+
+# Binance caps a single klines request at this many candles
+MAX_KLINES_PER_REQUEST = 1000
 
 
 class MarketDataSkill(BaseSkill):
@@ -11,63 +26,238 @@ class MarketDataSkill(BaseSkill):
     name = "market_data"
     description = "Retrieve market data: prices, klines, order book"
 
-    def __init__(self, config):
-        self.client = Client(
-            config.binance_api_key,
-            config.binance_api_secret,
-            testnet=config.mode == "paper",
-        )
+    def __init__(self, config, transport: BinanceTransport = None,
+                 cache: KlineCache = None, store: CandleStore = None):
+        self.config = config
+        self.transport = transport or BinanceTransport(config)
+        self.cache = cache or KlineCache()
+        self.store = store
+        self.stream: MarketStream = None
+        self.order_books: Dict[str, LocalOrderBook] = {}
+        self.resampler = Resampler(config.data.base_interval)
 
     async def get_price(self, symbol: str) -> dict:
         """Get current price for a symbol."""
         try:
-            ticker = self.client.get_symbol_ticker(symbol=symbol)
+            ticker = await self.transport.call("get_symbol_ticker", symbol=symbol)
             return {"status": "success", "symbol": symbol, "price": float(ticker["price"])}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
     async def get_klines(self, symbol: str, interval: str = "1h",
-                         limit: int = 100) -> list:
-        """Get candlestick/kline data."""
+                         limit: int = 100) -> KlineFrame:
+        """Get candlestick/kline data.
+
+        The frame is a private copy of the cached window; iterate or index
+        it for the classic per-candle dicts. Intervals above the base
+        interval are resampled from base candles when enough base history
+        is stored locally, unless the stream already keeps them current.
+        """
         try:
-            klines = self.client.get_klines(
+            live = self.stream is not None and self.stream.is_live(symbol, interval)
+            if not live and self.resampler.can_resample(interval):
+                bars = await self._resampled_klines(symbol, interval, limit)
+                if bars is not None:
+                    return bars.window(limit).copy()
+            buffer = await self._refresh_klines(symbol, interval, limit)
+            return buffer.window(limit).copy()
+        except Exception as e:
+            return KlineFrame.empty()
+
+    async def get_kline_window(self, symbol: str, interval: str = "1h",
+                               limit: int = 100) -> KlineFrame:
+        """Get klines as a zero-copy view over the cached window."""
+        buffer = await self._refresh_klines(symbol, interval, limit)
+        return buffer.window(limit)
+
+    async def get_kline_range(self, symbol: str, interval: str, start_time: int,
+                              end_time: int,
+                              limit: int = MAX_KLINES_PER_REQUEST) -> KlineFrame:
+        """Get one page of historical klines opening in [start_time, end_time].
+
+        Bypasses the cache and raises on failure, for bulk history downloads;
+        scheduled at history priority, behind live trading requests.
+        """
+        return KlineFrame.from_binance(await self.transport.call(
+            "get_klines",
+            priority=Priority.HISTORY,
+            symbol=symbol,
+            interval=interval,
+            startTime=start_time,
+            endTime=end_time,
+            limit=limit,
+        ))
+
+    async def _refresh_klines(self, symbol: str, interval: str,
+                              limit: int) -> KlineBuffer:
+        """Seed the cached window once, then fetch only newer candles.
+
+        The delta request starts at the newest cached candle's open time so
+        the still-forming candle is refreshed along with any new ones.
+        """
+        buffer = self.cache.get(symbol, interval)
+        if (buffer is not None and buffer.capacity >= limit
+                and self.stream is not None
+                and self.stream.is_live(symbol, interval)):
+            return buffer
+
+        if buffer is None or buffer.capacity < limit:
+            buffer = self.cache.create(symbol, interval, limit)
+            if self.store is not None and self.store.count(symbol, interval) >= limit:
+                # Warm start from local history; the delta below catches up
+                buffer.upsert(self.store.tail(symbol, interval, limit))
+
+        if len(buffer):
+            frame = KlineFrame.from_binance(await self.transport.call(
+                "get_klines",
                 symbol=symbol,
                 interval=interval,
-                limit=limit,
-            )
-            return [
-                {
-                    "timestamp": k[0],
-                    "open": float(k[1]),
-                    "high": float(k[2]),
-                    "low": float(k[3]),
-                    "close": float(k[4]),
-                    "volume": float(k[5]),
-                    "close_time": k[6],
-                    "quote_volume": float(k[7]),
-                    "trades": k[8],
-                }
-                for k in klines
-            ]
-        except Exception as e:
-            return []
+                startTime=buffer.last_open_time,
+                limit=MAX_KLINES_PER_REQUEST,
+            ))
+            if len(frame) < MAX_KLINES_PER_REQUEST:
+                buffer.upsert(frame)
+                self._persist(symbol, interval, frame)
+                return buffer
+            # Too far behind to catch up with one delta: reseed
+
+        frame = KlineFrame.from_binance(await self.transport.call(
+            "get_klines",
+            symbol=symbol,
+            interval=interval,
+            limit=limit,
+        ))
+        buffer.clear()
+        buffer.upsert(frame)
+        if len(frame):
+            await self._backfill(symbol, interval, int(frame.timestamp[0]))
+        self._persist(symbol, interval, frame)
+        return buffer
+
+    async def _backfill(self, symbol: str, interval: str, until: int):
+        """Page stored history forward to the candle opening at ``until``.
+
+        A reseed window can start well after the last stored candle; the
+        candles in between are fetched at history priority first so the
+        store stays gapless. On failure the store is left as it was.
+        """
+        if self.store is None:
+            return
+        step = interval_to_milliseconds(interval)
+        last = self.store.last_open_time(symbol, interval)
+        try:
+            while last is not None and last + step < until:
+                page = await self.get_kline_range(symbol, interval, last + step, until - 1)
+                if not self.store.append(symbol, interval, page):
+                    break
+                last = self.store.last_open_time(symbol, interval)
+        except Exception:
+            pass
+
+    async def _resampled_klines(self, symbol: str, interval: str,
+                                limit: int) -> Optional[KlineBuffer]:
+        """Derived ``interval`` bars, or None to fetch the interval instead.
+
+        Only the base interval is refreshed from the exchange, so every
+        higher timeframe of a symbol shares that one request.
+        """
+        base = self.resampler.base
+        needed = (limit + 1) * self.resampler.ratio(interval)
+        bars = self.resampler.get(symbol, interval)
+        if (bars is None or bars.capacity < limit) and (
+                self.store is None or self.store.count(symbol, base) < needed):
+            return None
+
+        window = (await self._refresh_klines(
+            symbol, base, self.config.data.kline_limit)).window()
+        self.resampler.update(symbol, window)
+        bars = self.resampler.get(symbol, interval)
+        if bars is None or bars.capacity < limit:
+            history = self.store.tail(symbol, base, needed)
+            if len(window):
+                history = history[:int(np.searchsorted(history.timestamp,
+                                                        window.timestamp[0]))]
+                history = KlineFrame.concat([history, window])
+            if np.any(np.diff(history.timestamp) != self.resampler.base_step):
+                return None  # missing base candles would yield partial bars
+            bars = self.resampler.track(symbol, interval, history, limit)
+        return bars
+
+    def _persist(self, symbol: str, interval: str, frame: KlineFrame):
+        """Append the closed candles of ``frame`` to the local history,
+        unless they would leave a hole after the last stored candle."""
+        if self.store is None or not len(frame):
+            return
+        now = int(time.time() * 1000)
+        closed = frame[:int(np.searchsorted(frame.close_time, now))]
+        last = self.store.last_open_time(symbol, interval)
+        if (last is not None and len(closed)
+                and closed.timestamp[0] > last + interval_to_milliseconds(interval)):
+            return
+        self.store.append(symbol, interval, closed)
+
+    def start_stream(self, pairs: list, interval: str = "1h",
+                     limit: int = 100, url: str = None,
+                     depth: bool = False) -> MarketStream:
+        """Switch to streaming mode: keep kline windows current over WebSocket.
+
+        With ``depth`` the stream also maintains a local order book per pair.
+        """
+        self.stream = MarketStream(self, pairs, interval, limit=limit, url=url,
+                                   depth=depth)
+        self.stream.start()
+        return self.stream
+
+    async def stop_stream(self):
+        if self.stream is not None:
+            await self.stream.stop()
+            self.stream = None
 
     async def get_order_book(self, symbol: str, limit: int = 20) -> dict:
-        """Get order book depth."""
+        """Get order book depth, from the local mirror when it is in sync."""
+        book = self.order_books.get(symbol)
+        if book is not None and book.synced:
+            return {"status": "success", **book.top(limit)}
         try:
-            depth = self.client.get_order_book(symbol=symbol, limit=limit)
+            depth = await self.transport.call("get_order_book", symbol=symbol, limit=limit)
             return {
                 "status": "success",
-                "bids": [[float(p), float(q)] for p, q in depth["bids"]],
-                "asks": [[float(p), float(q)] for p, q in depth["asks"]],
+                "bids": np.asarray(depth["bids"], dtype=np.float64).tolist(),
+                "asks": np.asarray(depth["asks"], dtype=np.float64).tolist(),
             }
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    async def sync_order_book(self, symbol: str, limit: int = 1000) -> LocalOrderBook:
+        """(Re)load the local book for ``symbol`` from a REST snapshot.
+
+        Diff events arriving meanwhile are buffered and replayed on top.
+        """
+        book = self.order_books.get(symbol)
+        if book is None:
+            book = self.order_books[symbol] = LocalOrderBook(symbol)
+        book.synced = False
+        snapshot = await self.transport.call("get_order_book", symbol=symbol, limit=limit)
+        book.apply_snapshot(snapshot)
+        return book
+
+    def estimate_slippage(self, symbol: str, side: str,
+                          quantity: float) -> Optional[dict]:
+        """Fill estimate for a market order from the local book (no network)."""
+        book = self.order_books.get(symbol)
+        if book is None or not book.synced:
+            return None
+        return {
+            "vwap": book.vwap(side, quantity),
+            "limit_price": book.limit_price(side, quantity),
+            "slippage_bps": book.slippage_bps(side, quantity),
+            "spread_bps": book.spread_bps(),
+        }
+
     async def get_24h_stats(self, symbol: str) -> dict:
         """Get 24h statistics for a symbol."""
         try:
-            stats = self.client.get_ticker(symbol=symbol)
+            stats = await self.transport.call("get_ticker", symbol=symbol)
             return {
                 "status": "success",
                 "symbol": symbol,
@@ -0,0 +1,188 @@
+"""Local order book mirror — REST snapshot plus diff-depth updates.
+
+Each side is a pair of NumPy arrays (price, quantity) sorted by ascending
+price, so the best bid is the last bid level and the best ask the first ask
+level. Queries are binary searches and cumulative sums over those arrays:
+best bid/ask, depth near the mid and the VWAP of filling a given size all
+answer from memory, without a network round trip.
+
+Sync follows Binance's procedure: diff events received before the snapshot
+are buffered, stale ones (``u <= lastUpdateId``) are dropped, and a gap in
+update ids marks the book out of sync until the next snapshot. Only the
+newest ``max_pending`` buffered events are kept; a snapshot older than
+those is detected as a gap and refetched.
+"""
+
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class OrderBookOutOfSync(Exception):
+    """A diff event skipped update ids; the book needs a fresh snapshot."""
+
+
+def _levels(levels: list) -> Tuple[np.ndarray, np.ndarray]:
+    if not len(levels):
+        return np.zeros(0), np.zeros(0)
+    table = np.array(levels, dtype=np.float64).reshape(-1, 2)
+    return table[:, 0].copy(), table[:, 1].copy()
+
+
+def _merge(prices: np.ndarray, qtys: np.ndarray,
+           updates: list) -> Tuple[np.ndarray, np.ndarray]:
+    """Apply absolute level updates (quantity 0 removes the level)."""
+    upd_p, upd_q = _levels(updates)
+    if not len(upd_p):
+        return prices, qtys
+    keep = ~np.isin(prices, upd_p)
+    live = upd_q > 0
+    prices = np.concatenate([prices[keep], upd_p[live]])
+    qtys = np.concatenate([qtys[keep], upd_q[live]])
+    order = np.argsort(prices, kind="stable")
+    return prices[order], qtys[order]
+
+
+class LocalOrderBook:
+    """Array-backed price levels for one symbol."""
+
+    def __init__(self, symbol: str, max_pending: int = 10_000):
+        self.symbol = symbol
+        self.bid_prices = np.zeros(0)
+        self.bid_qtys = np.zeros(0)
+        self.ask_prices = np.zeros(0)
+        self.ask_qtys = np.zeros(0)
+        self.last_update_id = 0
+        self.synced = False
+        self._pending = deque(maxlen=max_pending)
+        self._first_diff = True
+
+    def apply_snapshot(self, snapshot: dict):
+        """Load a REST depth snapshot, then replay buffered diff events."""
+        bid_p, bid_q = _levels(snapshot["bids"])
+        order = np.argsort(bid_p)
+        self.bid_prices, self.bid_qtys = bid_p[order], bid_q[order]
+        ask_p, ask_q = _levels(snapshot["asks"])
+        order = np.argsort(ask_p)
+        self.ask_prices, self.ask_qtys = ask_p[order], ask_q[order]
+        self.last_update_id = snapshot["lastUpdateId"]
+        self.synced = True
+        self._first_diff = True
+
+        pending = list(self._pending)
+        self._pending.clear()
+        for i, event in enumerate(pending):
+            try:
+                self.apply_diff(event)
+            except OrderBookOutOfSync:
+                self._pending.clear()
+                self._pending.extend(pending[i:])
+                raise
+
+    def apply_diff(self, event: dict) -> bool:
+        """Apply a ``depthUpdate`` event; returns False if it was stale.
+
+        Raises ``OrderBookOutOfSync`` on a gap in update ids.
+        """
+        if not self.synced:
+            self._pending.append(event)
+            return False
+        if event["u"] <= self.last_update_id:
+            return False
+
+        expected = self.last_update_id + 1
+        if self._first_diff:
+            in_sequence = event["U"] <= expected <= event["u"]
+        else:
+            in_sequence = event["U"] == expected
+        if not in_sequence:
+            self.synced = False
+            self._pending.clear()
+            self._pending.append(event)
+            raise OrderBookOutOfSync(
+                f"{self.symbol}: expected update {expected}, got {event['U']}")
+
+        self.bid_prices, self.bid_qtys = _merge(self.bid_prices, self.bid_qtys, event["b"])
+        self.ask_prices, self.ask_qtys = _merge(self.ask_prices, self.ask_qtys, event["a"])
+        self.last_update_id = event["u"]
+        self._first_diff = False
+        return True
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        if not len(self.bid_prices):
+            return None
+        return float(self.bid_prices[-1]), float(self.bid_qtys[-1])
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        if not len(self.ask_prices):
+            return None
+        return float(self.ask_prices[0]), float(self.ask_qtys[0])
+
+    def mid(self) -> Optional[float]:
+        if not len(self.bid_prices) or not len(self.ask_prices):
+            return None
+        return (self.bid_prices[-1] + self.ask_prices[0]) / 2
+
+    def spread_bps(self) -> Optional[float]:
+        mid = self.mid()
+        if mid is None:
+            return None
+        return float((self.ask_prices[0] - self.bid_prices[-1]) / mid * 10_000)
+
+    def depth_within_bps(self, bps: float) -> dict:
+        """Base quantity resting within ``bps`` of the mid, per side."""
+        mid = self.mid()
+        if mid is None:
+            return {"bid": 0.0, "ask": 0.0}
+        lo = np.searchsorted(self.bid_prices, mid * (1 - bps / 10_000), side="left")
+        hi = np.searchsorted(self.ask_prices, mid * (1 + bps / 10_000), side="right")
+        return {
+            "bid": float(self.bid_qtys[lo:].sum()),
+            "ask": float(self.ask_qtys[:hi].sum()),
+        }
+
+    def _walk(self, side: str) -> Tuple[np.ndarray, np.ndarray]:
+        # Levels in fill order: a BUY takes asks upwards, a SELL bids downwards
+        if side.upper() == "BUY":
+            return self.ask_prices, self.ask_qtys
+        return self.bid_prices[::-1], self.bid_qtys[::-1]
+
+    def vwap(self, side: str, size: float) -> Optional[float]:
+        """Average fill price of a market order for ``size`` base units.
+
+        None if the book is not deep enough.
+        """
+        prices, qtys = self._walk(side)
+        filled = np.cumsum(qtys)
+        n = int(np.searchsorted(filled, size, side="left"))
+        if n >= len(filled):
+            return None
+        before = filled[n - 1] if n else 0.0
+        notional = np.dot(prices[:n], qtys[:n]) + (size - before) * prices[n]
+        return float(notional / size)
+
+    def limit_price(self, side: str, size: float) -> Optional[float]:
+        """Worst level price touched by filling ``size``: a marketable limit."""
+        prices, qtys = self._walk(side)
+        n = int(np.searchsorted(np.cumsum(qtys), size, side="left"))
+        if n >= len(prices):
+            return None
+        return float(prices[n])
+
+    def slippage_bps(self, side: str, size: float) -> Optional[float]:
+        """VWAP distance from the mid for filling ``size``, in basis points."""
+        vwap = self.vwap(side, size)
+        mid = self.mid()
+        if vwap is None or mid is None:
+            return None
+        return float(abs(vwap - mid) / mid * 10_000)
+
+    def top(self, limit: int = 20) -> dict:
+        """The best ``limit`` levels per side in the REST response layout."""
+        return {
+            "bids": np.column_stack([self.bid_prices[::-1][:limit],
+                                     self.bid_qtys[::-1][:limit]]).tolist(),
+            "asks": np.column_stack([self.ask_prices[:limit],
+                                     self.ask_qtys[:limit]]).tolist(),
+        }
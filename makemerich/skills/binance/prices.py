@@ -0,0 +1,53 @@
+"""Shared ticker price cache for portfolio valuation.
+
+One all-symbols ticker request fills the cache for every asset at once.
+Prices are reused for ``ttl`` seconds, and concurrent callers that find
+them stale share a single in-flight refresh instead of each fetching.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from makemerich.skills.binance.transport import BinanceTransport
+
+
+class PriceCache:
+    """Last prices of all symbols, from one request, with a TTL."""
+
+    def __init__(self, transport: BinanceTransport, ttl: float = 5.0):
+        self.transport = transport
+        self.ttl = ttl
+        self.refreshes = 0
+        self._prices: Dict[str, float] = {}
+        self._fetched_at = 0.0
+        self._refresh: Optional[asyncio.Future] = None
+
+    @property
+    def fresh(self) -> bool:
+        return bool(self._prices) and time.monotonic() - self._fetched_at < self.ttl
+
+    async def prices(self) -> Dict[str, float]:
+        """All symbol prices, refreshed (coalesced) when older than the TTL."""
+        if self.fresh:
+            return self._prices
+        if self._refresh is None:
+            self._refresh = asyncio.ensure_future(self._load())
+            self._refresh.add_done_callback(self._refresh_done)
+        # Shield: one caller being cancelled must not cancel the shared fetch
+        return await asyncio.shield(self._refresh)
+
+    async def price(self, symbol: str) -> Optional[float]:
+        return (await self.prices()).get(symbol)
+
+    async def _load(self) -> Dict[str, float]:
+        tickers = await self.transport.call("get_all_tickers")
+        self._prices = {t["symbol"]: float(t["price"]) for t in tickers}
+        self._fetched_at = time.monotonic()
+        self.refreshes += 1
+        return self._prices
+
+    def _refresh_done(self, future: asyncio.Future):
+        self._refresh = None
+        if not future.cancelled():
+            future.exception()  # retrieved here; waiters re-raise it
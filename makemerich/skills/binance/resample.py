@@ -0,0 +1,146 @@
+"""Higher-timeframe candles built from one base interval.
+
+``resample`` aggregates base candles (normally 1m) into any interval whose
+buckets Binance aligns the same way: every interval dividing a day, plus
+weeks (which open on Monday). The aggregation is one vectorized pass —
+bucket boundaries from the open times, then ``reduceat`` over each column.
+
+``Resampler`` keeps the derived bars of each (symbol, interval) current as
+base candles arrive. Closed base candles are folded once into the newest
+bucket's running aggregate; the still-forming base candle is applied on top
+provisionally, so every update costs the handful of new candles, not the
+whole history.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from binance.helpers import interval_to_milliseconds
+
+from makemerich.skills.binance.kline_cache import KlineBuffer
+from makemerich.skills.klines import KlineFrame
+
+DAY = 86_400_000
+WEEK = 7 * DAY
+# Epoch (1970-01-01) was a Thursday; Binance weeks open on Monday
+WEEK_OFFSET = 4 * DAY
+
+
+def bucket_offset(step: int) -> Optional[int]:
+    """Alignment of an interval's buckets, or None if it can't be resampled."""
+    if step == WEEK:
+        return WEEK_OFFSET
+    if step <= DAY and DAY % step == 0:
+        return 0
+    return None
+
+
+def resample(frame: KlineFrame, interval: str) -> KlineFrame:
+    """Aggregate candles into ``interval`` bars (one per non-empty bucket)."""
+    step = interval_to_milliseconds(interval)
+    offset = bucket_offset(step) if step else None
+    if offset is None:
+        raise ValueError(f"Cannot resample into {interval}")
+    if not len(frame):
+        return KlineFrame.empty()
+
+    ts = frame.timestamp
+    buckets = ts - (ts - offset) % step
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    opens = buckets[starts]
+    return KlineFrame({
+        "timestamp": opens,
+        "open": frame.open[starts],
+        "high": np.maximum.reduceat(frame.high, starts),
+        "low": np.minimum.reduceat(frame.low, starts),
+        "close": frame.close[ends],
+        "volume": np.add.reduceat(frame.volume, starts),
+        "close_time": opens + step - 1,
+        "quote_volume": np.add.reduceat(frame.quote_volume, starts),
+        "trades": np.add.reduceat(frame.trades, starts),
+    })
+
+
+class _Timeframe:
+    """Derived bars of one (symbol, interval) and their fold state."""
+
+    def __init__(self, interval: str, capacity: int, folded_through: int):
+        self.interval = interval
+        self.bars = KlineBuffer(capacity)
+        self.partial = KlineFrame.empty()  # newest bucket, closed candles only
+        self.folded_through = folded_through
+
+
+class Resampler:
+    """Keeps higher-timeframe bars current from base-interval candles."""
+
+    def __init__(self, base: str = "1m"):
+        self.base = base
+        self.base_step = interval_to_milliseconds(base)
+        self._timeframes: Dict[Tuple[str, str], _Timeframe] = {}
+
+    def can_resample(self, interval: str) -> bool:
+        step = interval_to_milliseconds(interval)
+        return (step is not None and step > self.base_step
+                and step % self.base_step == 0
+                and bucket_offset(step) is not None)
+
+    def ratio(self, interval: str) -> int:
+        """Base candles per ``interval`` bar."""
+        return interval_to_milliseconds(interval) // self.base_step
+
+    def get(self, symbol: str, interval: str) -> Optional[KlineBuffer]:
+        timeframe = self._timeframes.get((symbol, interval))
+        return timeframe.bars if timeframe else None
+
+    def track(self, symbol: str, interval: str, history: KlineFrame,
+              capacity: int) -> KlineBuffer:
+        """Start deriving ``interval`` bars from contiguous base ``history``.
+
+        Candles before the first complete bucket are skipped. The last
+        candle of ``history`` is treated as still forming.
+        """
+        step = interval_to_milliseconds(interval)
+        offset = bucket_offset(step)
+        ts = history.timestamp
+        first = -(-(ts[0] - offset) // step) * step + offset if len(ts) else 0
+        history = history[int(np.searchsorted(ts, first)):]
+
+        timeframe = _Timeframe(interval, capacity, first - self.base_step)
+        self._timeframes[(symbol, interval)] = timeframe
+        self._apply(timeframe, history, final=False)
+        return timeframe.bars
+
+    def update(self, symbol: str, base: KlineFrame, final: bool = False):
+        """Fold new base candles into every tracked timeframe of ``symbol``.
+
+        ``base`` may overlap candles already seen. Its last candle is taken
+        as still forming unless ``final``. A timeframe that would skip base
+        candles is dropped, to be re-tracked from history.
+        """
+        for key in [k for k in self._timeframes if k[0] == symbol]:
+            if not self._apply(self._timeframes[key], base, final):
+                del self._timeframes[key]
+
+    def _apply(self, timeframe: _Timeframe, base: KlineFrame, final: bool) -> bool:
+        fresh = base[int(np.searchsorted(base.timestamp, timeframe.folded_through,
+                                         side="right")):]
+        if not len(fresh):
+            return True
+        if fresh.timestamp[0] > timeframe.folded_through + self.base_step:
+            return False
+
+        closed = fresh if final else fresh[:-1]
+        if len(closed):
+            bars = resample(KlineFrame.concat([timeframe.partial, closed]),
+                            timeframe.interval)
+            timeframe.bars.upsert(bars)
+            timeframe.partial = bars[-1:]
+            timeframe.folded_through = int(closed.timestamp[-1])
+        if not final:
+            timeframe.bars.upsert(resample(
+                KlineFrame.concat([timeframe.partial, fresh[-1:]]),
+                timeframe.interval,
+            ))
+        return True
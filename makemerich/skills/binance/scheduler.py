@@ -0,0 +1,199 @@
+"""Request-weight-aware scheduler for Binance REST calls.
+
+Binance bans IPs that exceed the per-minute request-weight budget or the
+order-count limit. Every transport call is admitted here first: it is
+queued by priority (orders before market data before portfolio refreshes
+before history backfill) and released only while the budget has room.
+The budget is tracked locally and corrected from the ``X-MBX-USED-WEIGHT-1M``
+and ``X-MBX-ORDER-COUNT-10S`` response headers, which also count weight used
+by other processes sharing the IP. Spot and futures endpoints are limited
+separately, so each API family (``api_family``) gets a scheduler of its own.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import Dict, Optional
+
+
+class Priority(IntEnum):
+    ORDER = 0
+    MARKET_DATA = 1
+    PORTFOLIO = 2
+    HISTORY = 3
+
+
+# Request weights of the client methods the skills use (spot and USD-M
+# futures API docs)
+ENDPOINT_WEIGHTS = {
+    "get_klines": 2,
+    "get_symbol_ticker": 2,
+    "get_all_tickers": 4,
+    "get_ticker": 2,
+    "get_account": 20,
+    "get_open_orders": 6,
+    "order_market_buy": 1,
+    "order_market_sell": 1,
+    "order_limit_buy": 1,
+    "order_limit_sell": 1,
+    "create_order": 1,
+    "cancel_order": 1,
+    "futures_change_leverage": 1,
+    "futures_create_order": 1,
+    "futures_position_information": 5,
+}
+
+ORDER_METHODS = {
+    "order_market_buy", "order_market_sell", "order_limit_buy",
+    "order_limit_sell", "create_order", "futures_create_order",
+}
+
+PORTFOLIO_METHODS = {"get_account", "get_all_tickers", "get_open_orders"}
+
+
+def request_weight(method: str, params: dict) -> int:
+    """Weight of a call; some endpoints scale with their parameters."""
+    if method == "get_order_book":
+        limit = params.get("limit", 100)
+        if limit <= 100:
+            return 5
+        if limit <= 500:
+            return 25
+        if limit <= 1000:
+            return 50
+        return 250
+    if method == "get_open_orders" and "symbol" not in params:
+        return 80
+    return ENDPOINT_WEIGHTS.get(method, 1)
+
+
+def api_family(method: str) -> str:
+    """The Binance API a client method calls; each has its own limits."""
+    return "futures" if method.startswith("futures_") else "spot"
+
+
+def default_priority(method: str) -> Priority:
+    if method in ORDER_METHODS or method == "cancel_order":
+        return Priority.ORDER
+    if method in PORTFOLIO_METHODS:
+        return Priority.PORTFOLIO
+    return Priority.MARKET_DATA
+
+
+class RequestScheduler:
+    """Admits exchange requests by priority within the weight/order budget."""
+
+    def __init__(self, weight_limit: int = 6000, order_limit: int = 50,
+                 headroom: float = 0.9):
+        self.weight_budget = int(weight_limit * headroom)
+        self.order_budget = int(order_limit * headroom)
+        self.used_weight = 0
+        self.order_count = 0
+        self._weight_window = self._window(60)
+        self._order_window = self._window(10)
+        self._blocked_until = 0.0
+        self._queue: list = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats: Dict[Priority, dict] = {
+            p: {"requests": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+            for p in Priority
+        }
+
+    @staticmethod
+    def _window(seconds: int) -> int:
+        return int(time.time() // seconds)
+
+    async def acquire(self, weight: int, priority: Priority, order: bool = False):
+        """Wait until the request may be sent, then charge it to the budget."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (
+            priority, next(self._seq), weight, order, time.monotonic(), future,
+        ))
+        self._pump()
+        await future
+
+    def observe(self, headers):
+        """Correct the local budget from Binance's usage headers."""
+        if not headers:
+            return
+        self._roll_windows()
+        used = headers.get("x-mbx-used-weight-1m") or headers.get("X-MBX-USED-WEIGHT-1M")
+        if used is not None:
+            self.used_weight = max(self.used_weight, int(used))
+        orders = headers.get("x-mbx-order-count-10s") or headers.get("X-MBX-ORDER-COUNT-10S")
+        if orders is not None:
+            self.order_count = max(self.order_count, int(orders))
+
+    def back_off(self, seconds: float):
+        """Stop admitting anything for ``seconds`` (after a 429/418)."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._schedule_pump(seconds)
+
+    def metrics(self) -> dict:
+        depth = {p.name.lower(): 0 for p in Priority}
+        for entry in self._queue:
+            depth[Priority(entry[0]).name.lower()] += 1
+        return {
+            "queue_depth": depth,
+            "used_weight": self.used_weight,
+            "weight_budget": self.weight_budget,
+            "order_count": self.order_count,
+            "order_budget": self.order_budget,
+            "wait_ms": {
+                p.name.lower(): {
+                    "requests": s["requests"],
+                    "avg": round(s["wait_ms_total"] / s["requests"], 2) if s["requests"] else 0.0,
+                    "max": round(s["wait_ms_max"], 2),
+                }
+                for p, s in self._stats.items()
+            },
+        }
+
+    def _roll_windows(self):
+        window = self._window(60)
+        if window != self._weight_window:
+            self._weight_window, self.used_weight = window, 0
+        window = self._window(10)
+        if window != self._order_window:
+            self._order_window, self.order_count = window, 0
+
+    def _pump(self):
+        self._roll_windows()
+        now = time.monotonic()
+        while self._queue:
+            if now < self._blocked_until:
+                self._schedule_pump(self._blocked_until - now)
+                return
+            priority, _, weight, order, enqueued, future = self._queue[0]
+            if future.done():  # waiter cancelled
+                heapq.heappop(self._queue)
+                continue
+            if self.used_weight + weight > self.weight_budget:
+                self._schedule_pump(60 - time.time() % 60)
+                return
+            if order and self.order_count + 1 > self.order_budget:
+                self._schedule_pump(10 - time.time() % 10)
+                return
+            heapq.heappop(self._queue)
+            self.used_weight += weight
+            self.order_count += int(order)
+            waited = (now - enqueued) * 1000
+            stats = self._stats[Priority(priority)]
+            stats["requests"] += 1
+            stats["wait_ms_total"] += waited
+            stats["wait_ms_max"] = max(stats["wait_ms_max"], waited)
+            future.set_result(None)
+
+    def _schedule_pump(self, delay: float):
+        if self._timer is not None:
+            return
+        loop = asyncio.get_running_loop()
+
+        def fire():
+            self._timer = None
+            self._pump()
+
+        self._timer = loop.call_later(max(delay, 0.001), fire)
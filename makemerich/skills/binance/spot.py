@@ -5,7 +5,6 @@ In OpenClaw: WhatsApp adapter receives/sends messages
 In MakeMeRich: Binance adapter receives data / executes trades
 """
 
-from binance.client import Client
 from binance.enums import (
     SIDE_SELL,
     ORDER_TYPE_STOP_LOSS_LIMIT,
@@ -13,6 +12,15 @@ from binance.enums import (
 )
 
 from makemerich.skills.base import BaseSkill
+from makemerich.skills.binance.transport import BinanceTransport
+
+
+def _fill(order: dict) -> dict:
+    """Executed base quantity and average fill price of an order response."""
+    qty = float(order.get("executedQty") or 0)
+    quote = float(order.get("cummulativeQuoteQty") or 0)
+    return {"executed_qty": qty, "quote_qty": quote,
+            "avg_price": quote / qty if qty else None}
 
 
 class SpotTradingSkill(BaseSkill):
@@ -21,12 +29,8 @@ class SpotTradingSkill(BaseSkill):
     name = "spot_trading"
     description = "Execute spot trades on Binance"
 
-    def __init__(self, config):
-        self.client = Client(
-            config.binance_api_key,
-            config.binance_api_secret,
-            testnet=config.mode == "paper",
-        )
+    def __init__(self, config, transport: BinanceTransport = None):
+        self.transport = transport or BinanceTransport(config)
         self.config = config
 
     async def buy(self, symbol: str, amount_usdt: float,
@@ -34,13 +38,13 @@ class SpotTradingSkill(BaseSkill):
         """Execute a buy order."""
         try:
             if order_type == "market":
-                order = self.client.order_market_buy(
+                order = await self.transport.call("order_market_buy",
                     symbol=symbol,
                     quoteOrderQty=amount_usdt,
                 )
             else:
                 qty = round(amount_usdt / limit_price, 6)
-                order = self.client.order_limit_buy(
+                order = await self.transport.call("order_limit_buy",
                     symbol=symbol,
                     quantity=qty,
                     price=str(limit_price),
@@ -52,7 +56,7 @@ class SpotTradingSkill(BaseSkill):
                 "symbol": symbol,
                 "side": "BUY",
                 "type": order_type,
-                "executed_qty": order.get("executedQty"),
+                **_fill(order),
                 "price": order.get("price") or order.get("fills", [{}])[0].get("price"),
                 "raw": order,
             }
@@ -64,12 +68,12 @@ class SpotTradingSkill(BaseSkill):
         """Execute a sell order."""
         try:
             if order_type == "market":
-                order = self.client.order_market_sell(
+                order = await self.transport.call("order_market_sell",
                     symbol=symbol,
                     quantity=amount,
                 )
             else:
-                order = self.client.order_limit_sell(
+                order = await self.transport.call("order_limit_sell",
                     symbol=symbol,
                     quantity=amount,
                     price=str(limit_price),
@@ -81,7 +85,7 @@ class SpotTradingSkill(BaseSkill):
                 "symbol": symbol,
                 "side": "SELL",
                 "type": order_type,
-                "executed_qty": order.get("executedQty"),
+                **_fill(order),
                 "price": order.get("price") or order.get("fills", [{}])[0].get("price"),
                 "raw": order,
             }
@@ -92,7 +96,7 @@ class SpotTradingSkill(BaseSkill):
                             amount: float) -> dict:
         """Set a stop-loss order."""
         try:
-            order = self.client.create_order(
+            order = await self.transport.call("create_order",
                 symbol=symbol,
                 side=SIDE_SELL,
                 type=ORDER_TYPE_STOP_LOSS_LIMIT,
@@ -108,13 +112,14 @@ class SpotTradingSkill(BaseSkill):
     async def get_open_orders(self, symbol: str = None) -> list:
         """Get open orders."""
         if symbol:
-            return self.client.get_open_orders(symbol=symbol)
-        return self.client.get_open_orders()
+            return await self.transport.call("get_open_orders", symbol=symbol)
+        return await self.transport.call("get_open_orders")
 
     async def cancel_order(self, symbol: str, order_id: int) -> dict:
         """Cancel an order."""
         try:
-            result = self.client.cancel_order(symbol=symbol, orderId=order_id)
+            result = await self.transport.call("cancel_order",
+                                               symbol=symbol, orderId=order_id)
             return {"status": "success", "raw": result}
         except Exception as e:
             return {"status": "error", "message": str(e)}
@@ -0,0 +1,191 @@
+"""Binance combined WebSocket streams — live klines into the kline cache.
+
+In streaming mode the cached windows are kept current by the exchange's
+push feed instead of REST polling. On every (re)connect the windows are
+backfilled over REST first, so a dropped connection never leaves a gap.
+Closed candles are published as events the engine can wait on.
+"""
+
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import websockets
+
+from makemerich.core.logger import get_logger
+from makemerich.skills.binance.order_book import OrderBookOutOfSync
+from makemerich.skills.klines import KlineFrame
+
+STREAM_URL = "wss://stream.binance.com:9443/stream"
+TESTNET_STREAM_URL = "wss://stream.testnet.binance.vision/stream"
+
+# Longest pause between order book snapshot retries, seconds
+MAX_RESYNC_DELAY = 30.0
+
+
+@dataclass
+class CandleClosed:
+    symbol: str
+    interval: str
+    open_time: int
+    close: float
+
+
+class MarketStream:
+    """Subscribes to kline streams for a set of pairs and feeds MarketDataSkill."""
+
+    def __init__(self, market_data, pairs: List[str], interval: str,
+                 limit: int = 100, url: str = None,
+                 reconnect_delay: float = 1.0, depth: bool = False,
+                 resync_delay: float = 1.0):
+        self.market_data = market_data
+        self.pairs = list(pairs)
+        self.interval = interval
+        self.limit = limit
+        self.url = url or (
+            TESTNET_STREAM_URL if market_data.config.mode == "paper" else STREAM_URL
+        )
+        self.reconnect_delay = reconnect_delay
+        self.resync_delay = resync_delay
+        self.depth = depth
+        self.logger = get_logger("stream")
+        self.reconnects = 0
+        self._live: Set[Tuple[str, str]] = set()
+        self._closed: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._resyncs: Dict[str, asyncio.Task] = {}
+
+    @property
+    def streams(self) -> List[str]:
+        streams = [f"{pair.lower()}@kline_{self.interval}" for pair in self.pairs]
+        if self.depth:
+            streams += [f"{pair.lower()}@depth@100ms" for pair in self.pairs]
+        return streams
+
+    def is_live(self, symbol: str, interval: str) -> bool:
+        """Whether the cached window for this key is kept current by the stream."""
+        return (symbol, interval) in self._live
+
+    @property
+    def online(self) -> bool:
+        """Whether the stream is connected and keeping windows current."""
+        return bool(self._live)
+
+    def start(self) -> asyncio.Task:
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        self._offline()
+        for task in [self._task, *self._resyncs.values()]:
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._resyncs.clear()
+
+    async def run(self):
+        """Connect, backfill, consume; reconnect forever on failure."""
+        url = f"{self.url}?streams={'/'.join(self.streams)}"
+        while True:
+            try:
+                async with websockets.connect(url) as ws:
+                    # Frames arriving during the backfill queue up in the
+                    # socket and are merged afterwards, so nothing is lost.
+                    await self._backfill()
+                    async for message in ws:
+                        self._handle(json.loads(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning("Kline stream disconnected", error=str(e))
+            self._offline()
+            self.reconnects += 1
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def wait_closed(self, timeout: float = None) -> List[CandleClosed]:
+        """Wait for the next closed candle, then drain any others already queued."""
+        first = await asyncio.wait_for(self._closed.get(), timeout)
+        events = [first]
+        while not self._closed.empty():
+            events.append(self._closed.get_nowait())
+        return events
+
+    def _offline(self):
+        """Nothing is kept current any more: windows and books are stale."""
+        self._live.clear()
+        for book in self.market_data.order_books.values():
+            book.synced = False
+
+    async def _backfill(self):
+        for pair in self.pairs:
+            await self.market_data._refresh_klines(pair, self.interval, self.limit)
+            self._live.add((pair, self.interval))
+            if self.depth:
+                self._resync(pair)
+        self.logger.info("Kline stream live", pairs=len(self.pairs),
+                         interval=self.interval)
+
+    def _resync(self, symbol: str):
+        """Start reloading ``symbol``'s book unless a reload is running."""
+        task = self._resyncs.get(symbol)
+        if task is None or task.done():
+            self._resyncs[symbol] = asyncio.create_task(self._sync_book(symbol))
+
+    async def _sync_book(self, symbol: str):
+        """Fetch snapshots until one lines up with the buffered diffs,
+        backing off while the exchange keeps failing."""
+        delay = self.resync_delay
+        while True:
+            try:
+                await self.market_data.sync_order_book(symbol)
+                return
+            except OrderBookOutOfSync:
+                pass  # snapshot older than the buffered diffs: refetch
+            except Exception as e:
+                self.logger.warning("Order book sync failed", symbol=symbol,
+                                    error=str(e), retry_in=delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RESYNC_DELAY)
+
+    def _handle(self, message: dict):
+        data = message.get("data", message)
+        if data.get("e") == "depthUpdate":
+            self._handle_depth(data)
+            return
+        if data.get("e") != "kline":
+            return
+        k = data["k"]
+        buffer = self.market_data.cache.get(k["s"], k["i"])
+        if buffer is None:
+            return
+        frame = KlineFrame.from_binance([[k["t"], k["o"], k["h"], k["l"], k["c"],
+                                          k["v"], k["T"], k["q"], k["n"]]])
+        buffer.upsert(frame)
+        if k["i"] == self.market_data.resampler.base:
+            self.market_data.resampler.update(k["s"], frame, final=k["x"])
+        if k["x"]:
+            if self.market_data.store is not None:
+                self.market_data.store.append(k["s"], k["i"], frame)
+            self._closed.put_nowait(CandleClosed(
+                symbol=k["s"],
+                interval=k["i"],
+                open_time=k["t"],
+                close=float(k["c"]),
+            ))
+
+    def _handle_depth(self, event: dict):
+        book = self.market_data.order_books.get(event["s"])
+        if book is None:
+            return
+        try:
+            book.apply_diff(event)
+        except OrderBookOutOfSync as e:
+            self.logger.warning("Order book out of sync, resyncing", error=str(e))
+        if not book.synced:
+            self._resync(event["s"])
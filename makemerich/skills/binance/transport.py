@@ -0,0 +1,120 @@
+"""Shared asyncio transport for all Binance skills.
+
+One ``AsyncClient`` (and therefore one pooled keep-alive HTTP session) per
+process, with a concurrency limit so a burst of market data requests can
+never starve order placement of connections. Every call is first admitted
+by the ``RequestScheduler`` of its API family, which keeps the process
+inside Binance's request-weight and order-count limits; futures calls never
+spend the spot budget.
+"""
+
+import asyncio
+from typing import Optional
+
+import aiohttp
+from binance.async_client import AsyncClient
+from binance.exceptions import BinanceAPIException
+
+from makemerich.core.logger import get_logger
+from makemerich.skills.binance.scheduler import (
+    ORDER_METHODS, Priority, RequestScheduler, api_family, default_priority,
+    request_weight,
+)
+
+# Used when a 429/418 response carries no Retry-After header
+DEFAULT_BACKOFF = 60.0
+
+
+class BinanceTransport:
+    """Async exchange transport shared by the Binance skills."""
+
+    def __init__(self, config, api_url: Optional[str] = None):
+        self.config = config
+        self.api_url = api_url
+        self.max_concurrency = config.binance.max_concurrency
+        self.logger = get_logger("transport")
+        binance = config.binance
+        self.schedulers = {
+            "spot": RequestScheduler(
+                weight_limit=binance.weight_limit,
+                order_limit=binance.order_limit,
+                headroom=binance.weight_headroom,
+            ),
+            "futures": RequestScheduler(
+                weight_limit=binance.futures_weight_limit,
+                order_limit=binance.futures_order_limit,
+                headroom=binance.weight_headroom,
+            ),
+        }
+        self.scheduler = self.schedulers["spot"]
+        self._client: Optional[AsyncClient] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def client(self) -> AsyncClient:
+        """Return the shared client, connecting on first use."""
+        if self._client is not None:
+            return self._client
+
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._client is None:
+                self._client = self._connect()
+        return self._client
+
+    def _connect(self) -> AsyncClient:
+        # Must run inside the event loop: aiohttp binds the session to it.
+        binance = self.config.binance
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            keepalive_timeout=binance.keepalive_timeout,
+        )
+        client = AsyncClient(
+            self.config.binance_api_key,
+            self.config.binance_api_secret,
+            testnet=self.config.mode == "paper",
+            session_params={"connector": connector},
+        )
+        if self.api_url:
+            client.API_URL = self.api_url
+            client.API_TESTNET_URL = self.api_url
+        self.logger.info("Binance transport connected",
+                         max_concurrency=self.max_concurrency)
+        return client
+
+    async def call(self, method: str, priority: Optional[Priority] = None,
+                   **params):
+        """Invoke an ``AsyncClient`` method under the rate and concurrency limits.
+
+        ``priority`` defaults from the method: orders, then market data,
+        then portfolio reads. Bulk history passes ``Priority.HISTORY``.
+        """
+        if priority is None:
+            priority = default_priority(method)
+        scheduler = self.schedulers[api_family(method)]
+        await scheduler.acquire(request_weight(method, params), priority,
+                                order=method in ORDER_METHODS)
+        client = await self.client()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            try:
+                return await getattr(client, method)(**params)
+            except BinanceAPIException as e:
+                if e.status_code in (418, 429):
+                    headers = getattr(e.response, "headers", None) or {}
+                    retry_after = float(headers.get("Retry-After") or DEFAULT_BACKOFF)
+                    self.logger.warning("Rate limited by Binance", method=method,
+                                        status=e.status_code, retry_after=retry_after)
+                    scheduler.back_off(retry_after)
+                raise
+            finally:
+                scheduler.observe(getattr(getattr(client, "response", None),
+                                          "headers", None))
+
+    async def close(self):
+        """Close the pooled HTTP session."""
+        if self._client is not None:
+            await self._client.close_connection()
+            self._client = None
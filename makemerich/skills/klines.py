@@ -0,0 +1,106 @@
+"""Columnar candle representation shared by market data and analysis skills.
+
+A ``KlineFrame`` holds one contiguous NumPy array per kline field instead of
+a dict per candle. Slices are views, so windows can be passed around without
+copying. Indexing or iterating still yields the classic nine-key dicts, so
+code written against the old list-of-dicts form keeps working.
+"""
+
+from collections.abc import Sequence
+from typing import Dict, Union
+
+import numpy as np
+
+
+KLINE_FIELDS = (
+    "timestamp", "open", "high", "low", "close", "volume",
+    "close_time", "quote_volume", "trades",
+)
+INT_FIELDS = ("timestamp", "close_time", "trades")
+
+
+def field_dtype(name: str):
+    return np.int64 if name in INT_FIELDS else np.float64
+
+
+class KlineFrame(Sequence):
+    """Candles as contiguous float64/int64 columns."""
+
+    __slots__ = KLINE_FIELDS
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        for f in KLINE_FIELDS:
+            setattr(self, f, columns[f])
+
+    @classmethod
+    def empty(cls, size: int = 0) -> "KlineFrame":
+        return cls({f: np.zeros(size, dtype=field_dtype(f)) for f in KLINE_FIELDS})
+
+    @classmethod
+    def from_binance(cls, klines: list) -> "KlineFrame":
+        """Parse a raw Binance klines payload (lists of strings and ints)."""
+        if not len(klines):
+            return cls.empty()
+        # One float64 parse of the whole payload, transposed so each field
+        # ends up as its own contiguous row. Millisecond timestamps and trade
+        # counts are exact in float64.
+        table = np.array([k[:9] for k in klines], dtype=np.float64).T.copy()
+        return cls({
+            f: table[i].astype(np.int64) if f in INT_FIELDS else table[i]
+            for i, f in enumerate(KLINE_FIELDS)
+        })
+
+    @classmethod
+    def from_dicts(cls, klines: list) -> "KlineFrame":
+        """Build a frame from the list-of-dicts form."""
+        return cls({
+            f: np.fromiter((k[f] for k in klines), dtype=field_dtype(f),
+                           count=len(klines))
+            for f in KLINE_FIELDS
+        })
+
+    @classmethod
+    def concat(cls, frames: list) -> "KlineFrame":
+        """Join frames end to end into one new frame."""
+        return cls({
+            f: np.concatenate([getattr(frame, f) for frame in frames])
+            for f in KLINE_FIELDS
+        })
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {f: getattr(self, f) for f in KLINE_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return KlineFrame({f: getattr(self, f)[index] for f in KLINE_FIELDS})
+        return {f: getattr(self, f)[index].item() for f in KLINE_FIELDS}
+
+    def __iter__(self):
+        rows = zip(*(getattr(self, f).tolist() for f in KLINE_FIELDS))
+        return (dict(zip(KLINE_FIELDS, row)) for row in rows)
+
+    def __repr__(self) -> str:
+        return f"KlineFrame(candles={len(self)})"
+
+    def copy(self) -> "KlineFrame":
+        return KlineFrame({f: getattr(self, f).copy() for f in KLINE_FIELDS})
+
+    def to_dicts(self) -> list:
+        """Materialize the classic list-of-dicts form."""
+        return list(self)
+
+    def to_dataframe(self):
+        """A pandas DataFrame over the columns."""
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
+
+def as_frame(klines: Union[KlineFrame, list]) -> KlineFrame:
+    """Accept either representation and return a ``KlineFrame``."""
+    if isinstance(klines, KlineFrame):
+        return klines
+    return KlineFrame.from_dicts(klines)
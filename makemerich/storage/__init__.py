@@ -0,0 +1 @@
+"""Local market data storage — on-disk candle history."""
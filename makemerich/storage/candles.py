@@ -0,0 +1,108 @@
+"""Persistent candle store — fixed-width records read through mmap.
+
+One file per symbol/interval (``<root>/<SYMBOL>/<interval>.candles``) holds
+72-byte little-endian records sorted by open time. Appends go to the end
+of the file; reads map the file and hand out views, so a time-range query
+is a binary search plus zero-copy slicing regardless of history length.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from makemerich.skills.klines import KLINE_FIELDS, KlineFrame, field_dtype
+
+
+RECORD_DTYPE = np.dtype([
+    (f, np.dtype(field_dtype(f)).newbyteorder("<")) for f in KLINE_FIELDS
+])
+
+
+def read_records(path: Path) -> np.ndarray:
+    """Memory-map a candle file; a torn partial record at the end is ignored."""
+    size = path.stat().st_size if path.exists() else 0
+    count = size // RECORD_DTYPE.itemsize
+    if not count:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+
+def append_records(path: Path, frame: KlineFrame) -> int:
+    """Append candles newer than the file's last one; returns rows written."""
+    existing = read_records(path)
+    if len(existing):
+        last = existing["timestamp"][-1]
+        frame = frame[int(np.searchsorted(frame.timestamp, last, side="right")):]
+    if not len(frame):
+        return 0
+
+    records = np.empty(len(frame), dtype=RECORD_DTYPE)
+    for f in KLINE_FIELDS:
+        records[f] = getattr(frame, f)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "r+b" if path.exists() else "wb") as fh:
+        # Drop a torn partial record before appending whole ones
+        fh.truncate(len(existing) * RECORD_DTYPE.itemsize)
+        fh.seek(0, 2)
+        fh.write(records.tobytes())
+    return len(records)
+
+
+def records_frame(records: np.ndarray) -> KlineFrame:
+    """Candle records as a KlineFrame of field views.
+
+    Field views of a record array are strided, not contiguous; call
+    ``.copy()`` on the frame when packed columns are needed.
+    """
+    return KlineFrame({f: records[f] for f in KLINE_FIELDS})
+
+
+class CandleStore:
+    """Append-only on-disk candle history, partitioned by symbol/interval."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._maps: Dict[Tuple[str, str], np.memmap] = {}
+
+    def path(self, symbol: str, interval: str) -> Path:
+        return self.root / symbol / f"{interval}.candles"
+
+    def records(self, symbol: str, interval: str) -> np.ndarray:
+        """All stored records as a read-only memory-mapped structured array."""
+        path = self.path(symbol, interval)
+        size = path.stat().st_size if path.exists() else 0
+        count = size // RECORD_DTYPE.itemsize
+        key = (symbol, interval)
+        cached = self._maps.get(key)
+        if cached is None or len(cached) != count:
+            cached = read_records(path)
+            self._maps[key] = cached
+        return cached
+
+    def count(self, symbol: str, interval: str) -> int:
+        return len(self.records(symbol, interval))
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        records = self.records(symbol, interval)
+        return int(records["timestamp"][-1]) if len(records) else None
+
+    def append(self, symbol: str, interval: str, frame: KlineFrame) -> int:
+        """Append candles newer than the last stored one; returns rows written."""
+        return append_records(self.path(symbol, interval), frame)
+
+    def query(self, symbol: str, interval: str, start: int = None,
+              end: int = None) -> KlineFrame:
+        """Candles with ``start <= open time < end`` (ms), as mmap views."""
+        records = self.records(symbol, interval)
+        timestamps = records["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        hi = len(records) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        return records_frame(records[lo:hi])
+
+    def tail(self, symbol: str, interval: str, limit: int) -> KlineFrame:
+        """The newest ``limit`` stored candles."""
+        records = self.records(symbol, interval)
+        return records_frame(records[max(0, len(records) - limit):])
@@ -0,0 +1,259 @@
+"""Bulk historical kline downloader — sharded, rate-limited, resumable.
+
+The requested history is split into shards of (symbol, time range). Shards
+download concurrently through ``MarketDataSkill``, one 1000-candle page at a
+time, at history priority: within one process the transport's request
+scheduler keeps the pages inside the weight budget and lets live trading
+calls go first. ``makemerich-download`` is a separate process with its own
+scheduler, so it only takes ``--weight-share`` of the weight limit; both
+processes also count each other's usage through Binance's
+``X-MBX-USED-WEIGHT-1M`` header, which reports the whole IP's weight.
+Each shard writes its pages straight into its own staging file in the
+candle store format, which doubles as the resume cursor: an interrupted
+run picks up after the last staged candle.
+Once every shard of a symbol/interval is complete they are merged, in time
+order, into the ``CandleStore``.
+
+    makemerich-download --symbols BTCUSDT ETHUSDT --interval 1m --start 2021-01-01
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from binance.helpers import interval_to_milliseconds
+
+from makemerich.core.logger import get_logger
+from makemerich.storage.candles import (
+    CandleStore, append_records, read_records, records_frame,
+)
+
+@dataclass(frozen=True)
+class Shard:
+    symbol: str
+    interval: str
+    start: int  # open time, ms, inclusive
+    end: int    # open time, ms, exclusive
+
+    @property
+    def key(self) -> str:
+        return f"{self.symbol}/{self.interval}/{self.start}-{self.end}"
+
+
+@dataclass
+class DownloadReport:
+    candles: int = 0
+    requests: int = 0
+    completed: int = 0
+    failed: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+class HistoryDownloader:
+    """Fill the local candle store from Binance, many shards at a time."""
+
+    def __init__(self, market_data, store: CandleStore, concurrency: int = 4,
+                 shard_candles: int = 50_000,
+                 retries: int = 3, retry_delay: float = 1.0):
+        self.market_data = market_data
+        self.store = store
+        self.concurrency = concurrency
+        self.shard_candles = shard_candles
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.staging = store.root / ".staging"
+        self.checkpoint_path = self.staging / "checkpoint.json"
+        self.logger = get_logger("downloader")
+
+    def plan(self, symbols: List[str], interval: str, start: int,
+             end: int) -> List[Shard]:
+        """Split [start, end) per symbol into shards, skipping stored history.
+
+        The store is append-only, so a symbol's download starts after its
+        newest stored candle.
+        """
+        step = interval_to_milliseconds(interval)
+        span = step * self.shard_candles
+        shards = []
+        for symbol in symbols:
+            first = start
+            last = self.store.last_open_time(symbol, interval)
+            if last is not None:
+                first = max(first, last + step)
+            for lo in range(first, end, span):
+                shards.append(Shard(symbol, interval, lo, min(lo + span, end)))
+        return shards
+
+    async def run(self, shards: List[Shard]) -> DownloadReport:
+        """Download all shards not completed by a previous run, then merge."""
+        started = time.monotonic()
+        report = DownloadReport()
+        completed = self._load_checkpoint()
+        pending = [s for s in shards if s.key not in completed]
+        report.completed = len(shards) - len(pending)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def worker(shard: Shard):
+            async with semaphore:
+                try:
+                    await self._download(shard, report)
+                except Exception as e:
+                    self.logger.error("Shard failed", shard=shard.key, error=str(e))
+                    report.failed.append(shard.key)
+                    return
+            completed.add(shard.key)
+            report.completed += 1
+            self._save_checkpoint(completed)
+
+        await asyncio.gather(*[worker(s) for s in pending])
+        self._merge(shards, completed, report)
+        report.elapsed = time.monotonic() - started
+        self.logger.info("Download finished", candles=report.candles,
+                         requests=report.requests, failed=len(report.failed),
+                         elapsed=round(report.elapsed, 1))
+        return report
+
+    async def _download(self, shard: Shard, report: DownloadReport):
+        step = interval_to_milliseconds(shard.interval)
+        part = self._part_path(shard)
+        staged = read_records(part)
+        cursor = int(staged["timestamp"][-1]) + step if len(staged) else shard.start
+
+        while cursor < shard.end:
+            frame = await self._fetch(shard, cursor)
+            report.requests += 1
+            frame = frame[:int(np.searchsorted(frame.timestamp, shard.end))]
+            # The store is append-only: never stage the still-forming candle
+            now = int(time.time() * 1000)
+            frame = frame[:int(np.searchsorted(frame.close_time, now))]
+            if not len(frame):
+                break
+            report.candles += append_records(part, frame)
+            cursor = int(frame.timestamp[-1]) + step
+
+    async def _fetch(self, shard: Shard, cursor: int):
+        for attempt in range(self.retries + 1):
+            try:
+                return await self.market_data.get_kline_range(
+                    shard.symbol, shard.interval, cursor, shard.end - 1,
+                )
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+    def _merge(self, shards: List[Shard], completed: set, report: DownloadReport):
+        """Append every complete symbol/interval's shards to the store.
+
+        The store only takes candles newer than its last one, so staged
+        candles that something else (the live stream) has overtaken can't
+        be merged; those part files are kept and the group is reported.
+        """
+        groups = defaultdict(list)
+        for shard in shards:
+            groups[(shard.symbol, shard.interval)].append(shard)
+
+        for (symbol, interval), group in groups.items():
+            if not all(s.key in completed for s in group):
+                continue  # merged on a later run, once every shard is in
+            group = sorted(group, key=lambda s: s.start)
+            last = self.store.last_open_time(symbol, interval)
+            for shard in group:
+                part = self._part_path(shard)
+                records = read_records(part)
+                if len(records) and last is not None and records["timestamp"][0] <= last:
+                    self.logger.error("Store has candles newer than the download; "
+                                      "staged shards kept", symbol=symbol,
+                                      interval=interval, shard=shard.key,
+                                      stored_until=last)
+                    report.failed.append(shard.key)
+                    break
+                self.store.append(symbol, interval, records_frame(records))
+                last = self.store.last_open_time(symbol, interval)
+                part.unlink(missing_ok=True)
+                completed.discard(shard.key)
+        self._save_checkpoint(completed)
+
+    def _part_path(self, shard: Shard) -> Path:
+        return (self.staging / shard.symbol
+                / f"{shard.interval}.{shard.start}-{shard.end}.candles")
+
+    def _load_checkpoint(self) -> set:
+        if not self.checkpoint_path.exists():
+            return set()
+        with open(self.checkpoint_path) as f:
+            return set(json.load(f).get("completed", []))
+
+    def _save_checkpoint(self, completed: set):
+        self.staging.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"completed": sorted(completed)}, f)
+        tmp.replace(self.checkpoint_path)
+
+
+def _parse_date(value: str) -> int:
+    dt = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def main():
+    from makemerich.core.config import Config
+    from makemerich.skills.binance.market_data import MarketDataSkill
+    from makemerich.skills.binance.transport import BinanceTransport
+
+    parser = argparse.ArgumentParser(description="Download historical klines")
+    parser.add_argument("--config", default="config/default.yaml",
+                       help="Path to config file")
+    parser.add_argument("--symbols", nargs="+", required=True,
+                       help="Symbols to download")
+    parser.add_argument("--interval", default="1m", help="Kline interval")
+    parser.add_argument("--start", required=True, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="End date (YYYY-MM-DD, default: now)")
+    parser.add_argument("--history-dir", help="Candle store directory")
+    parser.add_argument("--concurrency", type=int, default=4,
+                       help="Shards downloaded in parallel")
+    parser.add_argument("--weight-share", type=float, default=0.5,
+                       help="Share of binance.weight_limit to use, leaving the "
+                            "rest to a trading process on the same IP")
+    parser.add_argument("--weight-per-minute", type=int,
+                       help="Request weight budget (overrides --weight-share)")
+    args = parser.parse_args()
+
+    config = Config.load(args.config)
+    if args.weight_per_minute:
+        config.binance.weight_limit = args.weight_per_minute
+    else:
+        config.binance.weight_limit = int(config.binance.weight_limit * args.weight_share)
+    store = CandleStore(Path(args.history_dir or config.data.history_dir
+                             or "data/candles"))
+    start = _parse_date(args.start)
+    end = _parse_date(args.end) if args.end else int(time.time() * 1000)
+
+    async def run():
+        transport = BinanceTransport(config)
+        try:
+            downloader = HistoryDownloader(
+                MarketDataSkill(config, transport), store,
+                concurrency=args.concurrency,
+            )
+            return await downloader.run(
+                downloader.plan(args.symbols, args.interval, start, end))
+        finally:
+            await transport.close()
+
+    report = asyncio.run(run())
+    print(f"Downloaded {report.candles} candles in {report.requests} requests "
+          f"({report.elapsed:.1f}s), {len(report.failed)} shard(s) failed")
+
+
+if __name__ == "__main__":
+    main()
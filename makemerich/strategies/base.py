@@ -2,7 +2,13 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Action codes of SignalSeries, indexing ACTIONS
+HOLD, BUY, SELL = 0, 1, 2
+ACTIONS = ("HOLD", "BUY", "SELL")
 
 
 @dataclass
@@ -13,11 +19,29 @@ class Signal:
     reason: str
     stop_loss: Optional[float] = None
     take_profit: Optional[float] = None
+    amount: Optional[float] = None  # quote amount to spend on a BUY; None: executor sizes it
+
+
+@dataclass
+class SignalSeries:
+    """Signals for every candle of a series; NaN where a level is unset."""
+    action: np.ndarray       # int8 action codes
+    strength: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+
+    @classmethod
+    def hold(cls, size: int) -> "SignalSeries":
+        return cls(np.zeros(size, dtype=np.int8), np.zeros(size),
+                   np.full(size, np.nan), np.full(size, np.nan))
 
 
 class BaseStrategy(ABC):
     """Base class for all trading strategies."""
 
+    # The analysis fields evaluate_series reads; None: all of them
+    series_fields: Optional[Tuple[str, ...]] = None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -27,3 +51,22 @@ class BaseStrategy(ABC):
     def evaluate(self, analysis: dict, portfolio: dict) -> Signal:
         """Evaluate market data and return a trading signal."""
         ...
+
+    def reset(self):
+        """Forget what earlier calls recorded, as before replaying a new
+        series; the backtester calls it at the start of every run."""
+
+    def vote(self, analysis: dict, portfolio: dict) -> Signal:
+        """The signal ``evaluate`` would give, without recording it as acted
+        on; what the ensemble asks. Stateless strategies just evaluate."""
+        return self.evaluate(analysis, portfolio)
+
+    def evaluate_series(self, analysis) -> SignalSeries:
+        """Optionally, ``evaluate`` for every candle in one vectorized pass.
+
+        ``analysis`` maps each ``evaluate`` field to an array with one entry
+        per candle, such as a ``TechnicalAnalysisSkill.analyze_history``
+        table. Only strategies whose signals don't depend on the portfolio
+        or on earlier calls can implement it.
+        """
+        raise NotImplementedError
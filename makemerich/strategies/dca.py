@@ -1,43 +1,149 @@
-"""Dollar Cost Averaging strategy — intelligent recurring buys."""
+"""Dollar Cost Averaging strategy — intelligent recurring buys.
+
+Schedule state lives in ``DCASchedule``, a columnar table with one row per
+pair (interval, base amount, last buy time), so one strategy instance
+serves any number of pairs. ``DCAStrategy.due_buys`` checks a whole basket
+against the table in one array pass, and ``next_due`` tells a scheduler
+how long it can sleep instead of polling pairs.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
 
-from datetime import datetime, timedelta
 from makemerich.strategies.base import BaseStrategy, Signal
 from makemerich.core.logger import get_logger
 
 
+class DCASchedule:
+    """Per-pair DCA schedule; times are epoch seconds, NaN for never."""
+
+    def __init__(self, interval_hours: float = 24, base_amount: float = 100):
+        self.interval_hours = interval_hours
+        self.base_amount = base_amount
+        self.pairs: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.interval = np.zeros(0)      # seconds between buys
+        self.amount = np.zeros(0)        # base quote amount per buy
+        self.last_buy = np.zeros(0)
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def add(self, pairs: Sequence[str], interval_hours: float = None,
+            base_amount: float = None):
+        """Schedule ``pairs`` (or reschedule them) with their own settings."""
+        interval = (self.interval_hours if interval_hours is None else interval_hours) * 3600
+        amount = self.base_amount if base_amount is None else base_amount
+        rows = self.rows(pairs)
+        self.interval[rows] = interval
+        self.amount[rows] = amount
+
+    def rows(self, pairs: Sequence[str]) -> np.ndarray:
+        """Table rows of ``pairs``, adding unknown ones with the defaults."""
+        new = [p for p in dict.fromkeys(pairs) if p not in self._index]
+        if new:
+            for pair in new:
+                self._index[pair] = len(self.pairs)
+                self.pairs.append(pair)
+            self.interval = np.append(self.interval, np.full(len(new), self.interval_hours * 3600.0))
+            self.amount = np.append(self.amount, np.full(len(new), float(self.base_amount)))
+            self.last_buy = np.append(self.last_buy, np.full(len(new), np.nan))
+        return np.fromiter((self._index[p] for p in pairs), dtype=np.intp, count=len(pairs))
+
+    def due(self, rows: np.ndarray, now) -> np.ndarray:
+        """Mask of ``rows`` whose interval has passed at ``now`` (scalar or per row)."""
+        last = self.last_buy[rows]
+        return np.isnan(last) | (now - last >= self.interval[rows])
+
+    def record(self, rows: np.ndarray, now):
+        self.last_buy[rows] = now
+
+    def reset(self):
+        """Mark every pair as never bought, keeping its settings."""
+        self.last_buy[:] = np.nan
+
+    def next_due(self) -> Optional[float]:
+        """Earliest time any scheduled pair is due; None without pairs."""
+        if not len(self.pairs):
+            return None
+        due = np.where(np.isnan(self.last_buy), -np.inf, self.last_buy + self.interval)
+        return float(due.min())
+
+
+@dataclass
+class DCABuys:
+    """The DCA buys due in one ``due_buys`` pass, aligned arrays."""
+    pairs: List[str]
+    amount: np.ndarray
+    stop_loss: np.ndarray    # NaN where the price was unknown
+    dip: np.ndarray          # bought in dip mode
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def signals(self) -> List[Signal]:
+        return [
+            Signal(
+                action="BUY",
+                pair=pair,
+                strength=0.6,
+                reason=f"DCA buy ({'dip mode' if dip else 'regular'}): amount ${amount}",
+                stop_loss=None if np.isnan(stop) else stop,
+                amount=amount,
+            )
+            for pair, amount, stop, dip in zip(self.pairs, self.amount.tolist(),
+                                               self.stop_loss.tolist(), self.dip.tolist())
+        ]
+
+
 class DCAStrategy(BaseStrategy):
     """Smart DCA — buy at regular intervals, increase size on dips."""
 
     name = "dca"
 
     def __init__(self, base_amount: float = 100, interval_hours: int = 24,
-                 dip_multiplier: float = 1.5, dip_threshold: float = -5.0):
+                 dip_multiplier: float = 1.5, dip_threshold: float = -5.0,
+                 clock: Callable[[], float] = time.time):
         self.base_amount = base_amount
         self.interval_hours = interval_hours
         self.dip_multiplier = dip_multiplier
         self.dip_threshold = dip_threshold
+        self.clock = clock
+        self.schedule = DCASchedule(interval_hours, base_amount)
         self.logger = get_logger("dca")
-        self._last_buy: datetime = None
+
+    def reset(self):
+        self.schedule.reset()
+
+    def now(self, analysis: dict) -> float:
+        """The candle time in ``analysis["timestamp"]`` (ms) when present,
+        as in a backtest, and ``clock()`` otherwise; epoch seconds."""
+        timestamp = analysis.get("timestamp")
+        return timestamp / 1000 if timestamp is not None else self.clock()
 
     def evaluate(self, analysis: dict, portfolio: dict) -> Signal:
-        """Check if it's time for a DCA buy."""
-        now = datetime.utcnow()
+        """Check if it's time for a DCA buy on the analysis' pair."""
+        pair = analysis.get("pair", "")
+        now = self.now(analysis)
+        row = self.schedule.rows([pair])
 
         # Check if interval has passed
-        if self._last_buy:
-            elapsed = (now - self._last_buy).total_seconds() / 3600
-            if elapsed < self.interval_hours:
-                hours_left = self.interval_hours - elapsed
-                return Signal(
-                    action="HOLD",
-                    pair=analysis.get("pair", ""),
-                    strength=0.0,
-                    reason=f"DCA: next buy in {hours_left:.1f} hours",
-                )
+        if not self.schedule.due(row, now)[0]:
+            hours_left = (self.schedule.last_buy[row[0]] + self.schedule.interval[row[0]]
+                          - now) / 3600
+            return Signal(
+                action="HOLD",
+                pair=pair,
+                strength=0.0,
+                reason=f"DCA: next buy in {hours_left:.1f} hours",
+            )
 
         # Determine amount — increase on dips
         change_24h = analysis.get("change_24h", 0)
-        amount = self.base_amount
+        amount = float(self.schedule.amount[row[0]])
         if change_24h < self.dip_threshold:
             amount *= self.dip_multiplier
             reason = f"DCA buy (dip mode): {change_24h}% 24h change, amount ${amount}"
@@ -45,12 +151,34 @@ class DCAStrategy(BaseStrategy):
             reason = f"DCA buy (regular): scheduled interval reached, amount ${amount}"
 
         price = analysis.get("current_price", 0)
-        self._last_buy = now
+        self.schedule.record(row, now)
 
         return Signal(
             action="BUY",
-            pair=analysis.get("pair", ""),
+            pair=pair,
             strength=0.6,
             reason=reason,
             stop_loss=price * 0.95 if price else None,
+            amount=amount,
         )
+
+    def due_buys(self, pairs: Sequence[str], change_24h=None, prices=None,
+                 now: float = None) -> DCABuys:
+        """Every buy due across ``pairs`` at ``now`` (epoch seconds, default
+        ``clock()``), recorded as made; ``change_24h`` and ``prices`` are
+        aligned with ``pairs``."""
+        now = self.clock() if now is None else now
+        rows = self.schedule.rows(pairs)
+        due = np.flatnonzero(self.schedule.due(rows, now))
+        rows = rows[due]
+
+        change = (np.zeros(len(due)) if change_24h is None
+                  else np.asarray(change_24h, dtype=np.float64)[due])
+        price = (np.zeros(len(due)) if prices is None
+                 else np.asarray(prices, dtype=np.float64)[due])
+        dip = change < self.dip_threshold
+        amount = np.where(dip, self.schedule.amount[rows] * self.dip_multiplier,
+                          self.schedule.amount[rows])
+        stop_loss = np.where(price > 0, price * 0.95, np.nan)
+        self.schedule.record(rows, now)
+        return DCABuys([pairs[i] for i in due.tolist()], amount, stop_loss, dip)
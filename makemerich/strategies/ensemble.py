@@ -0,0 +1,191 @@
+"""Strategy ensemble — every configured strategy votes on every pair.
+
+The ensemble runs each cycle on the analysis the market pipeline already
+computed, before the LLM is asked. Each strategy's ``Signal`` is a vote
+weighted by its configured weight and its strength; the net of BUY (+1)
+and SELL (-1) votes over the total weight is the pair's score. Strategies
+are plain Python over a dict, a few microseconds each, so the whole stage
+is one pass in the event loop rather than a fan-out.
+
+Votes go through ``BaseStrategy.vote``, which records nothing: a grid
+outvoted on a level hasn't traded it, so the level stays unfilled. The
+latest consensus is kept for the LLM context and written as a JSON
+snapshot for the dashboard, which runs in its own process.
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from makemerich.strategies.base import BaseStrategy, Signal
+from makemerich.strategies.dca import DCAStrategy
+from makemerich.strategies.grid import GridStrategy
+from makemerich.strategies.mean_reversion import MeanReversionStrategy
+from makemerich.strategies.momentum import MomentumStrategy
+
+STRATEGIES = {
+    "momentum": MomentumStrategy,
+    "mean_reversion": MeanReversionStrategy,
+    "grid": GridStrategy,
+    "dca": DCAStrategy,
+}
+
+DIRECTION = {"BUY": 1.0, "SELL": -1.0, "HOLD": 0.0}
+
+
+# Strategies whose vote() would record a buy as made; a vote isn't a trade
+NON_VOTING = {"dca"}
+
+
+def build_strategy(name: str, params: dict) -> BaseStrategy:
+    """A fresh strategy instance; a grid not restored from its state file
+    is laid out over its price range."""
+    strategy = STRATEGIES[name](**params)
+    if isinstance(strategy, GridStrategy) and not len(strategy.prices):
+        strategy.setup_grid(strategy.lower_price, strategy.upper_price)
+    return strategy
+
+
+@dataclass
+class Consensus:
+    signal: Signal
+    score: float                  # -1 (unanimous SELL) to 1 (unanimous BUY)
+    votes: Dict[str, Signal] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self.signal),
+            "score": round(self.score, 4),
+            "votes": {name: {"action": v.action, "strength": round(v.strength, 4),
+                             "reason": v.reason}
+                      for name, v in self.votes.items()},
+        }
+
+
+class StrategyEnsemble:
+    """Weighted vote of several strategies, per pair.
+
+    ``strategies`` maps a strategy name to ``{"weight": w, "params": {...},
+    "pairs": {pair: {...}}}``; a pair's entry overrides ``params`` for it.
+    Each pair gets its own instances, since a grid keeps state; a grid's
+    ``state_path`` names a directory holding one ``<pair>.npz`` per pair.
+    """
+
+    def __init__(self, strategies: Dict[str, dict], min_confidence: float = 0.0):
+        unknown = set(strategies) - set(STRATEGIES)
+        if unknown:
+            raise ValueError(f"Unknown strategies: {', '.join(sorted(unknown))}")
+        excluded = set(strategies) & NON_VOTING
+        if excluded:
+            raise ValueError(f"Strategies that can't vote: {', '.join(sorted(excluded))}")
+        self.specs = {name: (float((spec or {}).get("weight", 1.0)),
+                             dict((spec or {}).get("params") or {}),
+                             dict((spec or {}).get("pairs") or {}))
+                      for name, spec in strategies.items()}
+        self.total_weight = sum(weight for weight, _, _ in self.specs.values())
+        self.min_confidence = min_confidence
+        self._members: Dict[str, List[Tuple[str, float, BaseStrategy]]] = {}
+        self.latest: Dict[str, Consensus] = {}
+        self.updated_at: Optional[float] = None
+        self.elapsed_ms = 0.0
+
+    @classmethod
+    def from_config(cls, config) -> "StrategyEnsemble":
+        return cls(config.strategies, config.min_confidence)
+
+    def members(self, pair: str) -> List[Tuple[str, float, BaseStrategy]]:
+        members = self._members.get(pair)
+        if members is None:
+            members = self._members[pair] = [
+                (name, weight, build_strategy(name, self.params(name, pair)))
+                for name, (weight, _, _) in self.specs.items()
+            ]
+        return members
+
+    def params(self, name: str, pair: str) -> dict:
+        """Constructor arguments of strategy ``name`` for ``pair``."""
+        _, params, pairs = self.specs[name]
+        params = {**params, **(pairs.get(pair) or {})}
+        if name == "grid" and params.get("state_path"):
+            params["state_path"] = Path(params["state_path"]) / f"{pair}.npz"
+        return params
+
+    def evaluate_pair(self, pair: str, analysis: dict,
+                      portfolio: dict = None) -> Consensus:
+        """Ask every strategy about ``pair`` and merge their votes."""
+        analysis = {**analysis, "pair": pair}
+        portfolio = portfolio or {}
+        members = self.members(pair)
+        votes = {}
+        score = 0.0
+        for name, weight, strategy in members:
+            signal = strategy.vote(analysis, portfolio)
+            votes[name] = signal
+            score += weight * signal.strength * DIRECTION[signal.action]
+        if self.total_weight:
+            score /= self.total_weight
+
+        if score and abs(score) >= self.min_confidence:
+            action = "BUY" if score > 0 else "SELL"
+        else:
+            action = "HOLD"
+        agreeing = [(weight * votes[name].strength, votes[name])
+                    for name, weight, _ in members
+                    if votes[name].action == action != "HOLD"]
+        signal = Signal(
+            action=action,
+            pair=pair,
+            strength=abs(score) if action != "HOLD" else 0.0,
+            reason=", ".join(f"{name} {v.action} {v.strength:.2f}"
+                             for name, v in votes.items()),
+            stop_loss=_weighted(agreeing, "stop_loss"),
+            take_profit=_weighted(agreeing, "take_profit"),
+            amount=_weighted(agreeing, "amount"),
+        )
+        return Consensus(signal, score, votes)
+
+    def evaluate(self, analysis: Dict[str, dict],
+                 portfolio: dict = None) -> Dict[str, Consensus]:
+        """Consensus for every pair of a pipeline cycle's ``analysis``."""
+        start = time.perf_counter()
+        self.latest = {pair: self.evaluate_pair(pair, data, portfolio)
+                       for pair, data in analysis.items()}
+        self.elapsed_ms = (time.perf_counter() - start) * 1000
+        self.updated_at = time.time()
+        return self.latest
+
+    def snapshot(self) -> dict:
+        return {
+            "updated_at": self.updated_at,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+            "strategies": {name: weight for name, (weight, _, _) in self.specs.items()},
+            "pairs": {pair: c.to_dict() for pair, c in self.latest.items()},
+        }
+
+    def save(self, path: Path):
+        """Write ``snapshot()`` to ``path`` as JSON, replacing it atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, path)
+
+
+def _weighted(votes: List[Tuple[float, Signal]], name: str) -> Optional[float]:
+    """Vote-weighted mean of a Signal field over the votes that set it."""
+    values = [(w, getattr(s, name)) for w, s in votes if getattr(s, name) is not None]
+    total = sum(w for w, _ in values)
+    if not total:
+        return None
+    return sum(w * v for w, v in values) / total
+
+
+def load_snapshot(path: Path) -> dict:
+    """The last snapshot written by ``StrategyEnsemble.save``, or an empty one."""
+    path = Path(path)
+    if not path.exists():
+        return {"updated_at": None, "pairs": {}}
+    return json.loads(path.read_text())
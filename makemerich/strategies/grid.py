@@ -1,10 +1,26 @@
-"""Grid trading strategy — place buy and sell orders at intervals."""
+"""Grid trading strategy — place buy and sell orders at intervals.
 
-from dataclasses import dataclass, field
-from typing import List
-from makemerich.strategies.base import BaseStrategy, Signal
+Levels are held in sorted parallel arrays (price, side, filled flag, order
+id), so a tick finds the levels it crossed by bisection and grids of
+thousands of levels cost the same per tick as small ones. With a
+``state_path`` the arrays are saved to a compressed ``.npz`` after every
+fill and loaded on start, so a restart neither rebuilds the grid nor fills
+a level twice.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from makemerich.strategies.base import ACTIONS, BUY, SELL, BaseStrategy, Signal
 from makemerich.core.logger import get_logger
 
+# Relative distance from a level within which the price counts as at it
+TOLERANCE = 0.001
+
 
 @dataclass
 class GridLevel:
@@ -20,54 +36,166 @@ class GridStrategy(BaseStrategy):
     name = "grid"
 
     def __init__(self, lower_price: float = 0, upper_price: float = 0,
-                 num_grids: int = 10, total_investment: float = 1000):
+                 num_grids: int = 10, total_investment: float = 1000,
+                 state_path: Path = None):
         self.lower_price = lower_price
         self.upper_price = upper_price
         self.num_grids = num_grids
         self.total_investment = total_investment
+        self.state_path = Path(state_path) if state_path else None
         self.logger = get_logger("grid")
-        self.levels: List[GridLevel] = []
+        self.prices = np.zeros(0)
+        self.sides = np.zeros(0, dtype=np.int8)
+        self.filled = np.zeros(0, dtype=bool)
+        self.order_ids = np.zeros(0, dtype=object)
+        self.last_price: Optional[float] = None
+        # Level indices fired by the latest evaluate()
+        self.triggered = np.zeros(0, dtype=np.intp)
+        if self.state_path and self.state_path.exists():
+            self.load(self.state_path)
+
+    @property
+    def levels(self) -> List[GridLevel]:
+        """Snapshot of the grid as GridLevel records, lowest price first."""
+        return [GridLevel(price, ACTIONS[side], filled, order_id)
+                for price, side, filled, order_id in zip(
+                    self.prices.tolist(), self.sides.tolist(),
+                    self.filled.tolist(), self.order_ids.tolist())]
 
     def setup_grid(self, lower: float, upper: float):
         """Initialize the grid levels."""
         self.lower_price = lower
         self.upper_price = upper
-        step = (upper - lower) / self.num_grids
+        count = self.num_grids + 1
+        self.prices = np.linspace(lower, upper, count)
+        self.sides = np.where(np.arange(count) < self.num_grids // 2,
+                              BUY, SELL).astype(np.int8)
+        self.filled = np.zeros(count, dtype=bool)
+        self.order_ids = np.full(count, "", dtype=object)
+        self.last_price = None
+        self.triggered = np.zeros(0, dtype=np.intp)
+        if self.state_path:
+            self.save(self.state_path)
 
-        self.levels = []
-        for i in range(self.num_grids + 1):
-            price = lower + (step * i)
-            self.levels.append(GridLevel(
-                price=round(price, 2),
-                side="BUY" if i < self.num_grids // 2 else "SELL",
-            ))
+    def reset(self):
+        """Unfill every level and forget the last price, keeping the levels."""
+        self.filled[:] = False
+        self.order_ids[:] = ""
+        self.last_price = None
+        self.triggered = np.zeros(0, dtype=np.intp)
+        if self.state_path and len(self.prices):
+            self.save(self.state_path)
 
     def evaluate(self, analysis: dict, portfolio: dict) -> Signal:
-        """Check if current price triggers a grid level."""
+        """Fire every unfilled level crossed since the previous price.
+
+        A falling price fires the BUY levels it passed, a rising one the
+        SELL levels; levels within ``TOLERANCE`` of the price count as
+        reached. Without a previous price (first call, or unchanged) the
+        side of the nearest reached level fires. Fired levels are marked
+        filled and the price is remembered.
+        """
+        return self._signal(analysis, commit=True)
+
+    def vote(self, analysis: dict, portfolio: dict) -> Signal:
+        """``evaluate`` without filling levels or moving the last price."""
+        return self._signal(analysis, commit=False)
+
+    def _signal(self, analysis: dict, commit: bool) -> Signal:
         price = analysis.get("current_price", 0)
+        pair = analysis.get("pair", "")
+        if commit:
+            self.triggered = np.zeros(0, dtype=np.intp)
 
-        if not self.levels:
+        if not len(self.prices):
             return Signal(
                 action="HOLD",
-                pair=analysis.get("pair", ""),
+                pair=pair,
                 strength=0.0,
                 reason="Grid not initialized. Call setup_grid() first.",
             )
 
-        for level in self.levels:
-            if not level.filled and abs(price - level.price) / level.price < 0.001:
-                level.filled = True
-                amount = self.total_investment / self.num_grids
-                return Signal(
-                    action=level.side,
-                    pair=analysis.get("pair", ""),
-                    strength=0.9,
-                    reason=f"Grid {level.side} triggered at {level.price}",
-                )
+        last = self.last_price
+        if commit:
+            self.last_price = price
+        low = price * (1 - TOLERANCE) if last is None else min(last, price * (1 - TOLERANCE))
+        high = price * (1 + TOLERANCE) if last is None else max(last, price * (1 + TOLERANCE))
+        start = int(np.searchsorted(self.prices, low, side="left"))
+        stop = int(np.searchsorted(self.prices, high, side="right"))
+        crossed = start + np.flatnonzero(~self.filled[start:stop])
 
+        if len(crossed):
+            if last is not None and price < last:
+                side = BUY
+            elif last is not None and price > last:
+                side = SELL
+            else:
+                side = self.sides[crossed[np.abs(self.prices[crossed] - price).argmin()]]
+            crossed = crossed[self.sides[crossed] == side]
+
+        if not len(crossed):
+            return Signal(
+                action="HOLD",
+                pair=pair,
+                strength=0.0,
+                reason=f"Price {price} not at any grid level",
+            )
+
+        if commit:
+            self.filled[crossed] = True
+            self.triggered = crossed
+            if self.state_path:
+                self.save(self.state_path)
+
+        action = ACTIONS[side]
+        per_level = self.total_investment / self.num_grids
+        levels = self.prices[crossed]
+        where = (f"{levels[0]:g}" if len(levels) == 1
+                 else f"{len(levels)} levels {levels.min():g}-{levels.max():g}")
         return Signal(
-            action="HOLD",
-            pair=analysis.get("pair", ""),
-            strength=0.0,
-            reason=f"Price {price} not at any grid level",
+            action=action,
+            pair=pair,
+            strength=0.9,
+            reason=f"Grid {action} triggered at {where}",
+            amount=per_level * len(crossed) if side == BUY else None,
         )
+
+    def set_order_id(self, indices, order_id: str):
+        """Record the exchange order placed for levels (e.g. ``triggered``)."""
+        self.order_ids[indices] = order_id
+        if self.state_path:
+            self.save(self.state_path)
+
+    def save(self, path: Path):
+        """Write the grid to ``path`` (.npz), replacing it atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.savez_compressed(
+                fh,
+                prices=self.prices,
+                sides=self.sides,
+                filled=self.filled,
+                order_ids=self.order_ids.astype(str),
+                params=np.array([self.lower_price, self.upper_price,
+                                 self.num_grids, self.total_investment]),
+                last_price=np.array(np.nan if self.last_price is None
+                                    else self.last_price),
+            )
+        os.replace(tmp, path)
+
+    def load(self, path: Path):
+        """Restore a grid written by ``save``."""
+        with np.load(path) as state:
+            self.prices = state["prices"]
+            self.sides = state["sides"]
+            self.filled = state["filled"]
+            self.order_ids = state["order_ids"].astype(object)
+            lower, upper, num_grids, total_investment = state["params"].tolist()
+            last_price = float(state["last_price"])
+        self.lower_price, self.upper_price = lower, upper
+        self.num_grids, self.total_investment = int(num_grids), total_investment
+        self.last_price = None if np.isnan(last_price) else last_price
+        self.logger.info(f"Grid restored from {path}: {int(self.filled.sum())}/"
+                         f"{len(self.prices)} levels filled")
@@ -1,12 +1,15 @@
 """Mean reversion strategy — buy low, sell high relative to the mean."""
 
-from makemerich.strategies.base import BaseStrategy, Signal
+import numpy as np
+
+from makemerich.strategies.base import BUY, SELL, BaseStrategy, Signal, SignalSeries
 
 
 class MeanReversionStrategy(BaseStrategy):
     """Buy when price is below the mean, sell when above."""
 
     name = "mean_reversion"
+    series_fields = ("current_price", "rsi", "bb_position", "bb_middle")
 
     def __init__(self, bb_buy_threshold: str = "below_lower",
                  bb_sell_threshold: str = "above_upper"):
@@ -43,3 +46,27 @@ class MeanReversionStrategy(BaseStrategy):
             strength=0.0,
             reason=f"No mean reversion signal: BB={bb_position}, RSI={rsi}",
         )
+
+    def evaluate_series(self, analysis) -> SignalSeries:
+        """``evaluate`` for every candle at once.
+
+        Band positions are compared only where the RSI condition already
+        holds, which keeps string comparisons off most of the series.
+        """
+        rsi = np.asarray(analysis["rsi"], dtype=np.float64)
+        price = np.asarray(analysis["current_price"], dtype=np.float64)
+        bb_position = np.asarray(analysis["bb_position"])
+        signals = SignalSeries.hold(len(rsi))
+
+        buy = np.flatnonzero(rsi < 35)
+        buy = buy[bb_position[buy] == self.bb_buy_threshold]
+        signals.action[buy] = BUY
+        signals.strength[buy] = 0.8
+        signals.stop_loss[buy] = price[buy] * 0.96
+        signals.take_profit[buy] = np.asarray(analysis["bb_middle"], dtype=np.float64)[buy]
+
+        sell = np.flatnonzero(rsi > 65)
+        sell = sell[bb_position[sell] == self.bb_sell_threshold]
+        signals.action[sell] = SELL
+        signals.strength[sell] = 0.8
+        return signals
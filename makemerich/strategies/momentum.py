@@ -1,12 +1,15 @@
 """Momentum strategy — ride the trend."""
 
-from makemerich.strategies.base import BaseStrategy, Signal
+import numpy as np
+
+from makemerich.strategies.base import BUY, SELL, BaseStrategy, Signal, SignalSeries
 
 
 class MomentumStrategy(BaseStrategy):
     """Buy when momentum is strong and trending up, sell when it fades."""
 
     name = "momentum"
+    series_fields = ("current_price", "rsi", "macd_signal", "volume_trend")
 
     def __init__(self, rsi_buy_threshold: float = 40, rsi_sell_threshold: float = 70,
                  require_macd_confirm: bool = True):
@@ -21,8 +24,9 @@ class MomentumStrategy(BaseStrategy):
         volume_trend = analysis.get("volume_trend", "normal")
         price = analysis.get("current_price", 0)
 
-        # Buy signal: RSI recovering from oversold + MACD bullish
-        if rsi < self.rsi_buy_threshold and macd_signal == "bullish":
+        # Buy signal: RSI recovering from oversold + MACD bullish (if required)
+        confirm = self.require_macd_confirm
+        if rsi < self.rsi_buy_threshold and (not confirm or macd_signal == "bullish"):
             strength = min((self.rsi_buy_threshold - rsi) / 30, 1.0)
             if volume_trend == "above_average":
                 strength = min(strength + 0.2, 1.0)
@@ -30,19 +34,19 @@ class MomentumStrategy(BaseStrategy):
                 action="BUY",
                 pair=analysis.get("pair", ""),
                 strength=strength,
-                reason=f"Momentum buy: RSI={rsi} recovering, MACD bullish, volume {volume_trend}",
+                reason=f"Momentum buy: RSI={rsi} recovering, MACD {macd_signal}, volume {volume_trend}",
                 stop_loss=price * 0.97,
                 take_profit=price * 1.06,
             )
 
-        # Sell signal: RSI overbought + MACD bearish
-        if rsi > self.rsi_sell_threshold and macd_signal == "bearish":
+        # Sell signal: RSI overbought + MACD bearish (if required)
+        if rsi > self.rsi_sell_threshold and (not confirm or macd_signal == "bearish"):
             strength = min((rsi - self.rsi_sell_threshold) / 30, 1.0)
             return Signal(
                 action="SELL",
                 pair=analysis.get("pair", ""),
                 strength=strength,
-                reason=f"Momentum sell: RSI={rsi} overbought, MACD bearish",
+                reason=f"Momentum sell: RSI={rsi} overbought, MACD {macd_signal}",
             )
 
         return Signal(
@@ -51,3 +55,33 @@ class MomentumStrategy(BaseStrategy):
             strength=0.0,
             reason=f"No momentum signal: RSI={rsi}, MACD={macd_signal}",
         )
+
+    def evaluate_series(self, analysis) -> SignalSeries:
+        """``evaluate`` for every candle at once.
+
+        Labels are compared only where the RSI condition already holds,
+        which keeps string comparisons off most of the series.
+        """
+        rsi = np.asarray(analysis["rsi"], dtype=np.float64)
+        price = np.asarray(analysis["current_price"], dtype=np.float64)
+        macd_signal = np.asarray(analysis["macd_signal"])
+        signals = SignalSeries.hold(len(rsi))
+
+        buy = np.flatnonzero(rsi < self.rsi_buy_threshold)
+        if self.require_macd_confirm:
+            buy = buy[macd_signal[buy] == "bullish"]
+        strength = np.minimum((self.rsi_buy_threshold - rsi[buy]) / 30, 1.0)
+        boost = np.asarray(analysis["volume_trend"])[buy] == "above_average"
+        strength[boost] = np.minimum(strength[boost] + 0.2, 1.0)
+        signals.action[buy] = BUY
+        signals.strength[buy] = strength
+        signals.stop_loss[buy] = price[buy] * 0.97
+        signals.take_profit[buy] = price[buy] * 1.06
+
+        sell = np.flatnonzero(rsi > self.rsi_sell_threshold)
+        sell = sell[signals.action[sell] != BUY]
+        if self.require_macd_confirm:
+            sell = sell[macd_signal[sell] == "bearish"]
+        signals.action[sell] = SELL
+        signals.strength[sell] = np.minimum((rsi[sell] - self.rsi_sell_threshold) / 30, 1.0)
+        return signals
@@ -1,12 +1,16 @@
 """FastAPI web dashboard for MakeMeRich."""
 
+import os
+
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 
+from makemerich.core.config import Config
 from makemerich.crystalbox.audit import AuditLog
+from makemerich.strategies.ensemble import load_snapshot
 
 app = FastAPI(title="MakeMeRich Dashboard", version="0.1.0")
 
@@ -19,6 +23,8 @@ if static_dir.exists():
 
 templates = Jinja2Templates(directory=str(templates_dir))
 audit = AuditLog(data_dir=Path("data/crystalbox"))
+config = Config.load(os.getenv("MAKEMERICH_CONFIG", "config/default.yaml"))
+signals_path = Path(config.ensemble.signals_path)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -39,6 +45,15 @@ async def get_trades(pair: str = None, limit: int = 50):
     return audit.get_history(pair=pair, limit=limit)
 
 
+@app.get("/api/signals")
+async def get_signals(pair: str = None):
+    """Latest strategy ensemble consensus, written by the engine each cycle."""
+    snapshot = load_snapshot(signals_path)
+    if pair:
+        snapshot["pairs"] = {p: s for p, s in snapshot["pairs"].items() if p == pair}
+    return snapshot
+
+
 @app.get("/api/audit/verify")
 async def verify_audit():
     """Verify the audit chain integrity."""
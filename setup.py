@@ -15,18 +15,22 @@ setup(
         "ccxt>=4.0",
         "python-binance>=1.0.19",
         "anthropic>=0.40.0",
-        "pandas>=2.0",
         "numpy>=1.24",
-        "ta>=0.11.0",
         "fastapi>=0.110.0",
         "uvicorn>=0.27.0",
         "jinja2>=3.1",
         "structlog>=24.0",
         "rich>=13.0",
     ],
+    extras_require={
+        # Reference indicator backend (data.indicator_backend: ta)
+        "ta": ["pandas>=2.0", "ta>=0.11.0"],
+    },
     entry_points={
         "console_scripts": [
             "makemerich=makemerich.main:main",
+            "makemerich-download=makemerich.storage.downloader:main",
+            "makemerich-optimize=makemerich.backtest.optimizer:main",
         ],
     },
     license="MIT",
@@ -0,0 +1,385 @@
+"""Tests for the analysis skills."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import numpy as np
+import pytest
+from makemerich.skills.analysis.technical import TechnicalAnalysisSkill
+from makemerich.skills.analysis.patterns import PatternDetectionSkill
+from makemerich.skills.klines import KlineFrame
+
+MINUTE = 60_000
+
+
+def random_klines(n=120, seed=7):
+    """A reproducible random-walk candle series as a KlineFrame."""
+    rng = np.random.default_rng(seed)
+    close = 50000 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.003, n)) * close
+    timestamp = np.arange(n, dtype=np.int64) * MINUTE
+    return KlineFrame({
+        "timestamp": timestamp,
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.uniform(10, 100, n),
+        "close_time": timestamp + MINUTE - 1,
+        "quote_volume": rng.uniform(1e5, 1e6, n),
+        "trades": rng.integers(100, 1000, n),
+    })
+
+
+def candles(rows):
+    """A KlineFrame from (open, high, low, close) tuples."""
+    o, h, l, c = (np.array(col, dtype=np.float64) for col in zip(*rows))
+    timestamp = np.arange(len(rows), dtype=np.int64) * MINUTE
+    return KlineFrame({
+        "timestamp": timestamp, "open": o, "high": h, "low": l, "close": c,
+        "volume": np.ones(len(rows)), "close_time": timestamp + MINUTE - 1,
+        "quote_volume": np.ones(len(rows)), "trades": np.ones(len(rows), dtype=np.int64),
+    })
+
+
+class TestTechnicalAnalysis:
+    def test_frame_and_dicts_agree(self):
+        frame = random_klines()
+        skill = TechnicalAnalysisSkill()
+
+        assert skill.analyze(frame) == skill.analyze(frame.to_dicts())
+
+    def test_empty_input(self):
+        skill = TechnicalAnalysisSkill()
+        assert skill.analyze(KlineFrame.empty()) == {"error": "No data available"}
+
+
+def assert_close(expected: dict, actual: dict, price_tol: float = 0.011,
+                 oscillator_tol: float = 0.011):
+    """Compare analyze() outputs; oscillators are on a 0-100 scale."""
+    assert expected.keys() == actual.keys()
+    for key, value in expected.items():
+        if isinstance(value, str) or value is None:
+            if key != "bb_position":
+                assert actual[key] == value, key
+        elif key in ("rsi", "stoch_k", "stoch_d"):
+            assert actual[key] == pytest.approx(value, abs=oscillator_tol, nan_ok=True), key
+        else:
+            assert actual[key] == pytest.approx(value, abs=price_tol, nan_ok=True), key
+
+
+class TestIndicatorSeries:
+    def test_series_aligned_with_candles(self):
+        frame = random_klines(120)
+        skill = TechnicalAnalysisSkill()
+
+        series = skill.analyze_series(frame)
+
+        assert all(len(values) == 120 for values in series.values())
+        assert series["timestamp"].tolist() == frame.timestamp.tolist()
+        assert np.isnan(series["rsi"][:13]).all()
+        for end in (60, 90, 120):
+            scalar = skill.analyze(frame[:end])
+            assert round(series["rsi"][end - 1], 2) == scalar["rsi"]
+            assert round(series["ema_50"][end - 1], 2) == scalar["ema_50"]
+
+    def test_cached_by_last_close_time(self):
+        frame = random_klines(100)
+        skill = TechnicalAnalysisSkill()
+
+        first = skill.analyze_series(frame, "BTCUSDT", "1m")
+        assert skill.analyze_series(frame.copy(), "BTCUSDT", "1m") is first
+        assert not first["close"].flags.writeable
+
+        forming = frame.copy()
+        forming.close[-1] += 10.0
+        revised = skill.analyze_series(forming, "BTCUSDT", "1m")
+        assert revised is not first
+        assert revised["close"][-1] == forming.close[-1]
+        assert skill.analyze(forming, "BTCUSDT", "1m") == skill.analyze(forming)
+
+
+class TestIncrementalIndicators:
+    def test_matches_analyze_on_same_candles(self):
+        skill = TechnicalAnalysisSkill()
+        for n in (30, 50, 120, 400):
+            for seed in range(3):
+                frame = random_klines(n, seed)
+                assert_close(skill.analyze(frame),
+                             skill.analyze_incremental("BTCUSDT", f"{n}/{seed}", frame))
+
+    def test_tracks_sliding_window_with_revisions(self):
+        frame = random_klines(600, seed=3)
+        skill = TechnicalAnalysisSkill()
+
+        for end in range(100, 600):
+            window = frame[end - 100:end]
+            forming = window.copy()
+            forming.close[-1] *= 1.01
+            forming.high[-1] = max(forming.high[-1], forming.close[-1])
+            skill.analyze_incremental("BTCUSDT", "1m", forming)
+            result = skill.analyze_incremental("BTCUSDT", "1m", window)
+
+        # Recursions carry history beyond the window, so allow the decayed
+        # seed difference of a windowed recompute (well under 0.1% of price)
+        expected = skill.analyze(window)
+        assert_close(expected, result, price_tol=expected["current_price"] * 1e-3,
+                     oscillator_tol=0.1)
+
+    def test_restarts_when_series_jumps(self):
+        frame = random_klines(300)
+        skill = TechnicalAnalysisSkill()
+        skill.analyze_incremental("BTCUSDT", "1m", frame[:100])
+
+        result = skill.analyze_incremental("BTCUSDT", "1m", frame[200:300])
+        assert_close(skill.analyze(frame[200:300]), result)
+
+    def test_revision_equals_fresh_state(self):
+        from makemerich.skills.analysis.incremental import IndicatorSet
+
+        frame = random_klines(80)
+        revised = IndicatorSet()
+        revised.update(frame[:60])
+        forming = frame[59:60].copy()
+        forming.close[0] += 500.0
+        revised.update(forming)
+        revised.update(frame[59:])
+
+        fresh = IndicatorSet()
+        fresh.update(frame)
+        assert revised.values() == pytest.approx(fresh.values(), nan_ok=True)
+
+
+class TestBatchAnalysis:
+    def test_matches_analyze_per_pair(self):
+        frames = [random_klines(n, seed) for seed, n in enumerate([120, 100, 60, 45, 30])]
+        skill = TechnicalAnalysisSkill()
+
+        batch = skill.analyze_batch(frames)
+
+        assert len(batch) == len(frames)
+        for frame, row in zip(frames, batch):
+            for key, value in skill.analyze(frame).items():
+                if value is None:
+                    assert np.isnan(row[key]), key
+                elif isinstance(value, str):
+                    assert row[key] == value, key
+                else:
+                    assert row[key] == pytest.approx(value, nan_ok=True), key
+
+    def test_matrix_input(self):
+        frames = [random_klines(100, seed) for seed in range(3)]
+        skill = TechnicalAnalysisSkill()
+        matrices = {f: np.stack([getattr(k, f) for k in frames])
+                    for f in ("high", "low", "close", "volume")}
+
+        batch = skill.analyze_batch(matrices)
+
+        assert batch.dtype.names[:3] == ("current_price", "rsi", "rsi_signal")
+        assert batch["rsi"][2] == skill.analyze(frames[2])["rsi"]
+
+
+class TestAnalysisMemo:
+    def test_unchanged_window_is_a_hit(self):
+        frame = random_klines()
+        skill = TechnicalAnalysisSkill()
+
+        first = skill.analyze(frame, "BTCUSDT", "1h")
+        second = skill.analyze(frame.copy(), "BTCUSDT", "1h")
+        forming = frame.copy()
+        forming.volume[-1] += 1.0
+        skill.analyze(forming, "BTCUSDT", "1h")
+
+        assert first == second == skill.analyze(frame)
+        assert first is not second
+        assert skill.memo.stats()["hits"] == 1
+        assert skill.memo.stats()["misses"] == 2
+
+    def test_lru_eviction(self):
+        from makemerich.skills.analysis.memo import AnalysisMemo
+
+        memo = AnalysisMemo(maxsize=2)
+        memo.get_or_compute("a", lambda: 1)
+        memo.get_or_compute("b", lambda: 2)
+        memo.get_or_compute("a", lambda: 1)
+        memo.get_or_compute("c", lambda: 3)
+
+        assert memo.get_or_compute("a", lambda: "recomputed") == 1
+        assert memo.get_or_compute("b", lambda: "recomputed") == "recomputed"
+        assert memo.stats()["size"] == 2
+
+    def test_pattern_detection_memoized(self):
+        frame = random_klines()
+        skill = PatternDetectionSkill()
+
+        assert skill.detect(frame, "BTCUSDT", "1h") == skill.detect(frame)
+        skill.detect(frame, "BTCUSDT", "1h")
+        assert skill.memo.stats()["hits"] == 1
+
+
+class TestPatternDetection:
+    def test_frame_and_dicts_agree(self):
+        frame = random_klines()
+        skill = PatternDetectionSkill()
+
+        for end in range(3, len(frame)):
+            window = frame[:end]
+            assert skill.detect(window) == skill.detect(window.to_dicts())
+
+    def test_multi_candle_patterns(self):
+        skill = PatternDetectionSkill()
+        cases = {
+            "morning_star": [(110, 111, 99, 100), (100, 101, 98, 99), (99, 108, 98, 107)],
+            "evening_star": [(100, 111, 99, 110), (110, 112, 109, 111), (111, 112, 102, 103)],
+            "three_white_soldiers": [(100, 105, 99, 104), (103, 109, 102, 108),
+                                     (107, 113, 106, 112)],
+            "three_black_crows": [(112, 113, 107, 108), (109, 110, 103, 104),
+                                  (105, 106, 99, 100)],
+            "bullish_harami": [(100, 100, 100, 100), (110, 111, 99, 100), (102, 106, 101, 105)],
+            "bearish_harami": [(100, 100, 100, 100), (100, 111, 99, 110), (108, 109, 104, 105)],
+        }
+        for name, rows in cases.items():
+            assert name in [p["pattern"] for p in skill.detect(candles(rows))], name
+
+    def test_scan_marks_every_occurrence(self):
+        frame = random_klines(400, 3)
+        skill = PatternDetectionSkill()
+
+        masks = skill.scan(frame)
+        for end in range(3, len(frame) + 1):
+            found = {p["pattern"] for p in skill.detect(frame[:end])}
+            assert found == {name for name, mask in masks.items() if mask[end - 1]}
+
+    def test_incremental_scan_matches_full_scan(self):
+        frame = random_klines(300, 4)
+        skill = PatternDetectionSkill()
+
+        for end in [*range(100, len(frame), 7), len(frame)]:
+            window = frame[end - 100:end].copy()
+            # A still-forming newest candle, revised by the next window
+            window.close[-1] = window.open[-1]
+            skill.scan_incremental("BTCUSDT", "1h", window)
+            masks = skill.scan_incremental("BTCUSDT", "1h", frame[end - 100:end])
+
+        expected = skill.scan(frame)
+        np.testing.assert_array_equal(masks["timestamp"], frame.timestamp)
+        for name, mask in expected.items():
+            np.testing.assert_array_equal(masks[name], mask)
+
+    def test_statistics(self):
+        frame = random_klines(500, 5)
+        skill = PatternDetectionSkill()
+
+        stats = skill.statistics(frame, horizon=5)
+        for name, mask in skill.scan(frame).items():
+            assert stats[name]["count"] == mask.sum()
+        engulfing = np.flatnonzero(skill.scan(frame)["bullish_engulfing"])
+        engulfing = engulfing[engulfing < len(frame) - 5]
+        moves = (frame.close[engulfing + 5] / frame.close[engulfing] - 1) * 100
+        assert stats["bullish_engulfing"]["mean_return"] == round(moves.mean(), 4)
+
+
+class TestDetailedAnalysis:
+    def make_skill(self, **kwargs):
+        market_data = MagicMock()
+        market_data.get_klines = AsyncMock(
+            side_effect=lambda symbol, interval, limit: random_klines(limit))
+        return TechnicalAnalysisSkill(market_data=market_data, **kwargs), market_data
+
+    def test_covers_timeframe_and_the_two_above(self):
+        skill, market_data = self.make_skill()
+
+        result = asyncio.run(skill.detailed_analysis("BTCUSDT", "15m"))
+
+        assert list(result["timeframes"]) == ["15m", "1h", "4h"]
+        assert result["trend_alignment"] in ("bullish", "bearish", "mixed")
+        detail = result["timeframes"]["1h"]
+        assert detail["rsi"] == skill.analyze(random_klines(100))["rsi"]
+        assert detail["trend"] in ("up", "down", "sideways")
+        assert isinstance(detail["patterns"], list)
+        assert all(level < detail["current_price"] for level in detail["support"])
+        assert all(level > detail["current_price"] for level in detail["resistance"])
+        assert market_data.get_klines.await_count == 3
+
+    def test_repeated_calls_served_from_memory(self):
+        skill, market_data = self.make_skill()
+
+        async def scenario():
+            first = await skill.detailed_analysis("BTCUSDT", "1h")
+            first["timeframes"].clear()
+            return first, await skill.detailed_analysis("BTCUSDT", "1h")
+
+        _, second = asyncio.run(scenario())
+        assert list(second["timeframes"]) == ["1h", "4h", "1d"]
+        assert market_data.get_klines.await_count == 3
+
+    def test_expired_result_refetches(self):
+        skill, market_data = self.make_skill(detail_ttl=0)
+
+        async def scenario():
+            await skill.detailed_analysis("BTCUSDT", "1h")
+            await skill.detailed_analysis("BTCUSDT", "1h")
+
+        asyncio.run(scenario())
+        assert market_data.get_klines.await_count == 6
+
+    def test_errors(self):
+        skill, _ = self.make_skill()
+
+        assert "error" in asyncio.run(skill.detailed_analysis("BTCUSDT", "2h"))
+        assert "error" in asyncio.run(TechnicalAnalysisSkill().detailed_analysis("BTCUSDT"))
+
+    def test_short_history(self):
+        skill, market_data = self.make_skill()
+        market_data.get_klines.side_effect = (
+            lambda symbol, interval, limit: random_klines(15 if interval == "1d" else limit))
+        skill.patterns.detect = MagicMock(side_effect=lambda frame, symbol, tf: (
+            [] if tf != "4h" else 1 / 0))
+
+        result = asyncio.run(skill.detailed_analysis("BTCUSDT", "1h"))
+
+        details = result["timeframes"]
+        assert details["1d"]["bb_position"] is None
+        assert "error" in details["4h"]
+        assert details["1h"]["bb_position"]
+
+    def test_key_levels(self):
+        from makemerich.skills.analysis.technical import key_levels
+
+        closes = [100, 104, 110, 104, 100, 96, 90, 96, 100, 104, 110.2, 104, 100,
+                  96, 92, 96, 100, 103, 100, 99]
+        frame = candles([(c, c + 1, c - 1, c) for c in closes])
+
+        levels = key_levels(frame, order=2)
+        # The 110 and 110.2 swing highs merge; the nearest is kept
+        assert levels == {"support": [91.0, 89.0], "resistance": [104.0, 111.0]}
+
+
+class TestAnalysisHistory:
+    def test_rows_match_analyze(self):
+        frame = random_klines(200)
+        skill = TechnicalAnalysisSkill()
+
+        history = skill.analyze_history(frame)
+
+        assert len(history) == len(frame)
+        last = skill.analyze(frame)
+        for name in history.dtype.names:
+            assert history[-1][name] == last[name]
+        # Rows before the end see only earlier candles
+        assert history[99]["rsi"] == skill.analyze_history(frame[:100])[-1]["rsi"]
+
+    def test_field_subset(self):
+        frame = random_klines(200)
+        skill = TechnicalAnalysisSkill()
+        fields = ("current_price", "rsi", "macd_signal", "bb_position", "volume_trend")
+
+        subset = skill.analyze_history(frame, fields)
+
+        assert subset.dtype.names == fields
+        full = skill.analyze_history(frame)
+        for name in fields:
+            np.testing.assert_array_equal(subset[name], full[name])
+        with pytest.raises(ValueError):
+            skill.analyze_history(frame, ("rsi", "sentiment"))
@@ -0,0 +1,311 @@
+"""Tests for the backtester."""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+import yaml
+from makemerich.backtest.backtester import Backtester
+from makemerich.backtest.montecarlo import (
+    MonteCarlo, audit_returns, max_drawdowns, resample, trade_returns,
+)
+from makemerich.backtest.optimizer import (
+    Optimizer, grid_search, random_search, walk_forward_splits, write_profile,
+)
+from makemerich.core.config import RiskConfig
+from makemerich.crystalbox.audit import AuditLog
+from makemerich.strategies.base import BaseStrategy, Signal
+from makemerich.strategies.dca import DCAStrategy
+from makemerich.strategies.momentum import MomentumStrategy
+from tests.test_analysis import MINUTE, candles, random_klines
+
+
+class ScriptedStrategy(BaseStrategy):
+    """Returns a fixed signal at given candle indices, HOLD otherwise."""
+
+    name = "scripted"
+
+    def __init__(self, signals):
+        self.signals = signals
+        self.seen = []
+
+    def evaluate(self, analysis: dict, portfolio: dict) -> Signal:
+        index = analysis["timestamp"] // MINUTE
+        self.seen.append((index, portfolio["position"]))
+        action, stop, target = self.signals.get(index, ("HOLD", None, None))
+        return Signal(action, analysis["pair"], 1.0, "scripted", stop, target)
+
+
+class RecordingDCA(DCAStrategy):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.buys = []
+
+    def evaluate(self, analysis: dict, portfolio: dict) -> Signal:
+        signal = super().evaluate(analysis, portfolio)
+        if signal.action == "BUY":
+            self.buys.append(analysis["timestamp"])
+        return signal
+
+
+def flat(n, price=100.0):
+    return [(price, price + 1, price - 1, price)] * n
+
+
+class TestBacktester:
+    def test_fills_at_next_open_with_fees_and_slippage(self):
+        rows = flat(5) + [(110, 111, 109, 110)] + flat(4, 120)
+        strategy = ScriptedStrategy({2: ("BUY", None, None), 6: ("SELL", None, None)})
+        backtester = Backtester(initial_capital=1000, fee_rate=0.001,
+                                slippage=0.01, warmup=0)
+
+        result = backtester.run(strategy, candles(rows), "BTCUSDT")
+
+        trade, = result.trades
+        assert trade.entry_time == 3 * MINUTE
+        assert trade.entry_price == pytest.approx(101.0)
+        assert trade.exit_time == 7 * MINUTE
+        assert trade.exit_price == pytest.approx(120 * 0.99)
+        assert trade.exit_reason == "signal"
+        quantity = 1000 / 1.001 / 101.0
+        assert trade.quantity == pytest.approx(quantity)
+        cash = quantity * 120 * 0.99 * 0.999
+        assert result.equity[-1] == pytest.approx(cash)
+        assert trade.pnl == pytest.approx(cash - 1000)
+        assert result.summary()["trades"] == 1
+
+    def test_stop_loss_fills_at_gap_open(self):
+        rows = flat(4) + [(90, 91, 85, 88)] + flat(3, 88)
+        strategy = ScriptedStrategy({1: ("BUY", 95.0, 110.0)})
+
+        result = Backtester(fee_rate=0, slippage=0, warmup=0).run(strategy, candles(rows))
+
+        trade, = result.trades
+        assert (trade.exit_reason, trade.exit_price) == ("stop_loss", 90.0)
+        assert trade.exit_time == 4 * MINUTE
+        assert result.max_drawdown == pytest.approx(10.0)
+
+    def test_take_profit(self):
+        rows = flat(4) + [(100, 107, 99, 105)] + flat(3, 105)
+        strategy = ScriptedStrategy({1: ("BUY", 95.0, 106.0)})
+
+        result = Backtester(fee_rate=0, slippage=0, warmup=0).run(strategy, candles(rows))
+
+        trade, = result.trades
+        assert (trade.exit_reason, trade.exit_price) == ("take_profit", 106.0)
+        assert result.total_return == pytest.approx(6.0)
+
+    def test_open_position_closed_at_end(self):
+        strategy = ScriptedStrategy({3: ("BUY", None, None)})
+
+        result = Backtester(fee_rate=0, slippage=0, warmup=2).run(strategy, candles(flat(8)))
+
+        assert [index for index, _ in strategy.seen] == list(range(2, 7))
+        assert strategy.seen[-1][1] > 0
+        assert result.trades[0].exit_reason == "end"
+        assert result.equity.tolist() == [10_000.0] * 8
+
+    def test_strategy_runs_on_candle_clock(self):
+        strategy = RecordingDCA(interval_hours=1)
+
+        Backtester(pyramiding=True).run(strategy, random_klines(400), "BTCUSDT")
+
+        # Hourly on minute candles, from the first evaluated candle (50)
+        assert strategy.buys == [i * MINUTE for i in range(50, 399, 60)]
+
+    def test_strategy_instance_reused_across_runs(self):
+        strategy = RecordingDCA(interval_hours=1)
+        backtester = Backtester(pyramiding=True)
+
+        first = backtester.run(strategy, random_klines(400), "BTCUSDT")
+        strategy.buys.clear()
+        second = backtester.run(strategy, random_klines(400), "BTCUSDT")
+
+        # The schedule restarts with each run instead of waiting from the last buy
+        assert strategy.buys == [i * MINUTE for i in range(50, 399, 60)]
+        assert second.equity.tolist() == first.equity.tolist()
+
+    def test_momentum_trade_log(self):
+        result = Backtester().run(MomentumStrategy(), random_klines(2000, 3), "BTCUSDT")
+
+        assert len(result.equity) == 2000
+        for entry in result.trade_log():
+            assert entry["exit_time"] >= entry["entry_time"]
+            assert entry["pnl"] == pytest.approx(
+                (entry["exit_price"] - entry["entry_price"]) * entry["quantity"] - entry["fees"])
+
+
+class TestOptimizer:
+    SPACE = {"rsi_buy_threshold": [30, 40, 50], "rsi_sell_threshold": [60, 70]}
+
+    def test_search_spaces(self):
+        assert len(grid_search(self.SPACE)) == 6
+        samples = random_search({"rsi_buy_threshold": (20, 45),
+                                 "dip_multiplier": (1.0, 3.0),
+                                 "require_macd_confirm": [True, False]}, 50, seed=1)
+        assert samples == random_search({"rsi_buy_threshold": (20, 45),
+                                         "dip_multiplier": (1.0, 3.0),
+                                         "require_macd_confirm": [True, False]}, 50, seed=1)
+        assert all(isinstance(s["rsi_buy_threshold"], int)
+                   and 20 <= s["rsi_buy_threshold"] <= 45
+                   and 1.0 <= s["dip_multiplier"] <= 3.0 for s in samples)
+
+    def test_walk_forward_splits(self):
+        splits = walk_forward_splits(1000, 4, train_size=0.6)
+
+        assert splits[0] == ((0, 600), (600, 700))
+        assert splits[-1] == ((300, 900), (900, 1000))
+        with pytest.raises(ValueError):
+            walk_forward_splits(3, 4)
+
+    def test_workers_share_precomputed_analysis(self):
+        frame = random_klines(3000, 8)
+        candidates = grid_search(self.SPACE)
+
+        inline = Optimizer("momentum", workers=1).run(frame, candidates, "BTCUSDT", folds=2)
+        pooled = Optimizer("momentum", workers=2).run(frame, candidates, "BTCUSDT", folds=2)
+
+        assert [e.params for e in pooled.evaluations] == [e.params for e in inline.evaluations]
+        assert [e.test for e in pooled.evaluations] == [e.test for e in inline.evaluations]
+        scores = [e.score for e in inline.evaluations]
+        assert scores == sorted(scores, reverse=True)
+        assert len(inline.folds) == 2 and inline.walk_forward_score is not None
+
+    def test_ranked_on_train_scores_only(self):
+        frame = random_klines(3000, 8)
+
+        report = Optimizer("momentum", workers=1).run(
+            frame, grid_search(self.SPACE), "BTCUSDT", folds=2)
+
+        for e in report.evaluations:
+            assert e.score == pytest.approx(np.mean([s["total_return"] for s in e.train]))
+            assert e.test_score == pytest.approx(np.mean([s["total_return"] for s in e.test]))
+        assert report.best.score == max(e.score for e in report.evaluations)
+        assert report.ranking(1)[0]["test_score"] == round(report.best.test_score, 4)
+
+    def test_dca_dip_parameters_change_results(self):
+        frame = random_klines(3000, 9)
+        report = Optimizer("dca", workers=1, backtester={"pyramiding": True}).run(
+            frame, [{"interval_hours": 4, "dip_threshold": 0.0, "dip_multiplier": m}
+                    for m in (1.0, 5.0)])
+
+        summaries = [e.train[0] for e in report.evaluations]
+        assert summaries[0]["total_return"] != summaries[1]["total_return"]
+
+    def test_write_profile(self, tmp_path):
+        base = tmp_path / "base.yaml"
+        base.write_text("name: base\npairs: [BTCUSDT]\nrisk:\n  max_positions: 3\n"
+                        "strategy:\n  primary: momentum\n  min_confidence: 0.6\n")
+        report = Optimizer("mean_reversion", workers=1).run(
+            random_klines(2000, 10), [{"bb_buy_threshold": "below_lower"}], "BTCUSDT")
+
+        write_profile(tmp_path / "out.yaml", report, "1h", base)
+
+        profile = yaml.safe_load((tmp_path / "out.yaml").read_text())
+        assert profile["pairs"] == ["BTCUSDT"] and profile["risk"]["max_positions"] == 3
+        assert profile["strategy"] == {"primary": "mean_reversion", "min_confidence": 0.6,
+                                       "timeframe": "1h",
+                                       "params": {"bb_buy_threshold": "below_lower"}}
+        assert profile["optimization"]["candles"] == 2000
+        assert profile["optimization"]["train_score"] == round(report.best.score, 4)
+        assert profile["optimization"]["test_score"] is None
+
+
+class TestMonteCarlo:
+    def test_resample_blocks_are_consecutive(self):
+        returns = np.arange(10, dtype=np.float64)
+        rng = np.random.default_rng(0)
+
+        draws = resample(returns, 1000, 12, block=4, rng=rng)
+
+        assert draws.shape == (1000, 12)
+        steps = np.diff(draws, axis=1)[:, [0, 1, 2, 4, 5, 6, 8, 9, 10]]
+        assert np.all((steps == 1) | (steps == -9))
+        assert set(np.unique(resample(returns, 1000, 5, rng=rng))) == set(returns)
+
+    def test_constant_returns(self):
+        risk = RiskConfig(max_risk_per_trade=0.02, default_stop_loss_pct=0.04,
+                          min_cash_percent=30)
+        monte_carlo = MonteCarlo(risk)
+        assert monte_carlo.position_fraction == 0.5
+
+        result = monte_carlo.run([0.1] * 20, paths=100, seed=1)
+
+        np.testing.assert_allclose(result.final_return, 1.05 ** 20 - 1)
+        assert result.max_drawdown.max() == 0
+        assert result.ruin_probability == 0
+
+    def test_losses_cut_at_stop_and_ruin(self):
+        risk = RiskConfig(max_risk_per_trade=0.05, default_stop_loss_pct=0.05,
+                          min_cash_percent=0)
+        returns = [-0.5, -0.5, 0.01]
+
+        equity = MonteCarlo(risk).equity_paths(returns, 200, horizon=30,
+                                               rng=np.random.default_rng(2))
+        steps = equity[:, 1:] / equity[:, :-1] - 1
+        np.testing.assert_allclose(np.unique(steps.round(12)), [-0.05, 0.01])
+
+        result = MonteCarlo(risk).run(returns, paths=2000, horizon=30, seed=2)
+        expected = (equity.min(axis=1) <= 0.5).mean()
+        assert result.ruin_probability == pytest.approx(expected, abs=0.1)
+        assert 0 < result.ruin_probability < 1
+        uncut = MonteCarlo(risk, enforce_stop=False).run(returns, paths=2000, horizon=30, seed=2)
+        assert uncut.ruin_probability > result.ruin_probability
+
+    def test_max_drawdowns(self):
+        equity = np.array([[1.0, 1.2, 0.9, 1.5, 1.2], [1.0, 0.5, 0.25, 2.0, 3.0]])
+        np.testing.assert_allclose(max_drawdowns(equity), [0.25, 0.75])
+
+    def test_summary_and_seed(self):
+        returns = np.random.default_rng(3).normal(0.005, 0.02, 150)
+
+        first = MonteCarlo(chunk=1000).run(returns, paths=5000, block=5, seed=7)
+        second = MonteCarlo(chunk=1000).run(returns, paths=5000, block=5, seed=7)
+
+        np.testing.assert_array_equal(first.final_return, second.final_return)
+        summary = first.summary()
+        assert summary["paths"] == 5000 and summary["trades_per_path"] == 150
+        percentiles = list(summary["return_percentiles"].values())
+        assert percentiles == sorted(percentiles)
+        with pytest.raises(ValueError):
+            MonteCarlo().run([])
+
+    def test_trade_returns_from_backtest(self):
+        result = Backtester().run(MomentumStrategy(), random_klines(2000, 3), "BTCUSDT")
+
+        returns = trade_returns(result.trades)
+
+        assert len(returns) == len(result.trades)
+        assert returns.tolist() == pytest.approx([t.return_pct / 100 for t in result.trades])
+
+    def test_audit_returns(self, tmp_path):
+        @dataclass
+        class Decision:
+            action: str
+            pair: str
+            amount: float
+            price: float = None
+            reasoning: str = ""
+            confidence: float = 0.5
+
+        def fill(side, symbol, qty, price):
+            return {"side": side, "symbol": symbol, "executed_qty": qty,
+                    "avg_price": price, "quote_qty": qty * price, "order_id": 1}
+
+        audit = AuditLog(data_dir=tmp_path)
+        audit.log(Decision("BUY", "BTCUSDT", 500.0, 90.0))   # a decision, not a trade
+        for order in (
+            fill("BUY", "BTCUSDT", 1.0, 100.0),
+            fill("BUY", "ETHUSDT", 2.0, 10.0),
+            fill("BUY", "BTCUSDT", 1.0, 200.0),
+            fill("SELL", "BTCUSDT", 1.5, 150.0),
+            fill("SELL", "ETHUSDT", 2.0, 9.0),
+            fill("SELL", "SOLUSDT", 1.0, 20.0),    # nothing open
+        ):
+            audit.log_fill(order, "reason")
+        audit.log(Decision("HOLD", "", 0))
+
+        returns = audit_returns(audit.get_history(limit=100))
+
+        np.testing.assert_allclose(returns, [0.5, -0.25, -0.1])
+        assert audit.verify_chain()
@@ -1,64 +1,324 @@
 """Tests for Binance skills (mocked — no real API calls)."""
 
+import asyncio
+
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from makemerich.core.config import Config
 
 
+def make_transport(**responses):
+    """A stand-in BinanceTransport answering calls from ``responses``."""
+    transport = MagicMock()
+
+    async def call(method, **params):
+        result = responses[method]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    transport.call = AsyncMock(side_effect=call)
+    return transport
+
+
 class TestSpotTradingSkill:
-    @patch("makemerich.skills.binance.spot.Client")
-    def test_buy_market_order(self, mock_client_cls):
-        mock_client = MagicMock()
-        mock_client.order_market_buy.return_value = {
+    def test_buy_market_order(self):
+        transport = make_transport(order_market_buy={
             "orderId": 12345,
-            "executedQty": "0.001",
-            "fills": [{"price": "50000.00"}],
-        }
-        mock_client_cls.return_value = mock_client
+            "executedQty": "0.002",
+            "cummulativeQuoteQty": "100.00",
+            "fills": [{"price": "49990.00"}, {"price": "50010.00"}],
+        })
 
         from makemerich.skills.binance.spot import SpotTradingSkill
         config = Config()
-        skill = SpotTradingSkill(config)
+        skill = SpotTradingSkill(config, transport)
 
-        import asyncio
         result = asyncio.run(skill.buy("BTCUSDT", 100, "market"))
 
         assert result["status"] == "success"
         assert result["order_id"] == 12345
         assert result["side"] == "BUY"
+        assert result["executed_qty"] == 0.002
+        assert result["avg_price"] == pytest.approx(50000.0)
+        transport.call.assert_awaited_once_with(
+            "order_market_buy", symbol="BTCUSDT", quoteOrderQty=100)
 
-    @patch("makemerich.skills.binance.spot.Client")
-    def test_sell_market_order(self, mock_client_cls):
-        mock_client = MagicMock()
-        mock_client.order_market_sell.return_value = {
+    def test_sell_market_order(self):
+        transport = make_transport(order_market_sell={
             "orderId": 12346,
             "executedQty": "0.001",
             "fills": [{"price": "51000.00"}],
-        }
-        mock_client_cls.return_value = mock_client
+        })
 
         from makemerich.skills.binance.spot import SpotTradingSkill
         config = Config()
-        skill = SpotTradingSkill(config)
+        skill = SpotTradingSkill(config, transport)
 
-        import asyncio
         result = asyncio.run(skill.sell("BTCUSDT", 0.001, "market"))
 
         assert result["status"] == "success"
         assert result["side"] == "SELL"
 
-    @patch("makemerich.skills.binance.spot.Client")
-    def test_buy_error_handling(self, mock_client_cls):
-        mock_client = MagicMock()
-        mock_client.order_market_buy.side_effect = Exception("API Error")
-        mock_client_cls.return_value = mock_client
+    def test_buy_error_handling(self):
+        transport = make_transport(order_market_buy=Exception("API Error"))
 
         from makemerich.skills.binance.spot import SpotTradingSkill
         config = Config()
-        skill = SpotTradingSkill(config)
+        skill = SpotTradingSkill(config, transport)
 
-        import asyncio
         result = asyncio.run(skill.buy("BTCUSDT", 100, "market"))
 
         assert result["status"] == "error"
         assert "API Error" in result["message"]
+
+
+class TestBinanceTransport:
+    def test_concurrency_limit(self):
+        from makemerich.skills.binance.transport import BinanceTransport
+
+        config = Config()
+        config.binance.max_concurrency = 2
+        transport = BinanceTransport(config)
+
+        in_flight = 0
+        peak = 0
+
+        async def get_symbol_ticker(symbol):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"price": "1.0"}
+
+        client = MagicMock()
+        client.get_symbol_ticker = get_symbol_ticker
+
+        async def run():
+            await asyncio.gather(*[
+                transport.call("get_symbol_ticker", symbol="BTCUSDT")
+                for _ in range(6)
+            ])
+
+        with patch.object(BinanceTransport, "_connect", return_value=client):
+            asyncio.run(run())
+
+        assert peak == 2
+
+    def test_skills_share_one_client(self):
+        from makemerich.skills.binance.transport import BinanceTransport
+        from makemerich.skills.binance.market_data import MarketDataSkill
+        from makemerich.skills.binance.account import AccountSkill
+
+        config = Config()
+        transport = BinanceTransport(config)
+        client = MagicMock()
+        client.get_symbol_ticker = AsyncMock(return_value={"price": "50000"})
+        client.get_account = AsyncMock(return_value={"balances": []})
+
+        market = MarketDataSkill(config, transport)
+        account = AccountSkill(config, transport)
+
+        async def run():
+            await market.get_price("BTCUSDT")
+            await account.get_balance()
+
+        with patch.object(BinanceTransport, "_connect",
+                          return_value=client) as connect:
+            asyncio.run(run())
+
+        assert connect.call_count == 1
+        client.get_symbol_ticker.assert_awaited_once()
+        client.get_account.assert_awaited_once()
+
+
+class TestPortfolioValuation:
+    def test_portfolio_uses_one_ticker_request(self):
+        from makemerich.skills.binance.account import AccountSkill
+
+        transport = make_transport(
+            get_account={"balances": [
+                {"asset": "USDT", "free": "1000", "locked": "0"},
+                {"asset": "BTC", "free": "0.5", "locked": "0.1"},
+                {"asset": "ETH", "free": "2", "locked": "0"},
+                {"asset": "DUST", "free": "5", "locked": "0"},
+            ]},
+            get_all_tickers=[
+                {"symbol": "BTCUSDT", "price": "50000"},
+                {"symbol": "ETHUSDT", "price": "3000"},
+                {"symbol": "ETHBTC", "price": "0.06"},
+            ],
+        )
+        skill = AccountSkill(Config(), transport)
+
+        result = asyncio.run(skill.get_portfolio())
+
+        assert result["status"] == "success"
+        assert result["portfolio"]["BTC"]["usdt_value"] == 30000.0
+        assert result["portfolio"]["DUST"]["usdt_value"] == 0.0
+        assert result["total_usdt"] == 37000.0
+        methods = [c.args[0] for c in transport.call.await_args_list]
+        assert methods.count("get_all_tickers") == 1
+
+    def test_portfolio_errors_without_prices(self):
+        from makemerich.skills.binance.account import AccountSkill
+
+        transport = make_transport(
+            get_account={"balances": [
+                {"asset": "BTC", "free": "0.5", "locked": "0"},
+            ]},
+            get_all_tickers=ConnectionError("ticker down"),
+        )
+        skill = AccountSkill(Config(), transport)
+
+        result = asyncio.run(skill.get_portfolio())
+
+        assert result["status"] == "error"
+        assert "ticker down" in result["message"]
+
+    def test_concurrent_refreshes_coalesce(self):
+        from makemerich.skills.binance.prices import PriceCache
+
+        calls = 0
+
+        async def call(method, **params):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return [{"symbol": "BTCUSDT", "price": "50000"}]
+
+        transport = MagicMock()
+        transport.call = AsyncMock(side_effect=call)
+        cache = PriceCache(transport, ttl=60)
+
+        async def run():
+            results = await asyncio.gather(*[cache.price("BTCUSDT") for _ in range(10)])
+            await cache.prices()
+            return results
+
+        assert asyncio.run(run()) == [50000.0] * 10
+        assert calls == 1
+
+    def test_stale_prices_refresh(self):
+        from makemerich.skills.binance.prices import PriceCache
+
+        transport = make_transport(get_all_tickers=[{"symbol": "BTCUSDT", "price": "1"}])
+        cache = PriceCache(transport, ttl=0)
+
+        async def run():
+            await cache.prices()
+            await cache.prices()
+
+        asyncio.run(run())
+        assert cache.refreshes == 2
+
+
+class TestRequestScheduler:
+    def test_orders_jump_the_queue(self):
+        from makemerich.skills.binance.scheduler import Priority, RequestScheduler
+
+        scheduler = RequestScheduler(weight_limit=100, headroom=1.0)
+        scheduler.used_weight = 100  # budget exhausted until the window rolls
+        order = []
+
+        async def request(name, priority):
+            await scheduler.acquire(1, priority)
+            order.append(name)
+
+        async def run():
+            tasks = [
+                asyncio.create_task(request("history", Priority.HISTORY)),
+                asyncio.create_task(request("portfolio", Priority.PORTFOLIO)),
+                asyncio.create_task(request("klines", Priority.MARKET_DATA)),
+                asyncio.create_task(request("order", Priority.ORDER)),
+            ]
+            await asyncio.sleep(0)
+            assert scheduler.metrics()["queue_depth"] == {
+                "order": 1, "market_data": 1, "portfolio": 1, "history": 1,
+            }
+            scheduler.used_weight = 0
+            scheduler._pump()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        assert order == ["order", "klines", "portfolio", "history"]
+
+    def test_waits_when_budget_spent(self):
+        from makemerich.skills.binance.scheduler import Priority, RequestScheduler
+
+        scheduler = RequestScheduler(weight_limit=10, headroom=1.0)
+
+        async def run():
+            await scheduler.acquire(10, Priority.MARKET_DATA)
+            waiter = asyncio.create_task(scheduler.acquire(1, Priority.MARKET_DATA))
+            await asyncio.sleep(0.01)
+            return waiter.done()
+
+        assert asyncio.run(run()) is False
+        assert scheduler.used_weight == 10
+
+    def test_headers_correct_local_usage(self):
+        from makemerich.skills.binance.scheduler import RequestScheduler
+
+        scheduler = RequestScheduler()
+        scheduler.observe({"x-mbx-used-weight-1m": "4200",
+                           "x-mbx-order-count-10s": "7"})
+        assert scheduler.used_weight == 4200
+        assert scheduler.order_count == 7
+
+    def test_request_weights(self):
+        from makemerich.skills.binance.scheduler import Priority, default_priority, request_weight
+
+        assert request_weight("get_klines", {"symbol": "BTCUSDT"}) == 2
+        assert request_weight("get_order_book", {"limit": 1000}) == 50
+        assert request_weight("get_open_orders", {}) == 80
+        assert default_priority("order_market_buy") == Priority.ORDER
+        assert default_priority("get_all_tickers") == Priority.PORTFOLIO
+
+    def test_transport_backs_off_on_429(self):
+        from binance.exceptions import BinanceAPIException
+        from makemerich.skills.binance.scheduler import Priority
+        from makemerich.skills.binance.transport import BinanceTransport
+
+        transport = BinanceTransport(Config())
+        response = MagicMock()
+        response.headers = {"Retry-After": "30"}
+        client = MagicMock()
+        client.get_klines = AsyncMock(side_effect=BinanceAPIException(
+            response, 429, '{"code": -1003, "msg": "Too many requests"}'))
+
+        async def run():
+            with pytest.raises(BinanceAPIException):
+                await transport.call("get_klines", symbol="BTCUSDT")
+            # Even an order has to wait out the Retry-After
+            waiter = asyncio.create_task(
+                transport.scheduler.acquire(1, Priority.ORDER, order=True))
+            await asyncio.sleep(0.01)
+            blocked = not waiter.done()
+            waiter.cancel()
+            return blocked
+
+        with patch.object(BinanceTransport, "_connect", return_value=client):
+            assert asyncio.run(run())
+        assert transport.scheduler.metrics()["wait_ms"]["market_data"]["requests"] == 1
+
+    def test_futures_have_their_own_budget(self):
+        from makemerich.skills.binance.transport import BinanceTransport
+
+        transport = BinanceTransport(Config())
+        spot, futures = transport.schedulers["spot"], transport.schedulers["futures"]
+        spot.used_weight = spot.weight_budget  # spot exhausted for this minute
+        client = MagicMock()
+        client.futures_position_information = AsyncMock(return_value=[])
+        client.response.headers = {"x-mbx-used-weight-1m": "40"}
+
+        async def run():
+            await asyncio.wait_for(transport.call(
+                "futures_position_information", symbol="BTCUSDT"), 1)
+
+        with patch.object(BinanceTransport, "_connect", return_value=client):
+            asyncio.run(run())
+        assert futures.used_weight == 40
+        assert spot.used_weight == spot.weight_budget
+        assert futures.weight_budget == int(2400 * 0.9)
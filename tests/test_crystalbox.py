@@ -12,6 +12,7 @@ class MockDecision:
     action: str = "BUY"
     pair: str = "BTCUSDT"
     amount: float = 0.1
+    price: float = None
     reasoning: str = "Test reasoning"
     confidence: float = 0.8
 
@@ -1,5 +1,7 @@
 """Tests for the MakeMeRich engine."""
 
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 from makemerich.core.config import Config, RiskConfig
@@ -38,3 +40,115 @@ risk:
         assert config.cycle_interval == 30
         assert config.risk.max_risk_per_trade == 0.01
         assert config.risk.max_positions == 3
+
+    def test_load_ensemble(self, tmp_path):
+        config_file = tmp_path / "test_config.yaml"
+        config_file.write_text("""
+ensemble:
+  min_confidence: 0.3
+  strategies:
+    momentum:
+      weight: 2
+      params: {rsi_buy_threshold: 35}
+""")
+
+        config = Config.load(str(config_file))
+        assert config.ensemble.min_confidence == 0.3
+        assert config.ensemble.strategies["momentum"]["weight"] == 2
+        assert Config().ensemble.strategies == {}
+
+
+class TestMarketPipeline:
+    def make_skills(self, failing=()):
+        in_flight = {"now": 0, "peak": 0}
+
+        async def get_klines(symbol, interval, limit):
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            if symbol in failing:
+                return []
+            return [{"close": 1.0}] * limit
+
+        market = MagicMock()
+        market.get_klines = AsyncMock(side_effect=get_klines)
+        technical = MagicMock()
+        technical.analyze_incremental.side_effect = (
+            lambda symbol, interval, klines: {"candles": len(klines)})
+        return {"market_data": market, "technical": technical}, in_flight
+
+    def test_partial_failure_keeps_cycle(self):
+        from makemerich.core.pipeline import MarketPipeline
+
+        config = Config()
+        skills, _ = self.make_skills(failing={"ETHUSDT"})
+        pipeline = MarketPipeline(config, skills)
+        result = asyncio.run(pipeline.run(["BTCUSDT", "ETHUSDT", "SOLUSDT"]))
+        pipeline.shutdown()
+
+        assert set(result.analysis) == {"BTCUSDT", "SOLUSDT"}
+        assert result.analysis["BTCUSDT"] == {"candles": 100}
+        assert set(result.errors) == {"ETHUSDT"}
+        assert set(result.timings) == {"BTCUSDT", "ETHUSDT", "SOLUSDT"}
+        assert result.timings["BTCUSDT"]["fetch_ms"] > 0
+
+    def test_fetch_concurrency_bounded(self):
+        from makemerich.core.pipeline import MarketPipeline
+
+        config = Config()
+        config.data.fetch_concurrency = 3
+        skills, in_flight = self.make_skills()
+        pipeline = MarketPipeline(config, skills)
+        pairs = [f"PAIR{i}USDT" for i in range(12)]
+        result = asyncio.run(pipeline.run(pairs))
+        pipeline.shutdown()
+
+        assert len(result.analysis) == 12
+        assert in_flight["peak"] == 3
+
+
+class TestEngine:
+    def make_engine(self, tmp_path, monkeypatch, extra=""):
+        from makemerich.core.engine import Engine
+
+        monkeypatch.chdir(tmp_path)
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("""
+data:
+  history_dir: data/candles
+  analysis_cache_size: 64
+  indicator_backend: numpy
+""" + extra)
+        with patch("makemerich.agent.trader.anthropic.Anthropic"):
+            return Engine(str(config_file))
+
+    def test_builds_from_config(self, tmp_path, monkeypatch):
+        engine = self.make_engine(tmp_path, monkeypatch)
+
+        technical = engine.skills["technical"]
+        assert technical.memo.maxsize == 64
+        assert technical.market_data is engine.skills["market_data"]
+        assert engine.candles is not None
+        asyncio.run(engine.transport.close())
+
+    def test_silent_stream_falls_back_to_polling(self, tmp_path, monkeypatch):
+        from makemerich.skills.binance.stream import MarketStream
+
+        engine = self.make_engine(tmp_path, monkeypatch, "cycle_interval: 0.05\n")
+        market_data = engine.skills["market_data"]
+
+        async def run():
+            market_data.stream = MarketStream(market_data, ["BTCUSDT"], "1m")
+            await asyncio.wait_for(engine._wait_next_cycle(), timeout=5)
+            market_data.stream._live.add(("BTCUSDT", "1m"))
+            await asyncio.wait_for(engine._wait_next_cycle(), timeout=5)
+            await engine.transport.close()
+
+        engine.logger = MagicMock()
+        asyncio.run(run())
+
+        assert engine.logger.warning.call_args.args == ("Market stream offline, polling",)
+        assert engine.logger.debug.call_args.args == (
+            "No candle closed within cycle interval, polling",)
+        assert engine.logger.warning.call_count == 1
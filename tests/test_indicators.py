@@ -0,0 +1,128 @@
+"""Parity of the NumPy indicator kernels with the ta reference library."""
+
+import numpy as np
+import pytest
+from makemerich.skills.analysis import indicators
+from makemerich.skills.analysis.technical import TechnicalAnalysisSkill
+from makemerich.skills.klines import KlineFrame
+from tests.test_analysis import MINUTE, random_klines
+
+pd = pytest.importorskip("pandas")
+ta = pytest.importorskip("ta")
+
+
+def flat_then_trending(n=300):
+    """Flat stretches (zero ranges, no losses), a gap and a steady trend."""
+    close = np.concatenate([
+        np.full(40, 100.0),
+        np.linspace(100, 180, 100),
+        np.full(20, 180.0),
+        np.linspace(150, 90, n - 160),
+    ])
+    timestamp = np.arange(n, dtype=np.int64) * MINUTE
+    return KlineFrame({
+        "timestamp": timestamp,
+        "open": np.concatenate([[close[0]], close[:-1]]),
+        "high": close + np.where(np.arange(n) < 40, 0.0, 0.5),
+        "low": close - np.where(np.arange(n) < 40, 0.0, 0.5),
+        "close": close,
+        "volume": np.linspace(1, 50, n),
+        "close_time": timestamp + MINUTE - 1,
+        "quote_volume": np.ones(n),
+        "trades": np.ones(n, dtype=np.int64),
+    })
+
+
+SERIES = [random_klines(500, seed) for seed in range(4)] + [
+    random_klines(60, 9), flat_then_trending(),
+]
+
+
+def assert_parity(actual, expected, rtol=1e-9):
+    actual = np.asarray(actual, dtype=np.float64).ravel()
+    expected = np.asarray(expected, dtype=np.float64)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=rtol, atol=1e-8, equal_nan=True)
+
+
+# pandas' online rolling variance leaves cancellation noise (~1e-7 relative)
+# on flat windows, where the windowed kernel is exact.
+BAND_RTOL = 1e-7
+
+
+@pytest.mark.parametrize("frame", SERIES, ids=lambda f: f"{len(f)}c")
+class TestKernelParity:
+    def test_rsi(self, frame):
+        close = pd.Series(frame.close)
+        assert_parity(indicators.rsi(frame.close, 14),
+                      ta.momentum.RSIIndicator(close, window=14).rsi())
+
+    def test_macd(self, frame):
+        reference = ta.trend.MACD(pd.Series(frame.close))
+        line, signal, histogram = indicators.macd(frame.close)
+        assert_parity(line, reference.macd())
+        assert_parity(signal, reference.macd_signal())
+        assert_parity(histogram, reference.macd_diff())
+
+    def test_bollinger(self, frame):
+        reference = ta.volatility.BollingerBands(pd.Series(frame.close), 20, 2)
+        upper, middle, lower = indicators.bollinger(frame.close, 20, 2)
+        assert_parity(upper, reference.bollinger_hband(), BAND_RTOL)
+        assert_parity(middle, reference.bollinger_mavg())
+        assert_parity(lower, reference.bollinger_lband(), BAND_RTOL)
+
+    def test_ema(self, frame):
+        close = pd.Series(frame.close)
+        for window in (20, 50):
+            assert_parity(indicators.ema(frame.close, window),
+                          ta.trend.EMAIndicator(close, window=window).ema_indicator())
+
+    def test_atr(self, frame):
+        reference = ta.volatility.AverageTrueRange(
+            pd.Series(frame.high), pd.Series(frame.low), pd.Series(frame.close), 14)
+        assert_parity(indicators.atr(frame.high, frame.low, frame.close, 14),
+                      reference.average_true_range())
+
+    def test_stochastic(self, frame):
+        reference = ta.momentum.StochasticOscillator(
+            pd.Series(frame.high), pd.Series(frame.low), pd.Series(frame.close))
+        k, d = indicators.stochastic(frame.high, frame.low, frame.close)
+        assert_parity(k, reference.stoch())
+        assert_parity(d, reference.stoch_signal())
+
+    def test_volume_sma(self, frame):
+        assert_parity(indicators.sma(frame.volume, 20),
+                      pd.Series(frame.volume).rolling(window=20).mean())
+
+    def test_backends_agree(self, frame):
+        numpy_skill = TechnicalAnalysisSkill(backend="numpy")
+        ta_skill = TechnicalAnalysisSkill(backend="ta")
+
+        numpy_series = numpy_skill.analyze_series(frame)
+        ta_series = ta_skill.analyze_series(frame)
+        assert numpy_series.keys() == ta_series.keys()
+        for key, values in ta_series.items():
+            assert_parity(numpy_series[key], values, BAND_RTOL)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        TechnicalAnalysisSkill(backend="talib")
+
+
+@pytest.mark.parametrize("gap", [False, True], ids=["contiguous", "gap"])
+def test_single_series_matches_matrix_path(gap):
+    """A lone row is smoothed in blocks (or looped over gaps); rows of a
+    matrix step candle by candle. Both must agree, warm-up included."""
+    frame = random_klines(3000, 3)
+    high, low, close = frame.high.copy(), frame.low.copy(), frame.close.copy()
+    for values in (high, low, close):
+        values[:7] = np.nan
+        if gap:
+            values[1500:1504] = np.nan
+    for window in (9, 14, 50):
+        assert_parity(indicators.ema(close, window),
+                      indicators.ema(np.vstack([close, close]), window)[0], 1e-11)
+    assert_parity(indicators.atr(high, low, close, 14),
+                  indicators.atr(np.vstack([high, high]), np.vstack([low, low]),
+                                 np.vstack([close, close]), 14)[0], 1e-11)
@@ -0,0 +1,493 @@
+"""Tests for market data caching and ingestion (no real API calls)."""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+import websockets
+from unittest.mock import AsyncMock, MagicMock
+from makemerich.core.config import Config
+from makemerich.skills.binance.kline_cache import KlineBuffer
+from makemerich.skills.klines import KlineFrame
+
+MINUTE = 60_000
+
+
+def raw_kline(i, close=None):
+    """A raw Binance kline row for the i-th minute."""
+    close = 100.0 + i if close is None else close
+    return [
+        i * MINUTE, str(close - 0.5), str(close + 1), str(close - 1), str(close),
+        "10.0", (i + 1) * MINUTE - 1, str(close * 10), 42, "0", "0", "0",
+    ]
+
+
+class FakeExchange:
+    """Serves klines 0..last from memory, honouring startTime, endTime and limit."""
+
+    def __init__(self, last):
+        self.last = last
+        self.calls = []
+
+    async def call(self, method, **params):
+        self.calls.append(params)
+        start = params.get("startTime")
+        first = 0 if start is None else start // MINUTE
+        end = params.get("endTime")
+        last = self.last if end is None else min(self.last, end // MINUTE)
+        rows = [raw_kline(i) for i in range(first, last + 1)]
+        if start is None:
+            return rows[-params["limit"]:]
+        return rows[:params["limit"]]
+
+
+class TestKlineFrame:
+    def test_parse_binance_payload(self):
+        frame = KlineFrame.from_binance([raw_kline(i) for i in range(3)])
+
+        assert frame.close.dtype == np.float64
+        assert frame.timestamp.dtype == np.int64
+        assert frame.close.flags.c_contiguous
+        assert frame.timestamp.tolist() == [0, MINUTE, 2 * MINUTE]
+        assert frame.trades.tolist() == [42, 42, 42]
+
+    def test_slices_are_views(self):
+        frame = KlineFrame.from_binance([raw_kline(i) for i in range(10)])
+        tail = frame[-4:]
+
+        assert isinstance(tail, KlineFrame)
+        assert len(tail) == 4
+        assert np.shares_memory(tail.close, frame.close)
+
+    def test_list_of_dicts_compat(self):
+        frame = KlineFrame.from_binance([raw_kline(i) for i in range(3)])
+        dicts = frame.to_dicts()
+
+        assert frame[-1] == dicts[-1]
+        assert dicts[0] == {
+            "timestamp": 0, "open": 99.5, "high": 101.0, "low": 99.0,
+            "close": 100.0, "volume": 10.0, "close_time": MINUTE - 1,
+            "quote_volume": 1000.0, "trades": 42,
+        }
+        assert KlineFrame.from_dicts(dicts).close.tolist() == frame.close.tolist()
+
+
+class TestKlineBuffer:
+    def test_replaces_forming_candle(self):
+        buffer = KlineBuffer(capacity=5)
+        buffer.upsert([raw_kline(i) for i in range(3)])
+        added = buffer.upsert([raw_kline(2, close=999.0), raw_kline(3)])
+
+        assert added == 1
+        assert len(buffer) == 4
+        assert buffer.window().close.tolist() == [100.0, 101.0, 999.0, 103.0]
+
+    def test_window_stays_ordered_across_wraparound(self):
+        buffer = KlineBuffer(capacity=4)
+        for i in range(23):
+            buffer.upsert([raw_kline(i)])
+
+        window = buffer.window()
+        assert window.timestamp.tolist() == [i * MINUTE for i in range(19, 23)]
+        assert np.shares_memory(window.close, buffer.columns["close"])
+        assert not window.close.flags.writeable
+
+
+class TestKlineCache:
+    def test_seed_then_delta(self):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+
+        exchange = FakeExchange(last=199)
+        skill = MarketDataSkill(Config(), exchange)
+
+        first = asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+        exchange.last = 201
+        second = asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+
+        assert len(first) == len(second) == 100
+        assert first[-1]["timestamp"] == 199 * MINUTE
+        assert second[-1]["timestamp"] == 201 * MINUTE
+        assert second[0]["timestamp"] == 102 * MINUTE
+        assert "startTime" not in exchange.calls[0]
+        assert exchange.calls[1]["startTime"] == 199 * MINUTE
+
+    def test_window_is_zero_copy(self):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+
+        skill = MarketDataSkill(Config(), FakeExchange(last=150))
+        window = asyncio.run(skill.get_kline_window("BTCUSDT", "1m", limit=50))
+        buffer = skill.cache.get("BTCUSDT", "1m")
+
+        assert len(window) == 50
+        assert np.shares_memory(window.close, buffer.columns["close"])
+
+    def test_reseeds_when_far_behind(self):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+
+        exchange = FakeExchange(last=99)
+        skill = MarketDataSkill(Config(), exchange)
+        asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+        exchange.last = 5000
+        klines = asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+
+        assert klines[-1]["timestamp"] == 5000 * MINUTE
+        assert "startTime" not in exchange.calls[-1]
+
+
+def minutes(first, last):
+    return KlineFrame.from_binance([raw_kline(i) for i in range(first, last)])
+
+
+class TestResampler:
+    def test_aggregates_ohlcv(self):
+        from makemerich.skills.binance.resample import resample
+
+        bars = resample(minutes(0, 120), "1h")
+
+        assert bars.timestamp.tolist() == [0, 60 * MINUTE]
+        assert bars.open.tolist() == [99.5, 159.5]
+        assert bars.high.tolist() == [160.0, 220.0]
+        assert bars.low.tolist() == [99.0, 159.0]
+        assert bars.close.tolist() == [159.0, 219.0]
+        assert bars.volume.tolist() == [600.0, 600.0]
+        assert bars.trades.tolist() == [42 * 60, 42 * 60]
+        assert bars.close_time.tolist() == [60 * MINUTE - 1, 120 * MINUTE - 1]
+
+    def test_weeks_open_on_monday(self):
+        from makemerich.skills.binance.resample import DAY, resample
+
+        monday = 4 * DAY  # 1970-01-05
+        frame = minutes(0, 1)
+        frame.timestamp[:] = monday + 3 * DAY
+
+        assert resample(frame, "1w").timestamp.tolist() == [monday]
+        with pytest.raises(ValueError):
+            resample(frame, "3d")
+
+    def test_incremental_matches_batch(self):
+        from makemerich.skills.binance.resample import Resampler, resample
+
+        resampler = Resampler("1m")
+        bars = resampler.track("BTCUSDT", "15m", minutes(7, 40), capacity=50)
+        for last in range(40, 200, 7):
+            # Overlapping deltas, each ending in a still-forming candle
+            resampler.update("BTCUSDT", minutes(last - 9, last + 1))
+            expected = resample(minutes(15, last + 1), "15m")
+            assert bars.window().to_dicts() == expected.to_dicts()
+
+    def test_gap_drops_timeframe(self):
+        from makemerich.skills.binance.resample import Resampler
+
+        resampler = Resampler("1m")
+        resampler.track("BTCUSDT", "5m", minutes(0, 20), capacity=10)
+        resampler.update("BTCUSDT", minutes(30, 35))
+
+        assert resampler.get("BTCUSDT", "5m") is None
+
+    def test_skill_resamples_from_stored_minutes(self, tmp_path):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+        from makemerich.skills.binance.resample import resample
+        from makemerich.storage.candles import CandleStore
+
+        store = CandleStore(tmp_path)
+        store.append("BTCUSDT", "1m", minutes(0, 600))
+        exchange = FakeExchange(last=650)
+        skill = MarketDataSkill(Config(), exchange, store=store)
+
+        hours = asyncio.run(skill.get_klines("BTCUSDT", "1h", limit=5))
+        assert hours.to_dicts() == resample(minutes(300, 651), "1h")[-5:].to_dicts()
+        assert len(exchange.calls) == 1
+
+        exchange.last = 700
+        hours = asyncio.run(skill.get_klines("BTCUSDT", "1h", limit=5))
+        quarters = asyncio.run(skill.get_klines("BTCUSDT", "15m", limit=5))
+        assert hours.to_dicts() == resample(minutes(300, 701), "1h")[-5:].to_dicts()
+        assert quarters.to_dicts() == resample(minutes(600, 701), "15m")[-5:].to_dicts()
+        assert all(call["startTime"] for call in exchange.calls)
+
+    def test_falls_back_without_history(self):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+
+        exchange = FakeExchange(last=99)
+        skill = MarketDataSkill(Config(), exchange)
+        asyncio.run(skill.get_klines("BTCUSDT", "1h", limit=10))
+
+        assert skill.cache.get("BTCUSDT", "1h") is not None
+        assert skill.resampler.get("BTCUSDT", "1h") is None
+
+    def test_falls_back_on_gap_in_history(self, tmp_path):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+        from makemerich.storage.candles import CandleStore
+
+        store = CandleStore(tmp_path)
+        store.append("BTCUSDT", "1m", minutes(0, 400))
+        store.append("BTCUSDT", "1m", minutes(410, 600))
+        skill = MarketDataSkill(Config(), FakeExchange(last=650), store=store)
+        asyncio.run(skill.get_klines("BTCUSDT", "1h", limit=5))
+
+        assert skill.resampler.get("BTCUSDT", "1h") is None
+        assert skill.cache.get("BTCUSDT", "1h") is not None
+
+    def test_live_stream_key_is_not_resampled(self, tmp_path):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+        from makemerich.storage.candles import CandleStore
+
+        store = CandleStore(tmp_path)
+        store.append("BTCUSDT", "1m", minutes(0, 600))
+        exchange = FakeExchange(last=650)
+        skill = MarketDataSkill(Config(), exchange, store=store)
+        skill.cache.create("BTCUSDT", "1h", 5).upsert(minutes(0, 5))
+        skill.stream = MagicMock()
+        skill.stream.is_live.side_effect = lambda symbol, interval: interval == "1h"
+
+        klines = asyncio.run(skill.get_klines("BTCUSDT", "1h", limit=5))
+
+        assert len(klines) == 5
+        assert exchange.calls == []
+        assert skill.resampler.get("BTCUSDT", "1h") is None
+
+
+def kline_frame(i, closed, close=None):
+    """A combined-stream kline frame as Binance pushes it."""
+    row = raw_kline(i, close)
+    return json.dumps({
+        "stream": "btcusdt@kline_1m",
+        "data": {
+            "e": "kline", "E": row[6], "s": "BTCUSDT",
+            "k": {
+                "t": row[0], "T": row[6], "s": "BTCUSDT", "i": "1m",
+                "o": row[1], "h": row[2], "l": row[3], "c": row[4],
+                "v": row[5], "q": row[7], "n": row[8], "x": closed,
+            },
+        },
+    })
+
+
+class TestMarketStream:
+    def test_replay_with_reconnect_backfill(self):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+
+        exchange = FakeExchange(last=99)
+        skill = MarketDataSkill(Config(), exchange)
+        sessions = [
+            # First connection: candle 99 closes, 100 starts, then we drop
+            [kline_frame(99, False, close=150.0), kline_frame(99, True),
+             kline_frame(100, False)],
+            # Second connection: 101 was missed while down, 102 closes
+            [kline_frame(102, True)],
+        ]
+        paths = []
+
+        async def replay(ws):
+            paths.append(ws.request.path)
+            frames = sessions.pop(0)
+            for frame in frames:
+                await ws.send(frame)
+            if sessions:
+                exchange.last = 102
+            else:
+                await ws.wait_closed()
+
+        async def run():
+            async with websockets.serve(replay, "127.0.0.1", 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                stream = skill.start_stream(["BTCUSDT"], "1m", limit=50,
+                                            url=f"ws://127.0.0.1:{port}/stream")
+                stream.reconnect_delay = 0.01
+                closed = []
+                while len(closed) < 2:
+                    closed += await stream.wait_closed(timeout=5)
+                klines = await skill.get_klines("BTCUSDT", "1m", limit=50)
+                calls = len(exchange.calls)
+                await skill.stop_stream()
+                return stream, closed, klines, calls
+
+        stream, closed, klines, calls = asyncio.run(run())
+
+        assert paths[0] == "/stream?streams=btcusdt@kline_1m"
+        assert [c.open_time for c in closed] == [99 * MINUTE, 102 * MINUTE]
+        assert stream.reconnects == 1
+        assert [k["timestamp"] // MINUTE for k in klines[-4:]] == [99, 100, 101, 102]
+        assert klines[-4]["close"] == 199.0
+        # Seed + one backfill per connection; live windows skip REST
+        assert calls == 2
+
+
+def depth_event(first, last, bids=(), asks=()):
+    return {"e": "depthUpdate", "s": "BTCUSDT", "U": first, "u": last,
+            "b": [[str(p), str(q)] for p, q in bids],
+            "a": [[str(p), str(q)] for p, q in asks]}
+
+
+SNAPSHOT = {
+    "lastUpdateId": 100,
+    "bids": [["99.0", "1.0"], ["98.0", "2.0"], ["97.0", "3.0"]],
+    "asks": [["101.0", "1.0"], ["102.0", "2.0"], ["103.0", "3.0"]],
+}
+
+
+class TestLocalOrderBook:
+    def make_book(self):
+        from makemerich.skills.binance.order_book import LocalOrderBook
+
+        book = LocalOrderBook("BTCUSDT")
+        book.apply_snapshot(SNAPSHOT)
+        return book
+
+    def test_snapshot_queries(self):
+        book = self.make_book()
+
+        assert book.best_bid() == (99.0, 1.0)
+        assert book.best_ask() == (101.0, 1.0)
+        assert book.mid() == 100.0
+        assert book.spread_bps() == pytest.approx(200.0)
+        assert book.depth_within_bps(250) == {"bid": 3.0, "ask": 3.0}
+
+    def test_vwap_and_limit_price(self):
+        book = self.make_book()
+
+        assert book.vwap("BUY", 2.0) == pytest.approx((101.0 + 102.0) / 2)
+        assert book.vwap("SELL", 3.0) == pytest.approx((99.0 + 2 * 98.0) / 3)
+        assert book.limit_price("BUY", 2.5) == 102.0
+        assert book.limit_price("BUY", 3.5) == 103.0
+        assert book.vwap("BUY", 100.0) is None
+
+    def test_diffs_applied_in_sequence(self):
+        book = self.make_book()
+
+        assert not book.apply_diff(depth_event(90, 100, bids=[(99.0, 5.0)]))
+        assert book.apply_diff(depth_event(95, 105, bids=[(99.5, 4.0), (98.0, 0)]))
+        assert book.apply_diff(depth_event(106, 107, asks=[(100.5, 1.5)]))
+
+        assert book.best_bid() == (99.5, 4.0)
+        assert book.bid_prices.tolist() == [97.0, 99.0, 99.5]
+        assert book.best_ask() == (100.5, 1.5)
+        assert book.last_update_id == 107
+
+    def test_gap_requires_resync(self):
+        from makemerich.skills.binance.order_book import OrderBookOutOfSync
+
+        book = self.make_book()
+        book.apply_diff(depth_event(101, 102))
+        with pytest.raises(OrderBookOutOfSync):
+            book.apply_diff(depth_event(105, 106, asks=[(100.0, 9.0)]))
+        assert not book.synced
+
+        # Events keep buffering until a newer snapshot replays them
+        book.apply_diff(depth_event(107, 108, asks=[(100.2, 1.0)]))
+        book.apply_snapshot({**SNAPSHOT, "lastUpdateId": 106})
+        assert book.synced
+        assert book.best_ask() == (100.2, 1.0)
+
+    def test_skill_serves_synced_book_locally(self):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+
+        transport = MagicMock()
+        transport.call = AsyncMock(return_value=SNAPSHOT)
+        skill = MarketDataSkill(Config(), transport)
+
+        async def run():
+            await skill.sync_order_book("BTCUSDT")
+            return await skill.get_order_book("BTCUSDT", limit=2)
+
+        depth = asyncio.run(run())
+
+        assert transport.call.await_count == 1
+        assert depth["bids"] == [[99.0, 1.0], [98.0, 2.0]]
+        assert depth["asks"] == [[101.0, 1.0], [102.0, 2.0]]
+        estimate = skill.estimate_slippage("BTCUSDT", "BUY", 1.0)
+        assert estimate["vwap"] == 101.0
+        assert estimate["slippage_bps"] == pytest.approx(100.0)
+
+    def test_one_resync_at_a_time_and_stale_after_stop(self):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+        from makemerich.skills.binance.stream import MarketStream
+
+        release = None
+
+        async def snapshot(method, **params):
+            await release.wait()
+            return {**SNAPSHOT, "lastUpdateId": 110}
+
+        transport = MagicMock()
+        transport.call = AsyncMock(side_effect=snapshot)
+        skill = MarketDataSkill(Config(), transport)
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            book = skill.order_books["BTCUSDT"] = self.make_book()
+            stream = MarketStream(skill, ["BTCUSDT"], "1m", depth=True)
+            stream._handle_depth(depth_event(105, 106))
+            book.synced = True  # a second gap while the first resync runs
+            stream._handle_depth(depth_event(108, 109))
+            await asyncio.sleep(0)
+            resyncs = dict(stream._resyncs)
+            await stream.stop()
+            return book, resyncs
+
+        book, resyncs = asyncio.run(run())
+
+        assert transport.call.await_count == 1
+        assert list(resyncs) == ["BTCUSDT"]
+        assert resyncs["BTCUSDT"].cancelled()
+        assert not book.synced
+        assert skill.estimate_slippage("BTCUSDT", "BUY", 1.0) is None
+
+    def test_disconnect_marks_books_stale(self):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+        from makemerich.skills.binance.stream import MarketStream
+
+        skill = MarketDataSkill(Config(), FakeExchange(last=99))
+
+        async def run():
+            book = skill.order_books["BTCUSDT"] = self.make_book()
+            stream = MarketStream(skill, ["BTCUSDT"], "1m", url="ws://127.0.0.1:1/stream",
+                                  reconnect_delay=60)
+            stream.start()
+            while not stream.reconnects:
+                await asyncio.sleep(0.01)
+            synced = book.synced
+            await stream.stop()
+            return synced
+
+        assert not asyncio.run(run())
+
+    def test_resync_retries_until_snapshot_loads(self):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+        from makemerich.skills.binance.order_book import LocalOrderBook
+        from makemerich.skills.binance.stream import MarketStream
+
+        calls = 0
+
+        async def snapshot(method, **params):
+            nonlocal calls
+            calls += 1
+            if calls <= 3:
+                raise ConnectionError("snapshot unavailable")
+            return {**SNAPSHOT, "lastUpdateId": 125}
+
+        transport = MagicMock()
+        transport.call = AsyncMock(side_effect=snapshot)
+        skill = MarketDataSkill(Config(), transport)
+
+        async def run():
+            book = skill.order_books["BTCUSDT"] = LocalOrderBook("BTCUSDT", max_pending=5)
+            book.apply_snapshot(SNAPSHOT)
+            stream = MarketStream(skill, ["BTCUSDT"], "1m", depth=True,
+                                  resync_delay=0.001)
+            for n in range(105, 131):  # starts with a gap after update 100
+                stream._handle_depth(depth_event(n, n, asks=[(100.0 + n / 1000, 1.0)]))
+            pending = len(book._pending)
+            while not book.synced:
+                await asyncio.sleep(0.001)
+            await stream.stop()
+            return book, pending
+
+        book, pending = asyncio.run(run())
+
+        assert pending == 5
+        assert calls == 4
+        assert book.last_update_id == 130
+        assert book.best_ask() == (100.126, 1.0)
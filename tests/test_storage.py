@@ -0,0 +1,244 @@
+"""Tests for the on-disk candle store."""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from makemerich.core.config import Config
+from makemerich.skills.klines import KlineFrame
+from makemerich.storage.candles import CandleStore, RECORD_DTYPE
+from tests.test_market_data import FakeExchange, MINUTE, raw_kline
+
+
+def frame(first, last):
+    return KlineFrame.from_binance([raw_kline(i) for i in range(first, last)])
+
+
+class TestCandleStore:
+    def test_append_and_query_range(self, tmp_path):
+        store = CandleStore(tmp_path)
+        assert store.append("BTCUSDT", "1m", frame(0, 500)) == 500
+
+        result = store.query("BTCUSDT", "1m", start=100 * MINUTE, end=110 * MINUTE)
+        assert result.timestamp.tolist() == [i * MINUTE for i in range(100, 110)]
+        assert result.close.tolist() == [100.0 + i for i in range(100, 110)]
+        assert isinstance(store.records("BTCUSDT", "1m"), np.memmap)
+
+    def test_append_skips_stored_candles(self, tmp_path):
+        store = CandleStore(tmp_path)
+        store.append("BTCUSDT", "1m", frame(0, 10))
+
+        assert store.append("BTCUSDT", "1m", frame(5, 15)) == 5
+        assert store.count("BTCUSDT", "1m") == 15
+        assert store.tail("BTCUSDT", "1m", 3).timestamp.tolist() == [
+            12 * MINUTE, 13 * MINUTE, 14 * MINUTE]
+
+    def test_partitions_by_symbol_and_interval(self, tmp_path):
+        store = CandleStore(tmp_path)
+        store.append("BTCUSDT", "1m", frame(0, 10))
+        store.append("ETHUSDT", "1m", frame(0, 3))
+
+        assert store.count("BTCUSDT", "1m") == 10
+        assert store.count("ETHUSDT", "1m") == 3
+        assert store.count("BTCUSDT", "1h") == 0
+        assert store.path("BTCUSDT", "1m").stat().st_size == 10 * RECORD_DTYPE.itemsize
+
+    def test_torn_write_is_ignored(self, tmp_path):
+        store = CandleStore(tmp_path)
+        store.append("BTCUSDT", "1m", frame(0, 10))
+        with open(store.path("BTCUSDT", "1m"), "ab") as fh:
+            fh.write(b"\x00" * 17)
+
+        assert store.count("BTCUSDT", "1m") == 10
+        store.append("BTCUSDT", "1m", frame(10, 12))
+        assert store.count("BTCUSDT", "1m") == 12
+        assert store.last_open_time("BTCUSDT", "1m") == 11 * MINUTE
+
+
+class TestHistoryIngestion:
+    def test_ingest_and_warm_restart(self, tmp_path):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+
+        store = CandleStore(tmp_path)
+        exchange = FakeExchange(last=299)
+        skill = MarketDataSkill(Config(), exchange, store=store)
+        asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+        assert store.count("BTCUSDT", "1m") == 100
+
+        # A fresh process seeds from disk and only fetches the delta
+        exchange.last = 305
+        restarted = MarketDataSkill(Config(), exchange, store=store)
+        klines = asyncio.run(restarted.get_klines("BTCUSDT", "1m", limit=100))
+
+        assert exchange.calls[-1]["startTime"] == 299 * MINUTE
+        assert klines.timestamp[-1] == 305 * MINUTE
+        assert len(klines) == 100
+        assert store.last_open_time("BTCUSDT", "1m") == 305 * MINUTE
+
+    def test_reseed_backfills_stored_history(self, tmp_path):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+
+        store = CandleStore(tmp_path)
+        exchange = FakeExchange(last=99)
+        skill = MarketDataSkill(Config(), exchange, store=store)
+        asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+
+        # Too far behind for one delta: the window is reseeded and the
+        # candles between the old tail and the new window are paged in
+        exchange.last = 2500
+        asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+
+        stored = store.records("BTCUSDT", "1m")["timestamp"]
+        assert np.all(np.diff(stored) == MINUTE)
+        assert stored[-1] == 2500 * MINUTE
+
+    def test_no_gap_when_backfill_fails(self, tmp_path):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+
+        class FlakyExchange(FakeExchange):
+            async def call(self, method, **params):
+                if "endTime" in params:
+                    raise ConnectionError("history unavailable")
+                return await super().call(method, **params)
+
+        store = CandleStore(tmp_path)
+        exchange = FlakyExchange(last=99)
+        skill = MarketDataSkill(Config(), exchange, store=store)
+        asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+        exchange.last = 2500
+        klines = asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+        exchange.last = 2510
+        asyncio.run(skill.get_klines("BTCUSDT", "1m", limit=100))
+
+        assert klines.timestamp[-1] == 2500 * MINUTE
+        assert store.last_open_time("BTCUSDT", "1m") == 99 * MINUTE
+
+
+class KlineServer:
+    """Local HTTP stand-in for the Binance klines endpoint (synthetic data)."""
+
+    def __init__(self, last, fail_after=None):
+        self.last = last
+        self.fail_after = fail_after
+        self.requests = 0
+
+    async def klines(self, request):
+        from aiohttp import web
+
+        self.requests += 1
+        if self.fail_after is not None and self.requests > self.fail_after:
+            return web.json_response({"code": -1003, "msg": "Too many"}, status=500)
+        q = request.query
+        first = int(q["startTime"]) // MINUTE
+        last = min(int(q["endTime"]) // MINUTE, self.last)
+        rows = [raw_kline(i) for i in range(first, last + 1)]
+        return web.json_response(rows[:int(q["limit"])])
+
+    async def __aenter__(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/api/v3/klines", self.klines)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/api"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+class TestHistoryDownloader:
+    def download(self, store, server, shards=None):
+        from makemerich.skills.binance.market_data import MarketDataSkill
+        from makemerich.skills.binance.transport import BinanceTransport
+        from makemerich.storage.downloader import HistoryDownloader
+
+        async def run():
+            async with server:
+                transport = BinanceTransport(Config(), api_url=server.url)
+                downloader = HistoryDownloader(
+                    MarketDataSkill(Config(), transport), store,
+                    concurrency=3, shard_candles=2500, retries=1, retry_delay=0,
+                )
+                plan = downloader.plan(["BTCUSDT", "ETHUSDT"], "1m",
+                                       0, 10_000 * MINUTE)
+                report = await downloader.run(plan)
+                await transport.close()
+                return plan, report
+
+        return asyncio.run(run())
+
+    def test_download_into_store(self, tmp_path):
+        store = CandleStore(tmp_path)
+        plan, report = self.download(store, KlineServer(last=9_999))
+
+        assert len(plan) == 8
+        assert not report.failed
+        assert report.candles == 20_000
+        assert report.requests == 24  # 3 pages per 2500-candle shard
+        for symbol in ("BTCUSDT", "ETHUSDT"):
+            timestamps = store.records(symbol, "1m")["timestamp"]
+            assert len(timestamps) == 10_000
+            assert (np.diff(timestamps) == MINUTE).all()
+        assert not list((tmp_path / ".staging").glob("*/*.candles"))
+
+    def test_resume_after_interruption(self, tmp_path):
+        store = CandleStore(tmp_path)
+        _, first = self.download(store, KlineServer(last=9_999, fail_after=7))
+
+        assert first.failed
+        assert store.count("BTCUSDT", "1m") + store.count("ETHUSDT", "1m") < 20_000
+
+        server = KlineServer(last=9_999)
+        _, second = self.download(store, server)
+
+        assert not second.failed
+        assert first.candles + second.candles == 20_000
+        assert server.requests == 24 - first.requests
+        for symbol in ("BTCUSDT", "ETHUSDT"):
+            timestamps = store.records(symbol, "1m")["timestamp"]
+            assert timestamps.tolist() == [i * MINUTE for i in range(10_000)]
+
+    def test_forming_candle_not_stored(self, tmp_path):
+        from makemerich.storage.downloader import HistoryDownloader
+
+        now = int(time.time() * 1000) // MINUTE
+
+        class RecentHistory:
+            async def get_kline_range(self, symbol, interval, start, end, limit=1000):
+                last = min(end // MINUTE, now)
+                return frame(start // MINUTE, min(last + 1, start // MINUTE + limit))
+
+        store = CandleStore(tmp_path)
+        downloader = HistoryDownloader(RecentHistory(), store)
+        plan = downloader.plan(["BTCUSDT"], "1m", (now - 10) * MINUTE,
+                               int(time.time() * 1000))
+        asyncio.run(downloader.run(plan))
+
+        records = store.records("BTCUSDT", "1m")
+        assert len(records) >= 10
+        assert records["close_time"][-1] < time.time() * 1000
+
+    def test_overtaken_download_is_kept(self, tmp_path):
+        from makemerich.storage.downloader import HistoryDownloader
+
+        class History:
+            async def get_kline_range(self, symbol, interval, start, end, limit=1000):
+                return frame(start // MINUTE, min(end // MINUTE + 1, start // MINUTE + limit))
+
+        store = CandleStore(tmp_path)
+        downloader = HistoryDownloader(History(), store, shard_candles=500)
+        plan = downloader.plan(["BTCUSDT"], "1m", 0, 2000 * MINUTE)
+        # The live stream persists newer candles while the download runs
+        store.append("BTCUSDT", "1m", frame(5000, 5010))
+
+        report = asyncio.run(downloader.run(plan))
+
+        assert report.failed == [plan[0].key]
+        assert store.count("BTCUSDT", "1m") == 10
+        assert len(list((tmp_path / ".staging").glob("*/*.candles"))) == 4
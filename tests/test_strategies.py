@@ -1,9 +1,16 @@
 """Tests for trading strategies."""
 
+import numpy as np
 import pytest
+from makemerich.backtest.backtester import Backtester
+from makemerich.skills.analysis.technical import TechnicalAnalysisSkill
+from makemerich.strategies.base import ACTIONS
 from makemerich.strategies.momentum import MomentumStrategy
 from makemerich.strategies.mean_reversion import MeanReversionStrategy
 from makemerich.strategies.dca import DCAStrategy
+from makemerich.strategies.ensemble import StrategyEnsemble, load_snapshot
+from makemerich.strategies.grid import GridStrategy
+from tests.test_analysis import random_klines
 
 
 class TestMomentumStrategy:
@@ -34,6 +41,13 @@ class TestMomentumStrategy:
         signal = self.strategy.evaluate(analysis, {})
         assert signal.action == "SELL"
 
+    def test_macd_confirmation_optional(self):
+        analysis = {"rsi": 25, "macd_signal": "bearish", "current_price": 50000,
+                    "pair": "BTCUSDT"}
+        assert self.strategy.evaluate(analysis, {}).action == "HOLD"
+        signal = MomentumStrategy(require_macd_confirm=False).evaluate(analysis, {})
+        assert signal.action == "BUY"
+
     def test_hold_signal(self):
         analysis = {
             "rsi": 50,
@@ -93,3 +107,264 @@ class TestDCAStrategy:
         signal = strategy.evaluate(analysis, {})
         assert signal.action == "BUY"
         assert "dip mode" in signal.reason
+
+    def test_schedule_per_pair_with_clock(self):
+        now = [1_000_000.0]
+        strategy = DCAStrategy(interval_hours=1, clock=lambda: now[0])
+
+        assert strategy.evaluate({"pair": "BTCUSDT"}, {}).action == "BUY"
+        assert strategy.evaluate({"pair": "ETHUSDT"}, {}).action == "BUY"
+        assert strategy.evaluate({"pair": "BTCUSDT"}, {}).action == "HOLD"
+        now[0] += 3600
+        assert strategy.evaluate({"pair": "BTCUSDT"}, {}).action == "BUY"
+        # The candle clock wins over the injected one
+        assert strategy.evaluate({"pair": "SOLUSDT", "timestamp": 0}, {}).action == "BUY"
+        assert strategy.schedule.last_buy[strategy.schedule.rows(["SOLUSDT"])[0]] == 0
+
+    def test_due_buys_matches_evaluate(self):
+        rng = np.random.default_rng(0)
+        pairs = [f"PAIR{i}USDT" for i in range(5000)]
+        change = rng.uniform(-10, 10, len(pairs))
+        prices = rng.uniform(1, 100, len(pairs))
+        bulk, single = DCAStrategy(interval_hours=4), DCAStrategy(interval_hours=4)
+        bulk.schedule.add(pairs[::3], interval_hours=1, base_amount=20)
+        single.schedule.add(pairs[::3], interval_hours=1, base_amount=20)
+
+        for now in (0, 3600, 4 * 3600):
+            buys = bulk.due_buys(pairs, change, prices, now=now)
+            expected = [s for s in (
+                single.evaluate({"pair": p, "change_24h": c, "current_price": x,
+                                 "timestamp": now * 1000}, {})
+                for p, c, x in zip(pairs, change.tolist(), prices.tolist()))
+                if s.action == "BUY"]
+
+            assert buys.pairs == [s.pair for s in expected]
+            assert buys.amount.tolist() == [s.amount for s in expected]
+            assert buys.stop_loss.tolist() == pytest.approx([s.stop_loss for s in expected])
+        assert len(bulk.due_buys(pairs, now=4 * 3600)) == 0
+
+    def test_next_due(self):
+        strategy = DCAStrategy(interval_hours=2)
+        assert strategy.schedule.next_due() is None
+        strategy.due_buys(["BTCUSDT", "ETHUSDT"], now=100.0)
+        strategy.schedule.add(["ETHUSDT"], interval_hours=1)
+        assert strategy.schedule.next_due() == 100.0 + 3600
+        strategy.schedule.rows(["SOLUSDT"])
+        assert strategy.schedule.next_due() == -np.inf
+
+
+class TestGridStrategy:
+    def setup_method(self):
+        self.strategy = GridStrategy(num_grids=10, total_investment=1000)
+        self.strategy.setup_grid(90, 110)  # BUY at 90-98, SELL at 100-110
+
+    def tick(self, price):
+        return self.strategy.evaluate({"current_price": price, "pair": "BTCUSDT"}, {})
+
+    def test_not_initialized(self):
+        signal = GridStrategy().evaluate({"current_price": 100}, {})
+        assert signal.action == "HOLD"
+
+    def test_level_reached(self):
+        signal = self.tick(96.05)
+        assert signal.action == "BUY"
+        assert signal.amount == pytest.approx(100)
+        assert self.strategy.prices[self.strategy.triggered].tolist() == [96]
+        assert self.tick(96.05).action == "HOLD"
+
+    def test_gap_fires_every_crossed_level_once(self):
+        assert self.tick(99).action == "HOLD"
+        signal = self.tick(91.5)
+        assert signal.action == "BUY"
+        assert signal.amount == pytest.approx(400)
+        assert self.strategy.prices[self.strategy.triggered].tolist() == [92, 94, 96, 98]
+
+        assert self.tick(99).action == "HOLD"  # rising through BUY levels
+        assert self.tick(91.5).action == "HOLD"  # already filled
+        signal = self.tick(107)
+        assert signal.action == "SELL"
+        assert self.strategy.prices[self.strategy.triggered].tolist() == [100, 102, 104, 106]
+
+    def test_reset_unfills_levels(self):
+        assert self.tick(96.05).action == "BUY"
+
+        self.strategy.reset()
+
+        assert not self.strategy.filled.any() and self.strategy.last_price is None
+        assert self.tick(96.05).action == "BUY"
+
+    def test_large_grid(self):
+        strategy = GridStrategy(num_grids=100_000)
+        strategy.setup_grid(0.5, 1.5)
+        strategy.evaluate({"current_price": 0.8}, {})
+        filled = int(strategy.filled.sum())
+        signal = strategy.evaluate({"current_price": 0.7}, {})
+        assert signal.action == "BUY"
+        crossed = strategy.prices[strategy.triggered]
+        assert len(crossed) > 9_900 and crossed.max() < 0.8
+        assert strategy.filled.sum() == filled + len(crossed)
+        assert strategy.filled[(strategy.prices >= 0.7) & (strategy.prices <= 0.8)].all()
+
+    def test_state_survives_restart(self, tmp_path):
+        path = tmp_path / "grid" / "BTCUSDT.npz"
+        strategy = GridStrategy(num_grids=10, state_path=path)
+        strategy.setup_grid(90, 110)
+        strategy.evaluate({"current_price": 99}, {})
+        strategy.evaluate({"current_price": 93}, {})
+        strategy.set_order_id(strategy.triggered, "order-1")
+
+        restored = GridStrategy(state_path=path)
+        assert restored.levels == strategy.levels
+        assert restored.num_grids == 10 and restored.last_price == 93
+        assert restored.evaluate({"current_price": 93}, {}).action == "HOLD"
+        assert restored.evaluate({"current_price": 91}, {}).action == "BUY"
+        assert restored.prices[restored.triggered].tolist() == [92]
+
+
+class TestStrategyEnsemble:
+    BULLISH = {"rsi": 25, "macd_signal": "bullish", "volume_trend": "normal",
+               "bb_position": "below_lower", "current_price": 100.0, "change_24h": 0}
+    NEUTRAL = {"rsi": 50, "macd_signal": "neutral", "volume_trend": "normal",
+               "bb_position": "middle", "current_price": 100.0, "change_24h": 0}
+
+    def test_weighted_vote(self):
+        ensemble = StrategyEnsemble({"momentum": {"weight": 3}, "mean_reversion": {"weight": 1}})
+        momentum = MomentumStrategy().evaluate(self.BULLISH, {})
+        reversion = MeanReversionStrategy().evaluate(self.BULLISH, {})
+        assert momentum.action == reversion.action == "BUY"
+
+        consensus = ensemble.evaluate({"BTCUSDT": self.BULLISH})["BTCUSDT"]
+
+        expected = (3 * momentum.strength + reversion.strength) / 4
+        assert consensus.signal.action == "BUY"
+        assert consensus.signal.pair == "BTCUSDT"
+        assert consensus.score == pytest.approx(expected)
+        assert consensus.signal.strength == pytest.approx(expected)
+        assert min(momentum.stop_loss, reversion.stop_loss) <= consensus.signal.stop_loss
+        assert consensus.signal.stop_loss <= max(momentum.stop_loss, reversion.stop_loss)
+        assert set(consensus.votes) == {"momentum", "mean_reversion"}
+
+    def test_min_confidence_and_hold_dilutes(self):
+        analysis = {"BTCUSDT": self.BULLISH, "ETHUSDT": self.NEUTRAL}
+        ensemble = StrategyEnsemble({"momentum": {}, "grid": {"weight": 10}},
+                                    min_confidence=0.1)
+
+        signals = ensemble.evaluate(analysis)
+
+        assert signals["BTCUSDT"].score > 0
+        assert signals["BTCUSDT"].signal.action == "HOLD"
+        assert signals["BTCUSDT"].signal.stop_loss is None
+        assert signals["ETHUSDT"].score == 0
+        assert ensemble.latest is signals
+
+    def test_grid_per_pair_survives_restart(self, tmp_path):
+        spec = {"grid": {"params": {"num_grids": 10, "state_path": str(tmp_path / "grids")},
+                         "pairs": {"BTCUSDT": {"lower_price": 90, "upper_price": 110},
+                                   "ETHUSDT": {"lower_price": 9, "upper_price": 11}}}}
+        ticks = [{"BTCUSDT": {"current_price": p}, "ETHUSDT": {"current_price": p / 10}}
+                 for p in (99, 93)]
+        ensemble = StrategyEnsemble(spec)
+        signals = ensemble.evaluate({"BTCUSDT": {"current_price": 94},
+                                     "ETHUSDT": {"current_price": 9.4}})
+        assert signals["BTCUSDT"].signal.action == signals["ETHUSDT"].signal.action == "BUY"
+        assert sorted(p.name for p in (tmp_path / "grids").iterdir()) == [
+            "BTCUSDT.npz", "ETHUSDT.npz"]
+
+        # The ETH grid trades its levels; a restarted ensemble remembers them
+        grid = ensemble.members("ETHUSDT")[0][2]
+        for analysis in ticks:
+            grid.evaluate({**analysis["ETHUSDT"], "pair": "ETHUSDT"}, {})
+        restarted = StrategyEnsemble(spec)
+        signals = restarted.evaluate(ticks[-1])
+
+        assert signals["ETHUSDT"].signal.action == "HOLD"
+        grid = restarted.members("ETHUSDT")[0][2]
+        assert grid.prices[0] == 9 and grid.filled.sum() == 3
+        assert not restarted.members("BTCUSDT")[0][2].filled.any()
+
+    def test_outvoted_grid_fills_nothing(self, tmp_path):
+        path = tmp_path / "grids"
+        ensemble = StrategyEnsemble({
+            "grid": {"params": {"lower_price": 90, "upper_price": 110,
+                                "state_path": str(path)}},
+            "momentum": {"weight": 5},
+        })
+        grid = ensemble.members("BTCUSDT")[0][2]
+        before = (path / "BTCUSDT.npz").read_bytes()
+
+        bearish = {**self.NEUTRAL, "rsi": 80, "macd_signal": "bearish", "current_price": 94}
+        consensus = ensemble.evaluate({"BTCUSDT": bearish})["BTCUSDT"]
+
+        assert consensus.votes["grid"].action == "BUY"
+        assert consensus.signal.action == "SELL"
+        assert not grid.filled.any() and grid.last_price is None
+        assert (path / "BTCUSDT.npz").read_bytes() == before
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            StrategyEnsemble({"martingale": {}})
+
+    def test_dca_cannot_vote(self):
+        with pytest.raises(ValueError, match="dca"):
+            StrategyEnsemble({"momentum": {}, "dca": {}})
+
+    def test_snapshot_round_trip(self, tmp_path):
+        ensemble = StrategyEnsemble({"momentum": {}, "mean_reversion": {}})
+        ensemble.evaluate({"BTCUSDT": self.BULLISH})
+        path = tmp_path / "signals" / "latest.json"
+
+        assert load_snapshot(path)["pairs"] == {}
+        ensemble.save(path)
+        snapshot = load_snapshot(path)
+
+        assert snapshot["pairs"]["BTCUSDT"]["action"] == "BUY"
+        assert snapshot["pairs"]["BTCUSDT"]["votes"]["momentum"]["action"] == "BUY"
+        assert snapshot["strategies"] == {"momentum": 1.0, "mean_reversion": 1.0}
+
+    def test_fast_per_pair(self):
+        ensemble = StrategyEnsemble({name: {} for name in ("momentum", "mean_reversion", "grid")})
+        table = TechnicalAnalysisSkill().analyze_history(random_klines(500, 7))
+        names = table.dtype.names
+        analysis = {f"PAIR{i}": dict(zip(names, row)) for i, row in enumerate(table.tolist())}
+
+        ensemble.evaluate(analysis)
+
+        assert ensemble.elapsed_ms / len(analysis) < 1.0
+
+
+class TestEvaluateSeries:
+    """evaluate_series must match evaluate() at every candle."""
+
+    @pytest.mark.parametrize("strategy", [
+        MomentumStrategy(), MomentumStrategy(rsi_buy_threshold=60, rsi_sell_threshold=55),
+        MomentumStrategy(require_macd_confirm=False), MeanReversionStrategy(),
+    ], ids=["momentum", "momentum-overlap", "momentum-no-macd", "mean_reversion"])
+    def test_parity_with_evaluate(self, strategy):
+        table = TechnicalAnalysisSkill().analyze_history(random_klines(3000, 5))
+
+        signals = strategy.evaluate_series(table)
+
+        names = table.dtype.names
+        for i, row in enumerate(table.tolist()):
+            signal = strategy.evaluate(dict(zip(names, row)), {})
+            assert ACTIONS[signals.action[i]] == signal.action
+            assert signals.strength[i] == pytest.approx(signal.strength)
+            for name in ("stop_loss", "take_profit"):
+                expected = getattr(signal, name)
+                value = getattr(signals, name)[i]
+                assert value == pytest.approx(expected) if expected is not None else np.isnan(value)
+
+    def test_backtest_paths_agree(self):
+        frame = random_klines(5000, 6)
+        for strategy in (MomentumStrategy(), MomentumStrategy(require_macd_confirm=False),
+                         MeanReversionStrategy()):
+            for backtester in (Backtester(), Backtester(fee_rate=0, allocation=0.5, warmup=10)):
+                loop = backtester.run(strategy, frame, "BTCUSDT", vectorized=False)
+                fast = backtester.run(strategy, frame, "BTCUSDT")
+
+                assert loop.trades and loop.trade_log() == fast.trade_log()
+                np.testing.assert_array_equal(loop.equity, fast.equity)
+
+    def test_not_implemented_by_default(self):
+        with pytest.raises(NotImplementedError):
+            DCAStrategy().evaluate_series({})